@@ -27,9 +27,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from vector.embedding import embed_text, embed_texts_batch
-from vector.memory_writer import write_memory, write_memories_batch
-from vector.embedding_router import EmbeddingRouter
+from vector.embedding import embed_text, embed_texts_batch, router_options_from_env, use_router
+from vector.memory_writer import write_memory, write_memories_batch_detailed
+from vector.async_embedding_router import AsyncEmbeddingRouter
+from vector.micro_batching import MicroBatchDispatcher
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -94,7 +95,28 @@ app.add_middleware(
 )
 
 # 全局变量
-router = EmbeddingRouter()
+# 异步路由：OpenAI调用和缓存读写都不阻塞事件循环，并限制同时进行的API请求数
+# 缓存后端由 EMBEDDING_CACHE_BACKEND 指定；多进程部署使用 sqlite，各工作进程共享同一份缓存
+# 该路由同时被 vector.embedding 使用（use_router），内存写入和检索与 /embedding 共用同一缓存和统计
+# EMBEDDING_CACHE_WRITE_BEHIND=true 时新向量由后台线程批量落盘，请求不再等待磁盘写入（关闭服务时会全部写入）
+# EMBEDDING_CHUNK_MAX_TOKENS 开启长文本分块：超长文本按token分块（带重叠），逐块缓存后池化为一个向量
+# 降维：EMBEDDING_DIMENSIONS 通过 dimensions 参数请求更短的向量（text-embedding-3 系列）；
+# ada-002 则用 EMBEDDING_PCA_PROJECTION 指定本地拟合的PCA投影文件
+# 模型、分块和降维设置与 vector.embedding 的路由相同（router_options_from_env），
+# 因此内存写入、检索查询和 /embedding 的向量维度一致、经过同一投影，可以直接比较
+router = AsyncEmbeddingRouter(
+    write_behind=os.getenv("EMBEDDING_CACHE_WRITE_BEHIND", "false").lower() == "true",
+    **router_options_from_env()
+)
+use_router(router)
+# 微批处理：将几毫秒内的单文本缓存未命中合并为一次批量API调用
+dispatcher = MicroBatchDispatcher(router, window_ms=5.0, max_batch_size=64)
+# Weaviate批量导入：每批对象数、并发请求数以及是否按响应时间动态调整批大小
+weaviate_batch_options = {
+    "batch_size": int(os.getenv("WEAVIATE_BATCH_SIZE", "100")),
+    "num_workers": int(os.getenv("WEAVIATE_BATCH_WORKERS", "1")),
+    "dynamic": os.getenv("WEAVIATE_BATCH_DYNAMIC", "false").lower() == "true"
+}
 
 # ================================
 # Pydantic模型定义
@@ -122,8 +144,9 @@ class BatchEmbeddingRequest(BaseModel):
     def texts_not_empty(cls, v):
         if not v:
             raise ValueError('文本列表不能为空')
-        if len(v) > 100:
-            raise ValueError('批量处理最多支持100个文本')
+        # 路由会按令牌数和条目数自动拆分为并发子批次，这里只限制单次请求的总量
+        if len(v) > 10000:
+            raise ValueError('批量处理最多支持10000个文本')
         for text in v:
             if not text.strip():
                 raise ValueError('文本不能为空')
@@ -144,10 +167,12 @@ class MemoryRequest(BaseModel):
     agent: str = Field(..., description="代理标识", example="developer")
     tags: List[str] = Field(..., description="标签列表", example=["feature", "implementation"])
     source: str = Field("agent", description="来源", example="development")
+    upsert: bool = Field(False, description="幂等写入：UUID由内容、项目、仓库和代理派生，已存在时直接返回且不重新向量化（批量写入时请使用批量请求的 upsert）")
 
 class BatchMemoryRequest(BaseModel):
     """批量内存写入请求"""
     memories: List[MemoryRequest] = Field(..., description="内存记录列表")
+    upsert: bool = Field(False, description="幂等写入：一次批量检查已存在的记录，只向量化和写入新记录")
 
     @validator('memories')
     def memories_not_empty(cls, v):
@@ -166,8 +191,8 @@ class EmbeddingResponse(BaseModel):
 class BatchEmbeddingResponse(BaseModel):
     """批量向量化响应"""
     vectors: List[List[float]] = Field(..., description="向量列表")
-    cache_hits: int = Field(..., description="缓存命中数")
-    cache_misses: int = Field(..., description="缓存未命中数")
+    cache_hits: int = Field(..., description="缓存命中数（开启分块时按块计数）")
+    cache_misses: int = Field(..., description="缓存未命中数（开启分块时按块计数；不使用缓存时为0）")
     processing_time: float = Field(..., description="总处理时间（秒）")
     performance_gain: float = Field(..., description="性能提升比例")
 
@@ -176,9 +201,18 @@ class MemoryResponse(BaseModel):
     uuid: str = Field(..., description="生成的UUID")
     processing_time: float = Field(..., description="处理时间（秒）")
 
+class BatchMemoryItemResult(BaseModel):
+    """批量写入中单条记录的结果"""
+    index: int = Field(..., description="在请求中的位置")
+    uuid: Optional[str] = Field(None, description="写入成功（或已存在）时的UUID")
+    error: Optional[str] = Field(None, description="写入失败时的错误信息")
+    attempts: int = Field(..., description="尝试次数（含自动重试）")
+    existed: bool = Field(False, description="upsert 模式下记录已存在，未重新写入")
+
 class BatchMemoryResponse(BaseModel):
     """批量内存写入响应"""
-    uuids: List[str] = Field(..., description="生成的UUID列表")
+    uuids: List[str] = Field(..., description="写入成功的UUID列表（按请求顺序）")
+    results: List[BatchMemoryItemResult] = Field(default_factory=list, description="每条记录的写入结果")
     success_count: int = Field(..., description="成功写入数量")
     total_count: int = Field(..., description="总数量")
     processing_time: float = Field(..., description="总处理时间（秒）")
@@ -188,6 +222,8 @@ class CacheInfo(BaseModel):
     num_entries: int = Field(..., description="缓存条目数")
     total_size_bytes: int = Field(..., description="总大小（字节）")
     hit_rate: float = Field(..., description="命中率")
+    segments: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="按模型分段的缓存统计")
+    metrics: Dict[str, Any] = Field(default_factory=dict, description="命中/未命中、API调用、令牌和读取字节等遥测计数")
 
 class HealthResponse(BaseModel):
     """健康检查响应"""
@@ -236,7 +272,7 @@ async def health_check():
     """
     try:
         # 测试缓存功能
-        test_vector = router.get_embedding("health_check_test")
+        test_vector = await router.aget_embedding("health_check_test")
         cache_status = "healthy"
     except Exception as e:
         logger.error(f"缓存健康检查失败: {e}")
@@ -263,6 +299,7 @@ async def create_embedding(request: EmbeddingRequest):
     ## 特性
     - 🧠 **智能缓存**: 自动缓存计算结果，提升性能
     - ⚡ **快速响应**: 缓存命中时毫秒级响应
+    - 📦 **微批处理**: 并发的缓存未命中在短时间窗口内合并为一次批量调用
     - 📊 **性能监控**: 返回详细的性能指标
     
     ## 使用示例
@@ -281,7 +318,7 @@ async def create_embedding(request: EmbeddingRequest):
     start_time = time.time()
     
     try:
-        vector = router.get_embedding(
+        vector = await dispatcher.submit(
             request.text,
             use_cache=request.use_cache,
             metadata=request.metadata
@@ -289,8 +326,8 @@ async def create_embedding(request: EmbeddingRequest):
         
         processing_time = time.time() - start_time
         
-        # 检查是否来自缓存（简化检查）
-        cached = processing_time < 0.1  # 如果处理时间很短，可能来自缓存
+        # 从router获取本次调用的真实缓存命中情况
+        cached = router.get_last_call_stats()['cache_hits'] == 1
         
         return EmbeddingResponse(
             vector=vector,
@@ -342,7 +379,7 @@ async def create_embeddings_batch(request: BatchEmbeddingRequest):
         # 计算单独处理的预估时间
         estimated_individual_time = len(request.texts) * 0.8  # 假设每个文本0.8秒
         
-        vectors = router.get_embeddings_batch(
+        vectors = await router.aget_embeddings_batch(
             request.texts,
             use_cache=request.use_cache,
             metadata=request.metadata
@@ -353,14 +390,12 @@ async def create_embeddings_batch(request: BatchEmbeddingRequest):
         # 计算性能提升
         performance_gain = max(0, (estimated_individual_time - processing_time) / estimated_individual_time * 100)
         
-        # 简化的缓存统计（实际实现中应该从router获取）
-        cache_hits = max(0, len(request.texts) - int(processing_time / 0.3))
-        cache_misses = len(request.texts) - cache_hits
-        
+        # 本次调用的真实缓存统计
+        call_stats = router.get_last_call_stats()
         return BatchEmbeddingResponse(
             vectors=vectors,
-            cache_hits=cache_hits,
-            cache_misses=cache_misses,
+            cache_hits=call_stats['cache_hits'],
+            cache_misses=call_stats['cache_misses'],
             processing_time=processing_time,
             performance_gain=performance_gain
         )
@@ -408,13 +443,16 @@ async def create_memory(request: MemoryRequest):
     start_time = time.time()
     
     try:
-        uuid = write_memory(
+        # 写入仍是同步调用，放到工作线程中执行以免阻塞事件循环
+        uuid = await asyncio.to_thread(
+            write_memory,
             content=request.content,
             project=request.project,
             repo=request.repo,
             agent=request.agent,
             tags=request.tags,
-            source=request.source
+            source=request.source,
+            upsert=request.upsert
         )
         
         processing_time = time.time() - start_time
@@ -448,6 +486,8 @@ async def create_memories_batch(request: BatchMemoryRequest):
     - ⚡ **高吞吐**: 支持每分钟数千条记录
     - 🔧 **自动优化**: 智能批次大小调整
     - 📊 **详细统计**: 返回处理成功率和性能数据
+    - 🔁 **部分成功**: 单条失败不影响其他记录，`results` 给出每条的UUID或错误；超时、过载等临时性错误只重试失败的记录
+    - ♻️ **幂等写入**: `upsert=true` 时UUID由内容派生，已存在的记录在向量化之前被一次性识别并跳过（`existed=true`），重复导入几乎零成本
     
     ## 使用示例
     ```python
@@ -496,17 +536,37 @@ async def create_memories_batch(request: BatchMemoryRequest):
                 "source": memory.source
             })
         
-        uuids = write_memories_batch(memory_dicts)
+        # 部分成功：失败的记录不影响其他记录，临时性错误只重试失败的记录
+        results = await asyncio.to_thread(
+            write_memories_batch_detailed, memory_dicts, upsert=request.upsert, **weaviate_batch_options
+        )
         
         processing_time = time.time() - start_time
         
+        uuids = [result.uuid for result in results if result.success]
+        if not uuids:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"批量内存写入失败: {results[0].error}"
+            )
+        if len(uuids) < len(results):
+            logger.warning(f"批量内存写入部分失败: {len(results) - len(uuids)}/{len(results)} 条")
+        
         return BatchMemoryResponse(
             uuids=uuids,
+            results=[
+                BatchMemoryItemResult(
+                    index=i, uuid=result.uuid, error=result.error, attempts=result.attempts, existed=result.existed
+                )
+                for i, result in enumerate(results)
+            ],
             success_count=len(uuids),
             total_count=len(request.memories),
             processing_time=processing_time
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"批量内存写入失败: {e}")
         raise HTTPException(
@@ -529,14 +589,22 @@ async def get_cache_info():
     - 📊 **条目统计**: 缓存中的条目总数
     - 💾 **存储大小**: 缓存占用的磁盘空间
     - 🎯 **命中率**: 缓存的效果评估
+    - 🗂️ **模型分段**: 每个模型缓存分段的条目数和大小
+    - 📈 **遥测**: 命中/未命中、API调用次数、发送令牌数、读取字节数及窗口速率
+    - 🚦 **限流**: 客户端令牌桶等待及429退避重试的累计时间（throttled_seconds）和重试次数
+    - ⏱️ **微批处理**: 批次数、平均批大小及排队等待时间（平均/最大，毫秒）
+    
+    统计信息由缓存清单增量维护，查询耗时与缓存大小无关。
     """
     try:
-        cache_info = router.get_cache_info()
+        cache_info = await router.aget_cache_info()
         
         return CacheInfo(
             num_entries=cache_info.get('num_entries', 0),
             total_size_bytes=cache_info.get('total_size_bytes', 0),
-            hit_rate=cache_info.get('hit_rate', 0.0)
+            hit_rate=cache_info.get('hit_rate', 0.0),
+            segments=cache_info.get('segments', {}),
+            metrics={**cache_info.get('metrics', {}), 'micro_batching': dispatcher.stats()}
         )
         
     except Exception as e:
@@ -562,7 +630,7 @@ async def clear_cache():
     - 🐛 **故障恢复**: 解决缓存损坏问题
     """
     try:
-        router.clear_cache()
+        await router.aclear_cache(all_segments=True)
         
         return {
             "message": "缓存已清空",
@@ -576,6 +644,12 @@ async def clear_cache():
             detail=f"清空缓存失败: {str(e)}"
         )
 
+@app.on_event("shutdown")
+async def close_router():
+    """处理完排队的请求，将后台待写入的向量落盘，关闭异步客户端并停止缓存维护"""
+    await dispatcher.drain()
+    await router.aclose()
+
 # ================================
 # 异常处理
 # ================================
@@ -46,7 +46,8 @@ def check_dependencies():
 
 def check_environment():
     """检查环境变量"""
-    required_env_vars = ['OPENAI_API_KEY']
+    # 离线提供者（如 deterministic）不需要 OpenAI 密钥
+    required_env_vars = ['OPENAI_API_KEY'] if os.getenv('EMBEDDING_PROVIDER', 'openai') == 'openai' else []
     missing_vars = []
     
     for var in required_env_vars:
@@ -88,6 +89,8 @@ def start_production():
     import multiprocessing
     
     workers = multiprocessing.cpu_count()
+    # 多个工作进程共享同一缓存目录：使用支持多进程并发读写的 SQLite 缓存
+    os.environ.setdefault("EMBEDDING_CACHE_BACKEND", "sqlite")
     print(f"🚀 启动生产模式（{workers} 个工作进程）...")
     print("📍 API地址: http://0.0.0.0:8000")
     
@@ -106,6 +109,8 @@ def start_custom(host, port, workers, reload):
     print(f"📍 地址: http://{host}:{port}")
     print(f"📍 工作进程: {workers}")
     print(f"📍 热重载: {'开启' if reload else '关闭'}")
+    if workers > 1 and not reload:
+        os.environ.setdefault("EMBEDDING_CACHE_BACKEND", "sqlite")
     
     uvicorn.run(
         "api.main:app",
@@ -266,7 +266,7 @@ def example_6_error_handling():
     
     # 测试过长批次错误  
     try:
-        long_texts = [f"文本 {i}" for i in range(150)]  # 超过100个限制
+        long_texts = [f"文本 {i}" for i in range(10001)]  # 超过10000个限制
         result = api.embed_texts_batch(long_texts)
     except requests.exceptions.HTTPError as e:
         print(f"❌ 批量大小错误: {e}")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Export, import and verify embedding cache packs.
+
+A pack holds the embedding cache in one compressed, checksummed file, so a
+warm cache can be baked into container images or synced between nodes
+instead of every node paying for the same embeddings again. Each existing
+segment is read and written with the backend its files belong to. No embeddings
+are requested, but importing the vector package still expects the same
+environment as the API (OPENAI_API_KEY or EMBEDDING_PROVIDER).
+
+Usage:
+    python scripts/cache_pack.py export embeddings.pack --model text-embedding-ada-002 --max-age-days 30
+    python scripts/cache_pack.py import embeddings.pack --mode merge
+    python scripts/cache_pack.py verify embeddings.pack
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Make the vector package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector.cache_pack import (
+    IMPORT_MODES, CachePackError, export_cache_pack, import_cache_pack, verify_cache_pack
+)
+from vector.quantization import PRECISIONS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import and verify embedding cache packs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("export", "import"):
+        sub = subparsers.add_parser(command, help=f"{command.capitalize()} a cache pack")
+        sub.add_argument("pack", type=Path, help="Pack file")
+        sub.add_argument("--cache-dir", default=".cache/embeddings", help="Embedding cache directory")
+        sub.add_argument("--model", action="append", dest="models",
+                         help="Only include this model or segment (repeatable)")
+        sub.add_argument("--max-age-days", type=float, default=None,
+                         help="Only include entries cached within this many days")
+        if command == "export":
+            sub.add_argument("--precision", choices=PRECISIONS, default="float32",
+                             help="Vector encoding inside the pack (default: float32)")
+        else:
+            sub.add_argument("--mode", choices=IMPORT_MODES, default="merge",
+                             help="merge keeps existing entries, replace clears imported segments first")
+            sub.add_argument("--cache-backend", default="json",
+                             help="Cache backend for new segments: json, packed or sqlite "
+                                  "(existing segments keep their own)")
+
+    verify = subparsers.add_parser("verify", help="Check a pack's checksum and show its contents")
+    verify.add_argument("pack", type=Path, help="Pack file")
+
+    args = parser.parse_args()
+    max_age_seconds = getattr(args, 'max_age_days', None)
+    if max_age_seconds is not None:
+        max_age_seconds *= 86400
+
+    try:
+        if args.command == "export":
+            result = export_cache_pack(
+                args.cache_dir, args.pack,
+                models=args.models,
+                max_age_seconds=max_age_seconds,
+                precision=args.precision
+            )
+            print(f"✅ Exported {result['num_entries']} entries to {args.pack} ({result['size_bytes']} bytes)")
+        elif args.command == "import":
+            result = import_cache_pack(
+                args.pack, args.cache_dir,
+                models=args.models,
+                max_age_seconds=max_age_seconds,
+                mode=args.mode,
+                backend=args.cache_backend
+            )
+            print(f"✅ Imported {result['imported']} entries ({result['skipped']} skipped)")
+        else:
+            result = verify_cache_pack(args.pack)
+            print(f"✅ {args.pack} is valid")
+        print(json.dumps(result['segments'], indent=2))
+    except (CachePackError, ValueError, OSError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
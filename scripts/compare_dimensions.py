@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the search recall of reduced embedding dimensions.
+
+Reads recently cached vectors of one model (no embeddings are requested),
+reduces them to each candidate dimension and reports how many of the true
+nearest neighbours are still found, next to the storage per vector. The
+smallest candidate reaching --min-recall is recommended. For models
+without the ``dimensions`` parameter (ada-002) the vectors are reduced with
+a PCA projection fitted on the sample, which --save-projection writes out
+for the router's ``projection`` option (requires numpy).
+
+Importing the vector package expects the same environment as the API
+(OPENAI_API_KEY or EMBEDDING_PROVIDER).
+
+Usage:
+    python scripts/compare_dimensions.py --model text-embedding-3-small --dimensions 256 512 768 1024
+    python scripts/compare_dimensions.py --dimensions 256 384 512 --save-projection projections/ada-002.json
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Make the vector package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector.embedding_router import EmbeddingRouter
+from vector.dimension_reduction import REDUCTION_METHODS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the recall of reduced embedding dimensions")
+    parser.add_argument("--dimensions", type=int, nargs="+", required=True, help="Candidate dimensions")
+    parser.add_argument("--model", default="text-embedding-ada-002", help="Embedding model")
+    parser.add_argument("--cache-dir", default=".cache/embeddings", help="Embedding cache directory")
+    parser.add_argument("--cache-backend", default="json", help="Cache backend: json, packed or sqlite")
+    parser.add_argument("--provider", default=None, help="Embedding provider (default: EMBEDDING_PROVIDER or openai)")
+    parser.add_argument("--method", choices=REDUCTION_METHODS, default=None,
+                        help="truncate or pca (default: truncate if the model supports dimensions)")
+    parser.add_argument("--sample", type=int, default=1000, help="Cached vectors to evaluate (default: 1000)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--min-recall", type=float, default=0.9,
+                        help="Recall the recommended dimension must reach (default: 0.9)")
+    parser.add_argument("--save-projection", type=Path, default=None,
+                        help="Fit a PCA projection for the recommended dimension and save it here")
+    args = parser.parse_args()
+
+    try:
+        router = EmbeddingRouter(
+            cache_dir=args.cache_dir,
+            model=args.model,
+            cache_backend=args.cache_backend,
+            memory_cache_entries=0,
+            provider=args.provider
+        )
+    except ValueError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        report = router.dimension_report(args.dimensions, sample_size=args.sample, k=args.k, method=args.method)
+        print(f"{'dimensions':>10}  {'recall@' + str(args.k):>9}  {'bytes/vector':>12}  {'size':>6}")
+        for row in report:
+            print(f"{row['dimensions']:>10}  {row['recall_at_k']:>9.3f}  "
+                  f"{row['bytes_per_vector']:>12}  {row['size_ratio']:>6.1%}")
+
+        acceptable = [row for row in report if row['recall_at_k'] >= args.min_recall]
+        if not acceptable:
+            print(f"⚠️ No candidate reaches recall@{args.k} >= {args.min_recall}")
+            sys.exit(2)
+        best = acceptable[0]['dimensions']
+        print(f"✅ Smallest dimension with recall@{args.k} >= {args.min_recall}: {best}")
+
+        if args.save_projection is not None:
+            projection = router.fit_projection(best, sample_size=args.sample)
+            projection.save(args.save_projection)
+            print(f"✅ Saved {projection.source_dimensions}→{projection.dimensions} projection "
+                  f"({projection.fingerprint}) to {args.save_projection}")
+    except (ValueError, ImportError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        router.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Bulk-import memories from an NDJSON file into Weaviate.
+
+Each line holds one memory object with the fields of ``/memory``
+(content, project, repo, agent, tags and optionally source). Memories are
+validated, embedded and written in rolling batches with bounded memory, so
+files with millions of lines can be imported. Invalid lines and failed
+writes do not stop the import; they are counted and, with --errors, written
+to an NDJSON file of ``{"line": ..., "error": ...}`` records. With --upsert,
+memories get content-derived UUIDs and those already stored are skipped
+without being embedded, so an interrupted import can simply be re-run.
+
+Usage:
+    python scripts/ingest_memories.py memories.ndjson --batch-size 200 --parallel 4
+    python scripts/ingest_memories.py memories.ndjson --upsert
+    zcat export.ndjson.gz | python scripts/ingest_memories.py - --errors failed.ndjson
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Make the vector package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector.ingest import ingest_memories
+from vector.rate_limit import RetryPolicy
+
+
+def _print_progress(stats, final: bool = False):
+    print(
+        f"{'✅' if final else '⏳'} records {stats['records']} | written {stats['written']} | "
+        f"existing {stats['existing']} | invalid {stats['invalid']} | failed {stats['failed']} | "
+        f"{stats['memories_per_second']:.1f} memories/s",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import memories from an NDJSON file into Weaviate")
+    parser.add_argument("input", help="NDJSON file, or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=100, help="Memories per batch (default: 100)")
+    parser.add_argument("--parallel", type=int, default=2, help="Batches in flight (default: 2)")
+    parser.add_argument("--weaviate-workers", type=int, default=1,
+                        help="Concurrent Weaviate batch requests per batch (default: 1)")
+    parser.add_argument("--dynamic", action="store_true", help="Let Weaviate's client adapt the batch size")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="Resubmissions of transiently failed memories (default: 3)")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Skip memories that are already stored (idempotent re-runs)")
+    parser.add_argument("--errors", type=Path, default=None, help="Write rejected lines to this NDJSON file")
+    parser.add_argument("--progress-interval", type=float, default=2.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    if args.input != "-" and not Path(args.input).is_file():
+        print(f"❌ Input file not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    errors_file = args.errors.open('w', encoding='utf-8') if args.errors else None
+
+    def on_error(line: int, error: str):
+        if errors_file is not None:
+            errors_file.write(json.dumps({"line": line, "error": error}, ensure_ascii=False) + "\n")
+
+    try:
+        stats = ingest_memories(
+            sys.stdin if args.input == "-" else args.input,
+            batch_size=args.batch_size,
+            parallel=args.parallel,
+            write_options={
+                "batch_size": args.batch_size,
+                "num_workers": args.weaviate_workers,
+                "dynamic": args.dynamic,
+                "retry_policy": RetryPolicy(max_retries=args.max_retries),
+                "upsert": args.upsert
+            },
+            on_error=on_error,
+            on_progress=_print_progress,
+            progress_interval=args.progress_interval
+        )
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted", file=sys.stderr)
+        sys.exit(130)
+    except ValueError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if errors_file is not None:
+            errors_file.close()
+
+    _print_progress(stats, final=True)
+    print(f"Finished in {stats['elapsed_seconds']:.1f}s")
+    if stats['invalid'] or stats['failed']:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Pre-embed a corpus into the embedding cache.
+
+Streams texts from a TXT file (one text per line) or a JSONL file (one
+object per line, text taken from --field, or a bare JSON string), skips
+texts that are already cached and embeds the rest in throttled parallel
+batches. Progress is checkpointed, so an interrupted warm-up continues
+where it stopped when run again with the same arguments.
+
+The router is configured from the same EMBEDDING_* environment variables
+as the API (model, cache backend, chunking, dimensions, PCA projection),
+so the warmed segment is the one the API reads. --model and
+--cache-backend override them.
+
+Usage:
+    python scripts/warm_cache.py docs/faq.jsonl --field question
+    python scripts/warm_cache.py corpus.txt --batch-size 200 --parallel 8 --rpm 3000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Dict, List
+
+# Make the vector package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector.embedding import router_options_from_env
+from vector.embedding_router import EmbeddingRouter
+
+
+def iter_texts(path: Path, field: str = "text", start_line: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    Stream ``(line_number, text)`` pairs from a TXT or JSONL file.
+
+    Blank lines and JSONL records without a usable text are skipped.
+
+    Args:
+        path (Path): Input file; ``.jsonl``/``.json`` files are parsed as JSONL
+        field (str): JSONL key holding the text
+        start_line (int): Number of lines to skip, e.g. from a checkpoint
+
+    Yields:
+        Tuple[int, str]: One-based line number and text
+    """
+    is_jsonl = path.suffix.lower() in (".jsonl", ".json")
+    with path.open('r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number <= start_line:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            if is_jsonl:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping invalid JSON on line {line_number}", file=sys.stderr)
+                    continue
+                text = record.get(field) if isinstance(record, dict) else record
+                if not isinstance(text, str) or not text.strip():
+                    continue
+                line = text
+            yield line_number, line
+
+
+def count_lines(path: Path) -> int:
+    """Count the lines of ``path`` for progress and ETA reporting."""
+    with path.open('rb') as f:
+        return sum(1 for _ in f)
+
+
+def load_checkpoint(checkpoint_path: Path, input_path: Path) -> Dict:
+    """
+    Load the checkpoint of a previous run over ``input_path``.
+
+    Returns:
+        Dict: ``line`` (lines fully processed), ``embedded`` and ``skipped``;
+        all 0 if there is no checkpoint for this input
+    """
+    empty = {'line': 0, 'embedded': 0, 'skipped': 0}
+    if not checkpoint_path.exists():
+        return empty
+    try:
+        checkpoint = json.loads(checkpoint_path.read_text(encoding='utf-8'))
+    except (json.JSONDecodeError, OSError):
+        return empty
+    if checkpoint.get('input') != str(input_path.resolve()):
+        return empty
+    return {key: checkpoint.get(key, 0) for key in empty}
+
+
+def save_checkpoint(checkpoint_path: Path, input_path: Path, progress: Dict):
+    """Atomically write the checkpoint so a crash never leaves it half-written."""
+    tmp_path = checkpoint_path.with_name(f".{checkpoint_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({
+        'input': str(input_path.resolve()),
+        'updated_at': time.time(),
+        **progress
+    }), encoding='utf-8')
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _embed_batch(router: EmbeddingRouter, texts: List[str]) -> Tuple[int, int]:
+    router.get_embeddings_batch(texts)
+    stats = router.get_last_call_stats()
+    return stats['cache_misses'], stats['cache_hits']
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def warm_cache(
+    router: EmbeddingRouter,
+    input_path: Path,
+    field: str = "text",
+    batch_size: int = 100,
+    parallel: int = 4,
+    checkpoint_path: Optional[Path] = None,
+    progress_interval: float = 2.0,
+    quiet: bool = False
+) -> Dict:
+    """
+    Embed every text of ``input_path`` that is not cached yet.
+
+    Batches run concurrently on ``parallel`` threads; the router's rate
+    limiter throttles them. The checkpoint records the last line before
+    which every batch has completed, so resuming never skips unfinished
+    work (a few completed batches may be looked up again, which only costs
+    cache hits).
+
+    Args:
+        router (EmbeddingRouter): Router whose cache segment is warmed
+        input_path (Path): TXT or JSONL corpus
+        field (str): JSONL key holding the text
+        batch_size (int): Texts per batch
+        parallel (int): Maximum number of batches in flight
+        checkpoint_path (Path, optional): Where to checkpoint progress.
+            None disables checkpointing.
+        progress_interval (float): Seconds between progress lines
+        quiet (bool): Suppress progress output
+
+    Returns:
+        Dict: ``embedded`` and ``skipped`` (already cached) texts, ``line``
+        reached and ``elapsed_seconds`` of this run
+    """
+    progress = load_checkpoint(checkpoint_path, input_path) if checkpoint_path else {'line': 0, 'embedded': 0, 'skipped': 0}
+    if progress['line'] and not quiet:
+        print(f"↩️ Resuming after line {progress['line']}")
+    total_lines = count_lines(input_path)
+    start_line = progress['line']
+    started = time.monotonic()
+    last_report = started
+    done_this_run = 0
+
+    def report(final: bool = False):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        rate = done_this_run / elapsed
+        lines_rate = (progress['line'] - start_line) / elapsed
+        eta = (total_lines - progress['line']) / lines_rate if lines_rate else 0
+        percent = 100 * progress['line'] / total_lines if total_lines else 100
+        print(
+            f"{'✅' if final else '⏳'} line {progress['line']}/{total_lines} ({percent:.1f}%) | "
+            f"embedded {progress['embedded']} | cached {progress['skipped']} | "
+            f"{rate:.1f} texts/s | ETA {_format_eta(eta)}",
+            flush=True
+        )
+
+    def complete(future, end_line: int):
+        nonlocal done_this_run
+        embedded, skipped = future.result()
+        progress['embedded'] += embedded
+        progress['skipped'] += skipped
+        progress['line'] = end_line
+        done_this_run += embedded + skipped
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, input_path, progress)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="warm-cache") as executor:
+        batch: List[str] = []
+        for line_number, text in iter_texts(input_path, field, start_line):
+            batch.append(text)
+            if len(batch) < batch_size:
+                continue
+            pending.append((executor.submit(_embed_batch, router, batch), line_number))
+            batch = []
+            # Bound memory: wait for the oldest batch once enough are queued
+            while len(pending) >= 2 * parallel or (pending and pending[0][0].done()):
+                complete(*pending.popleft())
+            if not quiet and time.monotonic() - last_report >= progress_interval:
+                report()
+                last_report = time.monotonic()
+        if batch:
+            pending.append((executor.submit(_embed_batch, router, batch), total_lines))
+        while pending:
+            complete(*pending.popleft())
+
+    progress['line'] = total_lines
+    if checkpoint_path:
+        save_checkpoint(checkpoint_path, input_path, progress)
+    if not quiet:
+        report(final=True)
+    return {**progress, 'elapsed_seconds': time.monotonic() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-embed a TXT/JSONL corpus into the embedding cache")
+    parser.add_argument("input", type=Path, help="TXT (one text per line) or JSONL file")
+    parser.add_argument("--field", default="text", help="JSONL key holding the text (default: text)")
+    parser.add_argument("--model", default=None,
+                        help="Embedding model (default: EMBEDDING_MODEL or text-embedding-ada-002)")
+    parser.add_argument("--cache-dir", default=".cache/embeddings", help="Embedding cache directory")
+    parser.add_argument("--cache-backend", default=None,
+                        help="Cache backend: json, packed or sqlite (default: EMBEDDING_CACHE_BACKEND or json)")
+    parser.add_argument("--provider", default=None, help="Embedding provider (default: EMBEDDING_PROVIDER or openai)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Texts per batch (default: 100)")
+    parser.add_argument("--parallel", type=int, default=4, help="Batches in flight (default: 4)")
+    parser.add_argument("--rpm", type=float, default=3000, help="Requests per minute budget (default: 3000)")
+    parser.add_argument("--tpm", type=float, default=1000000, help="Tokens per minute budget (default: 1000000)")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="Checkpoint file (default: <input>.warm-checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if not args.input.is_file():
+        print(f"❌ Input file not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    checkpoint_path = args.checkpoint or args.input.with_name(args.input.name + ".warm-checkpoint.json")
+    if args.restart and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    try:
+        options = router_options_from_env()
+        if args.model:
+            options['model'] = args.model
+        if args.cache_backend:
+            options['cache_backend'] = args.cache_backend
+        router = EmbeddingRouter(
+            cache_dir=args.cache_dir,
+            memory_cache_entries=0,
+            provider=args.provider,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            **options
+        )
+    except ValueError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        result = warm_cache(
+            router,
+            args.input,
+            field=args.field,
+            batch_size=args.batch_size,
+            parallel=args.parallel,
+            checkpoint_path=checkpoint_path
+        )
+    except KeyboardInterrupt:
+        print(f"\n⏸️ Interrupted. Run again to resume from {checkpoint_path}", file=sys.stderr)
+        sys.exit(130)
+    except Exception as e:
+        print(f"❌ Warm-up failed: {str(e)}. Run again to resume from {checkpoint_path}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        router.close()
+
+    print(f"Embedded {result['embedded']} texts, {result['skipped']} were already cached "
+          f"({result['elapsed_seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
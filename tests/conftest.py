@@ -0,0 +1,15 @@
+import pytest
+from unittest.mock import Mock
+
+
+def _fake_response(texts, tokens=None):
+    """Build a fake embeddings.create response with a ``[len(text), 0.5]`` vector per text."""
+    response = Mock(data=[Mock(embedding=[float(len(text)), 0.5]) for text in texts])
+    response.usage.total_tokens = len(texts) if tokens is None else tokens
+    return response
+
+
+@pytest.fixture
+def fake_response():
+    """Return a builder of fake embeddings.create responses, called as ``fake_response(texts, tokens=None)``."""
+    return _fake_response
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from openai import OpenAIError
+
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+def _call(router, method, *args, **kwargs):
+    """Run an async router call and return its result with its call stats."""
+    async def run():
+        result = await getattr(router, method)(*args, **kwargs)
+        return result, router.get_last_call_stats()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def router(tmp_path, fake_response):
+    """Create an async router with a mocked async client."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path), max_concurrent_requests=2)
+    router.async_client.embeddings.create = AsyncMock(
+        side_effect=lambda input, model: fake_response(input)
+    )
+    yield router
+    router.close()
+
+
+def test_rejects_invalid_concurrency(tmp_path):
+    """Test that the in-flight limit must be positive."""
+    with pytest.raises(ValueError, match="max_concurrent_requests"):
+        AsyncEmbeddingRouter(cache_dir=str(tmp_path), max_concurrent_requests=0)
+
+
+def test_aget_embedding_uses_shared_cache(router):
+    """Test that async results are cached for the sync API and vice versa."""
+    vector, stats = _call(router, 'aget_embedding', "hello")
+
+    assert vector == [5.0, 0.5]
+    assert stats == {'cache_hits': 0, 'cache_misses': 1, 'api_calls': 1}
+    with patch.object(router.client.embeddings, 'create', side_effect=AssertionError("API call")):
+        assert router.get_embedding("hello") == vector
+
+    router._save_to_cache(router._get_cache_key("sync"), [1.0, 2.0])
+    assert asyncio.run(router.aget_embedding("sync")) == [1.0, 2.0]
+    assert router.async_client.embeddings.create.await_count == 1
+
+
+def test_aget_embeddings_batch_partial_cache(router):
+    """Test that only uncached texts are sent and order is preserved."""
+    asyncio.run(router.aget_embedding("bb"))
+
+    vectors, stats = _call(router, 'aget_embeddings_batch', ["a", "bb", "ccc"], metadata=[{}, {}, {"k": "v"}])
+
+    assert vectors == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+    router.async_client.embeddings.create.assert_awaited_with(input=["a", "ccc"], model=router.model)
+    assert stats == {'cache_hits': 1, 'cache_misses': 2, 'api_calls': 1}
+    assert router.cache.get_metadata(router._get_cache_key("ccc")) == {"k": "v"}
+
+
+def test_aget_embeddings_batch_invalid_input(router):
+    """Test input validation of the async batch call."""
+    with pytest.raises(ValueError, match="non-empty list"):
+        asyncio.run(router.aget_embeddings_batch([]))
+    with pytest.raises(ValueError, match="same length"):
+        asyncio.run(router.aget_embeddings_batch(["a"], metadata=[{}, {}]))
+
+
+def test_async_openai_error(router):
+    """Test that API errors are wrapped like in the sync router."""
+    router.async_client.embeddings.create = AsyncMock(side_effect=OpenAIError("boom"))
+    with pytest.raises(OpenAIError, match="Failed to generate embedding"):
+        asyncio.run(router.aget_embedding("x"))
+    with pytest.raises(OpenAIError, match="Failed to generate batch embeddings"):
+        asyncio.run(router.aget_embeddings_batch(["x"]))
+
+
+def test_in_flight_requests_are_bounded(router, fake_response):
+    """Test that no more than max_concurrent_requests calls run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def slow_create(input, model):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return fake_response(input)
+
+    router.async_client.embeddings.create = slow_create
+
+    async def run():
+        return await asyncio.gather(*(router.aget_embedding(f"text {i}") for i in range(6)))
+
+    assert len(asyncio.run(run())) == 6
+    assert peak == 2
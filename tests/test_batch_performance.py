@@ -6,7 +6,7 @@ import time
 import pytest
 from pathlib import Path
 import shutil
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, MagicMock
 
 from vector.embedding_router import EmbeddingRouter
 from vector.embedding import embed_text, embed_texts_batch
@@ -101,8 +101,9 @@ class TestBatchPerformance:
              patch('vector.memory_writer.embed_text') as mock_embed, \
              patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
             
-            # Setup mocks
-            mock_client_instance = Mock()
+            # Setup mocks; batch writes go through the client's batch context manager
+            mock_client_instance = MagicMock()
+            mock_client_instance.batch.__exit__.return_value = False
             mock_client.return_value = mock_client_instance
             
             # Mock individual embedding calls
@@ -0,0 +1,316 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from vector.cache_backends import (
+    CacheBackend,
+    CacheManifest,
+    JsonDirectoryCache,
+    PackedVectorCache,
+    SqliteCache,
+    create_cache_backend,
+    migrate_json_cache,
+)
+
+# Float32-exact test vectors so round trips compare equal
+VECTOR_A = [0.5, -0.25, 0.125, 1.0]
+VECTOR_B = [0.75, 0.0, -1.5, 2.0]
+
+
+@pytest.fixture
+def packed(tmp_path):
+    """Create a packed cache in a temporary directory."""
+    cache = PackedVectorCache(tmp_path / "packed")
+    yield cache
+    cache.close()
+
+
+def test_packed_put_get(packed):
+    """Test that vectors and metadata round trip through the packed cache."""
+    packed.put("key-a", VECTOR_A, {"source": "test"})
+    packed.put("key-b", VECTOR_B)
+
+    assert packed.get("key-a") == VECTOR_A
+    assert packed.get("key-b") == VECTOR_B
+    assert packed.get_metadata("key-a") == {"source": "test"}
+    assert packed.get_metadata("key-b") == {}
+    assert packed.get("missing") is None
+    assert packed.contains("key-a")
+    assert not packed.contains("missing")
+
+
+def test_packed_uses_segments_not_per_entry_files(packed):
+    """Test that many entries share a single segment file."""
+    for i in range(50):
+        packed.put(f"key-{i}", VECTOR_A)
+
+    files = sorted(p.name for p in packed.cache_dir.iterdir())
+    assert files == ["MANIFEST", "index.bin", "segment-00000.bin"]
+    assert packed.info()['num_entries'] == 50
+
+
+def test_packed_reopen_replays_index(tmp_path):
+    """Test that entries survive closing and reopening the cache."""
+    cache = PackedVectorCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.put("key-b", VECTOR_B)
+    cache.put("key-a", VECTOR_B)  # overwrite
+    cache.delete("key-b")
+    cache.close()
+
+    reopened = PackedVectorCache(tmp_path)
+    try:
+        assert reopened.get("key-a") == VECTOR_B
+        assert reopened.get("key-b") is None
+        assert sorted(reopened.keys()) == ["key-a"]
+    finally:
+        reopened.close()
+
+
+def test_packed_segment_rollover(tmp_path):
+    """Test that a new segment is started once the size limit is reached."""
+    cache = PackedVectorCache(tmp_path, segment_max_bytes=40)
+    try:
+        for i in range(5):
+            cache.put(f"key-{i}", VECTOR_A)
+        assert len(list(tmp_path.glob("segment-*.bin"))) == 5
+        assert all(cache.get(f"key-{i}") == VECTOR_A for i in range(5))
+    finally:
+        cache.close()
+
+
+def test_packed_ignores_torn_index_entry(tmp_path):
+    """Test that a truncated trailing index entry is ignored on open."""
+    cache = PackedVectorCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.close()
+    with (tmp_path / PackedVectorCache.INDEX_FILE).open('ab') as f:
+        f.write(b"\x05\x00\x00")
+
+    reopened = PackedVectorCache(tmp_path)
+    try:
+        assert reopened.get("key-a") == VECTOR_A
+        assert len(reopened) == 1
+    finally:
+        reopened.close()
+
+
+def test_packed_corrupt_record_is_a_miss(tmp_path):
+    """Test that records damaged after indexing read as misses instead of raising."""
+    cache = PackedVectorCache(tmp_path)
+    cache.put("key-a", VECTOR_A, {"source": "test"})
+    cache.put("key-b", VECTOR_B)
+    segment = next(tmp_path.glob("segment-*.bin"))
+    data = segment.read_bytes()
+    meta = json.dumps({"source": "test"}).encode('utf-8')
+    segment.write_bytes(data.replace(meta, b"\xff" * len(meta)))
+
+    try:
+        assert cache.get("key-a") is None
+        assert cache.get_metadata("key-a") is None
+        assert cache.get("key-b") == VECTOR_B
+    finally:
+        cache.close()
+
+
+def test_packed_clear(packed):
+    """Test that clear removes all entries and the cache stays usable."""
+    packed.put("key-a", VECTOR_A)
+    packed.clear()
+    assert packed.info() == {'num_entries': 0, 'total_size_bytes': 0}
+    packed.put("key-b", VECTOR_B)
+    assert packed.get("key-b") == VECTOR_B
+
+
+def test_json_backend_layout(tmp_path):
+    """Test that the JSON backend keeps the original file format."""
+    cache = JsonDirectoryCache(tmp_path)
+    cache.put("key-a", VECTOR_A, {"source": "test"})
+
+    with (tmp_path / "key-a.json").open('r') as f:
+        assert json.load(f) == {"embedding": VECTOR_A, "metadata": {"source": "test"}}
+    assert cache.get_many(["key-a", "missing"]) == {"key-a": VECTOR_A, "missing": None}
+
+
+def test_migrate_json_cache(tmp_path):
+    """Test migration from a JSON directory into the packed backend."""
+    source = JsonDirectoryCache(tmp_path / "json")
+    source.put("key-a", VECTOR_A, {"source": "test"})
+    source.put("key-b", VECTOR_B)
+    (tmp_path / "json" / "corrupt.json").write_text("not json")
+
+    target = PackedVectorCache(tmp_path / "packed")
+    try:
+        copied = migrate_json_cache(tmp_path / "json", target, remove_source=True)
+        assert copied == 2
+        assert target.get("key-a") == VECTOR_A
+        assert target.get_metadata("key-a") == {"source": "test"}
+        assert target.get("key-b") == VECTOR_B
+        assert not (tmp_path / "json" / "key-a.json").exists()
+    finally:
+        target.close()
+
+
+def test_create_cache_backend(tmp_path):
+    """Test backend lookup by name."""
+    assert isinstance(create_cache_backend("json", tmp_path), JsonDirectoryCache)
+    packed = create_cache_backend("packed", tmp_path / "packed")
+    assert isinstance(packed, PackedVectorCache)
+    packed.close()
+
+    with pytest.raises(ValueError, match="Unknown cache backend"):
+        create_cache_backend("nope", tmp_path)
+
+
+def test_cache_backend_requires_storage_methods():
+    """Test that a backend missing storage methods cannot be instantiated."""
+    class PartialCache(CacheBackend):
+        def get(self, cache_key):
+            return None
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialCache()
+
+
+def test_json_manifest_tracks_counts_incrementally(tmp_path):
+    """Test that JSON backend statistics come from the manifest, not a scan."""
+    cache = JsonDirectoryCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.put("key-b", VECTOR_B)
+    cache.put("key-a", VECTOR_B)  # overwrite keeps the count
+    cache.delete("key-b")
+    cache.delete("missing")
+
+    expected_size = (tmp_path / "key-a.json").stat().st_size
+    with patch.object(Path, 'glob', side_effect=AssertionError("directory scan")):
+        assert cache.info() == {'num_entries': 1, 'total_size_bytes': expected_size}
+
+    cache.close()
+    assert CacheManifest.read(tmp_path) == {'num_entries': 1, 'total_size_bytes': expected_size}
+
+
+def test_json_manifest_rebuilt_when_missing(tmp_path):
+    """Test that a directory without a manifest is counted once on open."""
+    JsonDirectoryCache(tmp_path).put("key-a", VECTOR_A)
+    (tmp_path / CacheManifest.FILE_NAME).unlink()
+
+    assert JsonDirectoryCache(tmp_path).info()['num_entries'] == 1
+
+
+def test_compaction_resyncs_manifest(tmp_path):
+    """Test that compaction corrects a manifest that drifted after a crash."""
+    cache = JsonDirectoryCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.manifest.reset(10, 1)
+
+    cache.compact()
+
+    assert cache.info()['num_entries'] == 1
+
+
+def test_packed_manifest_persisted(tmp_path):
+    """Test that the packed backend persists its statistics for other readers."""
+    cache = PackedVectorCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.close()
+    assert CacheManifest.read(tmp_path) == cache.info()
+
+
+def test_json_put_is_atomic(tmp_path):
+    """Test that JSON entries are written via a temp file that never lingers."""
+    cache = JsonDirectoryCache(tmp_path)
+    cache.put("key-a", VECTOR_A)
+    cache.put("key-a", VECTOR_B)
+    assert cache.get("key-a") == VECTOR_B
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name != CacheManifest.FILE_NAME) == ["key-a.json"]
+    assert cache.info()['num_entries'] == 1
+
+
+def test_sqlite_put_get(tmp_path):
+    """Test that the SQLite backend round trips vectors and keeps statistics."""
+    cache = create_cache_backend("sqlite", tmp_path)
+    assert isinstance(cache, SqliteCache)
+    cache.put("key-a", VECTOR_A, {"source": "test"})
+    cache.put_many([("key-b", VECTOR_B, None), ("key-a", VECTOR_B, None)])
+    assert cache.get("key-a") == VECTOR_B
+    assert cache.get_many(["key-b", "missing"]) == {"key-b": VECTOR_B, "missing": None}
+    assert cache.get_metadata("key-b") == {}
+    assert cache.contains("key-b") and not cache.contains("missing")
+    assert cache.recent_keys(1) == ["key-a"]
+    assert cache.info()['num_entries'] == 2
+    assert cache.delete("key-b") and not cache.delete("key-b")
+    assert cache.info()['num_entries'] == 1
+    cache.close()
+
+    reopened = SqliteCache(tmp_path, precision="float16")
+    assert reopened.get("key-a") == VECTOR_B
+    assert CacheManifest.read(tmp_path)['num_entries'] == 1
+    reopened.clear()
+    assert reopened.info() == {'num_entries': 0, 'total_size_bytes': 0}
+    reopened.close()
+
+
+def test_sqlite_shared_between_processes(tmp_path):
+    """Test that concurrent worker processes share one consistent SQLite cache."""
+    code = (
+        "import sys\n"
+        "from vector.cache_backends import SqliteCache\n"
+        "cache = SqliteCache(sys.argv[1])\n"
+        "worker = int(sys.argv[2])\n"
+        "for i in range(100):\n"
+        "    cache.put(f'key-{(worker * 50 + i) % 300}', [float(i), 1.0, 2.0, 3.0])\n"
+        "    assert cache.get(f'key-{i}') is None or len(cache.get(f'key-{i}')) == 4\n"
+        "cache.close()\n"
+    )
+    env = {**os.environ, 'EMBEDDING_PROVIDER': 'deterministic',
+           'PYTHONPATH': str(Path(__file__).resolve().parents[1])}
+    workers = [
+        subprocess.Popen([sys.executable, "-c", code, str(tmp_path), str(worker)], env=env, stderr=subprocess.PIPE)
+        for worker in range(4)
+    ]
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=60)
+        assert worker.returncode == 0, stderr.decode()
+
+    cache = SqliteCache(tmp_path)
+    # Workers wrote keys 0-99, 50-149, 100-199 and 150-249
+    assert cache.info()['num_entries'] == 250
+    assert len(list(cache.keys())) == 250
+    assert all(len(vector) == 4 for vector in cache.get_many(list(cache.keys())).values())
+    cache.close()
+
+
+def test_memory_path_uses_configured_backend(tmp_path):
+    """Test that vector.embedding opens the cache backend named by EMBEDDING_CACHE_BACKEND."""
+    code = (
+        "import vector.embedding as e\n"
+        "e.embed_texts_batch(['first', 'second'])\n"
+        "print(type(e._router.disk_cache).__name__, e._router.get_cache_info()['num_entries'])\n"
+    )
+    env = {**os.environ, 'EMBEDDING_PROVIDER': 'deterministic', 'EMBEDDING_CACHE_BACKEND': 'sqlite',
+           'PYTHONPATH': str(Path(__file__).resolve().parents[1])}
+    output = subprocess.run([sys.executable, "-c", code], env=env, cwd=tmp_path,
+                            capture_output=True, text=True, timeout=60)
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.split() == ["SqliteCache", "2"]
+
+
+def test_use_router_shares_one_router(tmp_path):
+    """Test that an installed router serves the module functions and the previous one is closed."""
+    from vector import embedding
+    from vector.embedding_router import EmbeddingRouter
+
+    previous = EmbeddingRouter(cache_dir=str(tmp_path / "previous"), provider="deterministic")
+    router = EmbeddingRouter(cache_dir=str(tmp_path / "shared"), provider="deterministic")
+    with patch('vector.embedding._router', previous), patch.object(previous, 'close') as mock_close:
+        embedding.use_router(router)
+        embedding.embed_text("memory text")
+        assert embedding._router is router
+    mock_close.assert_called_once()
+    assert router.get_cache_info()['num_entries'] == 1
+    router.close()
+    previous.close()
@@ -0,0 +1,161 @@
+import os
+import time
+import pytest
+
+from vector.cache_backends import JsonDirectoryCache, PackedVectorCache, CacheEntryInfo
+from vector.cache_maintenance import CachePolicy, CacheMaintainer
+from vector.embedding_router import EmbeddingRouter
+
+VECTOR = [0.5, -0.25, 0.125, 1.0]
+
+
+def _fill(cache, keys):
+    for key in keys:
+        cache.put(key, VECTOR)
+
+
+def test_policy_rejects_unknown_eviction():
+    """Test that only LRU and LFU eviction are accepted."""
+    with pytest.raises(ValueError, match="eviction must be one of"):
+        CachePolicy(eviction="random")
+
+
+def test_max_entries_lru(tmp_path):
+    """Test LRU eviction down to the entry limit."""
+    cache = JsonDirectoryCache(tmp_path)
+    _fill(cache, ["a", "b", "c", "d"])
+    maintainer = CacheMaintainer(cache, CachePolicy(max_entries=2))
+    maintainer.touch("a")
+    maintainer.touch("c")
+
+    report = maintainer.run_once()
+
+    assert report['evicted'] == 2
+    assert sorted(cache.keys()) == ["a", "c"]
+
+
+def test_max_entries_lfu(tmp_path):
+    """Test LFU eviction keeps the most frequently used entries."""
+    cache = JsonDirectoryCache(tmp_path)
+    _fill(cache, ["a", "b", "c"])
+    maintainer = CacheMaintainer(cache, CachePolicy(max_entries=1, eviction="lfu"))
+    for _ in range(3):
+        maintainer.touch("b")
+    maintainer.touch("a")
+    maintainer.touch("c")
+
+    maintainer.run_once()
+
+    assert list(cache.keys()) == ["b"]
+
+
+def test_max_size_bytes(tmp_path):
+    """Test eviction down to the byte limit."""
+    cache = PackedVectorCache(tmp_path)
+    try:
+        _fill(cache, ["a", "b", "c"])
+        record_size = cache.info()['total_size_bytes'] // 3
+        report = CacheMaintainer(cache, CachePolicy(max_size_bytes=record_size)).run_once()
+        assert report['evicted'] == 2
+        assert report['remaining_bytes'] == record_size
+        assert cache.info()['num_entries'] == 1
+    finally:
+        cache.close()
+
+
+def test_ttl_expiry(tmp_path):
+    """Test that entries older than the TTL are expired."""
+    cache = JsonDirectoryCache(tmp_path)
+    _fill(cache, ["old", "new"])
+    stale = time.time() - 3600
+    os.utime(cache.path_for("old"), (stale, stale))
+
+    report = CacheMaintainer(cache, CachePolicy(ttl_seconds=60)).run_once()
+
+    assert report['expired'] == 1
+    assert list(cache.keys()) == ["new"]
+
+
+def test_json_compaction_removes_corrupt_entries(tmp_path):
+    """Test that compaction deletes unreadable JSON entries."""
+    cache = JsonDirectoryCache(tmp_path)
+    _fill(cache, ["good"])
+    cache.path_for("bad").write_text("not json")
+    cache.path_for("empty").write_text('{"metadata": {}}')
+
+    report = cache.compact()
+
+    assert report['removed_corrupt'] == 2
+    assert report['reclaimed_bytes'] > 0
+    assert list(cache.keys()) == ["good"]
+
+
+def test_packed_compaction_reclaims_dead_records(tmp_path):
+    """Test that compaction drops overwritten and deleted records."""
+    cache = PackedVectorCache(tmp_path)
+    try:
+        _fill(cache, ["a", "b", "c"])
+        cache.put("a", VECTOR)
+        cache.delete("b")
+        size_before = sum(p.stat().st_size for p in tmp_path.glob("segment-*.bin"))
+
+        report = cache.compact()
+
+        size_after = sum(p.stat().st_size for p in tmp_path.glob("segment-*.bin"))
+        assert report['reclaimed_bytes'] == size_before - size_after
+        assert size_after == cache.info()['total_size_bytes']
+        assert sorted(cache.keys()) == ["a", "c"]
+        assert cache.get("a") == VECTOR
+        cache.put("d", VECTOR)
+    finally:
+        cache.close()
+
+    reopened = PackedVectorCache(tmp_path)
+    try:
+        assert sorted(reopened.keys()) == ["a", "c", "d"]
+    finally:
+        reopened.close()
+
+
+def test_packed_entries_report_creation_time(tmp_path):
+    """Test that packed entries expose their creation time."""
+    cache = PackedVectorCache(tmp_path)
+    try:
+        before = time.time()
+        _fill(cache, ["a"])
+        (entry,) = list(cache.entries())
+        assert isinstance(entry, CacheEntryInfo)
+        assert entry.cache_key == "a"
+        assert entry.created_at >= before - 1
+    finally:
+        cache.close()
+
+
+def test_router_background_maintenance(tmp_path):
+    """Test that the router enforces its cache policy in the background."""
+    router = EmbeddingRouter(
+        cache_dir=str(tmp_path),
+        cache_policy=CachePolicy(max_entries=1),
+        maintenance_interval=0.05
+    )
+    try:
+        router._save_to_cache("a", VECTOR)
+        router._save_to_cache("b", VECTOR)
+        router._load_from_cache("b")
+        deadline = time.time() + 5
+        while router.get_cache_info()['num_entries'] > 1 and time.time() < deadline:
+            time.sleep(0.05)
+        assert router.get_cache_info()['num_entries'] == 1
+        assert router._load_from_cache("b") == VECTOR
+        assert router._load_from_cache("a") is None
+    finally:
+        router.close()
+
+
+def test_router_maintenance_requires_policy(tmp_path):
+    """Test that manual maintenance needs a policy but compaction does not."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="No cache_policy"):
+        router.run_cache_maintenance()
+    router._get_cache_path("broken").write_text("not json")
+    assert router.compact_cache()['removed_corrupt'] == 1
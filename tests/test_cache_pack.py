@@ -0,0 +1,154 @@
+import os
+import gzip
+import time
+
+import pytest
+
+from vector.cache_pack import CachePackError, export_cache_pack, import_cache_pack, verify_cache_pack
+from vector.cache_backends import (
+    CacheManifest, JsonDirectoryCache, PackedVectorCache, SqliteCache, create_cache_backend
+)
+from vector.providers import DeterministicProvider
+from vector.embedding_router import EmbeddingRouter
+
+
+def _router(cache_dir, **kwargs):
+    return EmbeddingRouter(cache_dir=str(cache_dir), provider=DeterministicProvider(dimensions=8), **kwargs)
+
+
+def test_export_import_roundtrip(tmp_path):
+    """Test that a pack restores the same vectors on another node."""
+    source = _router(tmp_path / "a")
+    texts = [f"text {i}" for i in range(20)]
+    vectors = source.get_embeddings_batch(texts, metadata=[{'i': i} for i in range(20)])
+    report = source.export_cache(tmp_path / "cache.pack")
+    assert report['num_entries'] == 20
+    assert report['segments'] == {"deterministic-8": 20}
+
+    info = verify_cache_pack(tmp_path / "cache.pack")
+    assert info['segments']["deterministic-8"] == {'num_entries': 20, 'dim': 8}
+
+    target = _router(tmp_path / "b", cache_backend="packed")
+    assert target.import_cache(tmp_path / "cache.pack")['imported'] == 20
+    for restored, original in zip(target.get_embeddings_batch(texts), vectors):
+        assert restored == pytest.approx(original, abs=1e-6)
+    assert target.get_last_call_stats()['cache_hits'] == 20
+    assert target.disk_cache.get_metadata(target._get_cache_key("text 3")) == {'i': 3}
+    source.close()
+    target.close()
+
+
+def test_import_merge_and_replace(tmp_path):
+    """Test that merge keeps existing entries and replace clears the segment first."""
+    source = _router(tmp_path / "a")
+    source.get_embeddings_batch(["a", "b"])
+    source.export_cache(tmp_path / "cache.pack")
+
+    target = _router(tmp_path / "b")
+    target.get_embeddings_batch(["b", "c"])
+    report = target.import_cache(tmp_path / "cache.pack")
+    assert report['imported'] == 1
+    assert report['skipped'] == 1
+    assert target.get_cache_info()['num_entries'] == 3
+
+    target.import_cache(tmp_path / "cache.pack", mode="replace")
+    assert target.get_cache_info()['num_entries'] == 2
+    assert not target.cache.contains(target._get_cache_key("c"))
+    with pytest.raises(ValueError, match="mode"):
+        target.import_cache(tmp_path / "cache.pack", mode="overwrite")
+    source.close()
+    target.close()
+
+
+def test_model_and_age_filters(tmp_path):
+    """Test filtering segments by model and entries by age."""
+    cache_dir = tmp_path / "cache"
+    old = JsonDirectoryCache(cache_dir / "text-embedding-ada-002-1536")
+    old.put("old", [1.0, 0.0])
+    old.put("new", [0.0, 1.0])
+    past = time.time() - 10 * 86400
+    os.utime(old.path_for("old"), (past, past))
+    PackedVectorCache(cache_dir / "text-embedding-3-small-1536").put("small", [0.5, 0.5])
+
+    report = export_cache_pack(cache_dir, tmp_path / "ada.pack", models=["text-embedding-ada-002"])
+    assert report['segments'] == {"text-embedding-ada-002-1536": 2}
+
+    report = export_cache_pack(cache_dir, tmp_path / "recent.pack", models=["text-embedding-ada-002"],
+                               max_age_seconds=86400)
+    assert report['num_entries'] == 1
+
+    report = import_cache_pack(tmp_path / "ada.pack", tmp_path / "restored", max_age_seconds=86400)
+    assert report == {'imported': 1, 'skipped': 1, 'segments': {"text-embedding-ada-002-1536": 1}}
+    assert JsonDirectoryCache(tmp_path / "restored" / "text-embedding-ada-002-1536").get("new") == [0.0, 1.0]
+
+
+def test_corrupt_pack_rejected(tmp_path):
+    """Test that a tampered or truncated pack is rejected before anything is imported."""
+    source = _router(tmp_path / "a")
+    source.get_embeddings_batch(["a", "b", "c"])
+    pack = tmp_path / "cache.pack"
+    source.export_cache(pack)
+
+    lines = gzip.decompress(pack.read_bytes()).splitlines(keepends=True)
+    tampered = tmp_path / "tampered.pack"
+    tampered.write_bytes(gzip.compress(b"".join(lines[:1] + [lines[2], lines[2]] + lines[3:])))
+    truncated = tmp_path / "truncated.pack"
+    truncated.write_bytes(gzip.compress(b"".join(lines[:-1])))
+    for bad in (tampered, truncated):
+        with pytest.raises(CachePackError):
+            import_cache_pack(bad, tmp_path / "b")
+    assert not (tmp_path / "b" / "deterministic-8").exists() or not list((tmp_path / "b" / "deterministic-8").glob("*.json"))
+
+    (tmp_path / "garbage.pack").write_bytes(b"not a pack")
+    with pytest.raises(CachePackError):
+        verify_cache_pack(tmp_path / "garbage.pack")
+    source.close()
+
+
+def test_segments_use_their_own_backend(tmp_path):
+    """Test that export and import detect each segment's backend from its files."""
+    cache_dir = tmp_path / "cache"
+    sqlite = SqliteCache(cache_dir / "text-embedding-3-small-1536")
+    sqlite.put("small", [0.5, 0.5])
+    sqlite.close()
+    report = export_cache_pack(cache_dir, tmp_path / "cache.pack")
+    assert report['segments'] == {"text-embedding-3-small-1536": 1}
+
+    packed = PackedVectorCache(tmp_path / "restored" / "text-embedding-3-small-1536")
+    packed.close()
+    import_cache_pack(tmp_path / "cache.pack", tmp_path / "restored", backend="sqlite")
+    restored = PackedVectorCache(tmp_path / "restored" / "text-embedding-3-small-1536")
+    assert restored.get("small") == [0.5, 0.5]
+    assert not (tmp_path / "restored" / "text-embedding-3-small-1536" / SqliteCache.DB_FILE).exists()
+    restored.close()
+
+
+def test_unreadable_segment_fails_export(tmp_path):
+    """Test that a segment whose entries cannot be read is reported instead of exported as empty."""
+    segment = tmp_path / "cache" / "text-embedding-ada-002-1536"
+    segment.mkdir(parents=True)
+    (segment / "vectors.dat").write_bytes(b"unknown layout")
+    with pytest.raises(CachePackError, match="no readable cache entries"):
+        export_cache_pack(tmp_path / "cache", tmp_path / "cache.pack")
+
+    CacheManifest(segment).reset(0, 0)
+    assert export_cache_pack(tmp_path / "cache", tmp_path / "cache.pack")['num_entries'] == 0
+    CacheManifest(segment).reset(3, 300)
+    with pytest.raises(CachePackError):
+        export_cache_pack(tmp_path / "cache", tmp_path / "cache.pack")
+
+
+@pytest.mark.parametrize("backend", ["json", "packed", "sqlite"])
+def test_import_keeps_created_at(tmp_path, backend):
+    """Test that imported entries keep their original age for TTL expiry."""
+    source = JsonDirectoryCache(tmp_path / "cache" / "text-embedding-ada-002-1536")
+    source.put("old", [1.0, 0.0])
+    past = time.time() - 10 * 86400
+    os.utime(source.path_for("old"), (past, past))
+    export_cache_pack(tmp_path / "cache", tmp_path / "cache.pack")
+
+    import_cache_pack(tmp_path / "cache.pack", tmp_path / "restored", backend=backend)
+    target = create_cache_backend(backend, tmp_path / "restored" / "text-embedding-ada-002-1536")
+    [entry] = list(target.entries())
+    assert entry.created_at == pytest.approx(past, abs=1)
+    target.close()
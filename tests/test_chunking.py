@@ -0,0 +1,150 @@
+import asyncio
+import math
+
+import pytest
+from unittest.mock import Mock, patch
+
+from vector.chunking import TextChunker, pool_vectors
+from vector.providers import DeterministicProvider
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+from vector.embedding import router_options_from_env
+from vector.memory_writer import write_memory
+
+
+class CountingProvider(DeterministicProvider):
+    """Deterministic provider that records every text it embeds."""
+
+    def __init__(self):
+        super().__init__(dimensions=8)
+        self.embedded = []
+
+    def embed(self, texts, model):
+        self.embedded.extend(texts)
+        return super().embed(texts, model)
+
+    async def aembed(self, texts, model):
+        self.embedded.extend(texts)
+        return await super().aembed(texts, model)
+
+
+def _paragraphs(count, words=30, prefix="p"):
+    return "\n\n".join(" ".join(f"{prefix}{i}w{j}" for j in range(words)) for i in range(count))
+
+
+def test_chunks_respect_budget_and_overlap():
+    """Test that chunks stay within the token budget and repeat the overlap."""
+    chunker = TextChunker(max_tokens=200, overlap_tokens=20)
+    text = _paragraphs(20)
+    chunks = chunker.split(text)
+    assert len(chunks) > 1
+    assert all(tokens <= 200 and not chunker.needs_split(chunk) for chunk, tokens in chunks)
+    # Each chunk starts with (at least 20 characters of) the previous one's tail
+    for (previous, _), (chunk, _) in zip(chunks, chunks[1:]):
+        assert any(previous.endswith(chunk[:k]) for k in range(20, len(chunk)))
+
+    assert chunker.split("short text") == [("short text", chunker.count_tokens("short text"))]
+    assert not chunker.needs_split("short text")
+
+
+def test_editing_a_paragraph_keeps_other_chunks():
+    """Test that boundaries are content-defined, so growing one paragraph leaves distant chunks intact."""
+    chunker = TextChunker(max_tokens=120)
+    paragraphs = _paragraphs(8).split("\n\n")
+    original = [chunk for chunk, _ in chunker.split("\n\n".join(paragraphs))]
+    for edited_index in (0, 4):
+        edited = list(paragraphs)
+        edited[edited_index] += " with several words appended to it"
+        chunks = [chunk for chunk, _ in chunker.split("\n\n".join(edited))]
+        assert len(set(original) - set(chunks)) <= 2
+        assert chunks[-1] == original[-1]
+
+
+def test_long_paragraph_cut_on_token_boundaries():
+    """Test that a single paragraph above the budget is cut into windows."""
+    chunker = TextChunker(max_tokens=50, overlap_tokens=5)
+    chunks = chunker.split("x" * 1000)
+    assert all(tokens <= 50 for _, tokens in chunks)
+    # Without the overlap the chunks reassemble the text
+    assert chunks[0][0] + "".join(chunk[15:] for chunk, _ in chunks[1:]) == "x" * 1000
+
+
+def test_invalid_chunker_settings():
+    """Test that impossible budgets are rejected."""
+    with pytest.raises(ValueError, match="max_tokens"):
+        TextChunker(max_tokens=0)
+    with pytest.raises(ValueError, match="overlap_tokens"):
+        TextChunker(max_tokens=10, overlap_tokens=5)
+
+
+def test_pool_vectors():
+    """Test mean and weighted pooling into unit vectors."""
+    assert pool_vectors([[1.0, 0.0], [0.0, 1.0]]) == pytest.approx([math.sqrt(0.5), math.sqrt(0.5)])
+    weighted = pool_vectors([[1.0, 0.0], [0.0, 1.0]], weights=[3, 1])
+    assert weighted[0] > weighted[1]
+    assert math.hypot(*weighted) == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        pool_vectors([])
+
+
+def test_router_pools_chunks_and_reuses_unchanged_ones(tmp_path):
+    """Test that editing one paragraph only re-embeds the chunk that holds it."""
+    provider = CountingProvider()
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=provider,
+                             chunk_max_tokens=200, chunk_overlap_tokens=0)
+    text = _paragraphs(20)
+    vector = router.get_embedding(text)
+    chunk_count = len(provider.embedded)
+    assert chunk_count > 2
+    assert math.sqrt(sum(v * v for v in vector)) == pytest.approx(1.0)
+    assert router.get_embedding(text) == vector
+    assert len(provider.embedded) == chunk_count
+
+    edited = text.replace("p10w3 ", "edited ")
+    router.get_embedding(edited)
+    assert len(provider.embedded) == chunk_count + 1
+
+    # Short texts are embedded whole, long ones pooled, in one batch
+    results = router.get_embeddings_batch(["short", text])
+    assert results[1] == vector
+    assert results[0] == provider.vector("short")
+    router.close()
+
+
+def test_weighted_pooling_and_async(tmp_path):
+    """Test weighted pooling and that the async router chunks the same way."""
+    text = _paragraphs(12)
+    sync_router = EmbeddingRouter(cache_dir=str(tmp_path / "sync"), provider=DeterministicProvider(dimensions=8),
+                                  chunk_max_tokens=150, chunk_pooling="weighted")
+    async_router = AsyncEmbeddingRouter(cache_dir=str(tmp_path / "async"), provider=DeterministicProvider(dimensions=8),
+                                        chunk_max_tokens=150, chunk_pooling="weighted")
+    expected = sync_router.get_embedding(text)
+    assert asyncio.run(async_router.aget_embedding(text)) == pytest.approx(expected)
+    assert asyncio.run(async_router.aget_embeddings_batch([text]))[0] == pytest.approx(expected)
+    with pytest.raises(ValueError, match="chunk_pooling"):
+        EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(), chunk_pooling="max")
+    sync_router.close()
+    async_router.close()
+
+
+def test_write_memory_pools_over_limit_text(tmp_path, monkeypatch):
+    """Test that memory writes chunk long texts with the router settings from the environment."""
+    monkeypatch.setenv("EMBEDDING_CHUNK_MAX_TOKENS", "150")
+    monkeypatch.setenv("EMBEDDING_CHUNK_POOLING", "weighted")
+    options = router_options_from_env()
+    assert (options['chunk_max_tokens'], options['chunk_pooling']) == (150, "weighted")
+
+    provider = CountingProvider()
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=provider, **options)
+    text = _paragraphs(12)
+    client = Mock()
+    with patch('vector.embedding._router', router), \
+         patch('vector.memory_writer.get_weaviate_client', return_value=client):
+        write_memory(text, "project1", "repo1", "agent1", [])
+
+    stored = client.data_object.create.call_args[1]['vector']
+    assert text not in provider.embedded
+    assert len(provider.embedded) > 1
+    assert stored == router.get_embedding(text)
+    assert math.sqrt(sum(v * v for v in stored)) == pytest.approx(1.0)
+    router.close()
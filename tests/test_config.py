@@ -1,7 +1,17 @@
 import pytest
 import weaviate
 from unittest.mock import patch, Mock
-from vector.config import get_weaviate_client
+from vector.config import WeaviateClientManager, get_weaviate_client, reset_weaviate_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch):
+    """Start every test without shared clients or Weaviate settings from the environment."""
+    for name in ("WEAVIATE_URL", "WEAVIATE_POOL_MAXSIZE", "WEAVIATE_HEALTH_CHECK_INTERVAL"):
+        monkeypatch.delenv(name, raising=False)
+    reset_weaviate_clients()
+    yield
+    reset_weaviate_clients()
 
 
 @patch('vector.config.weaviate.Client')
@@ -9,11 +19,12 @@ def test_get_weaviate_client_default(mock_client):
     """Test getting Weaviate client with default URL."""
     mock_instance = Mock()
     mock_client.return_value = mock_instance
-    
+
     client = get_weaviate_client()
-    
+
     # Verify that weaviate.Client was called with default URL
-    mock_client.assert_called_once_with("http://localhost:8080")
+    mock_client.assert_called_once()
+    assert mock_client.call_args[0][0] == "http://localhost:8080"
     assert client == mock_instance
 
 
@@ -23,11 +34,12 @@ def test_get_weaviate_client_custom_url(mock_client):
     mock_instance = Mock()
     mock_client.return_value = mock_instance
     custom_url = "http://custom-host:9999"
-    
+
     client = get_weaviate_client(custom_url)
-    
+
     # Verify that weaviate.Client was called with custom URL
-    mock_client.assert_called_once_with(custom_url)
+    mock_client.assert_called_once()
+    assert mock_client.call_args[0][0] == custom_url
     assert client == mock_instance
 
 
@@ -36,9 +48,45 @@ def test_get_weaviate_client_return_type(mock_client):
     """Test that the function returns the correct type."""
     mock_instance = Mock()
     mock_client.return_value = mock_instance
-    
+
     client = get_weaviate_client()
-    
+
     # Verify the return value
     assert client == mock_instance
-    mock_client.assert_called_once() 
\ No newline at end of file
+    mock_client.assert_called_once()
+
+
+@patch('vector.config.weaviate.Client')
+def test_get_weaviate_client_is_reused(mock_client, monkeypatch):
+    """Test that the client is built once per URL and configured from the environment."""
+    monkeypatch.setenv("WEAVIATE_URL", "http://weaviate:8080")
+    monkeypatch.setenv("WEAVIATE_POOL_MAXSIZE", "50")
+    mock_client.side_effect = lambda *args, **kwargs: Mock()
+
+    client = get_weaviate_client()
+    assert get_weaviate_client() is client
+    assert get_weaviate_client("http://other:8080") is not client
+
+    assert mock_client.call_count == 2
+    args, kwargs = mock_client.call_args_list[0]
+    assert args == ("http://weaviate:8080",)
+    assert kwargs['timeout_config'] == (10.0, 60.0)
+    assert kwargs['additional_config'].connection_config.session_pool_maxsize == 50
+
+
+@patch('vector.config.weaviate.Client')
+def test_client_manager_reconnects_when_unhealthy(mock_client):
+    """Test that an unhealthy client is replaced on the next health check."""
+    first, second = Mock(), Mock()
+    first.is_ready.return_value = True
+    mock_client.side_effect = [first, second]
+    manager = WeaviateClientManager("http://localhost:8080", health_check_interval=0)
+
+    assert manager.get_client() is first
+    assert manager.get_client() is first
+    first.is_ready.return_value = False
+    assert manager.get_client() is second
+    assert manager.reconnects == 1
+
+    with pytest.raises(ValueError, match="pool_maxsize"):
+        WeaviateClientManager(pool_maxsize=0)
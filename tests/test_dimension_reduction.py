@@ -0,0 +1,159 @@
+import math
+import random
+import asyncio
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+
+from vector import dimension_reduction
+from vector.dimension_reduction import (
+    PCAProjection, dimension_recall_report, recall_at_k, truncate_vector
+)
+from vector.providers import DeterministicProvider, OpenAIProvider
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+from vector.embedding import router_options_from_env
+from vector.memory_writer import write_memories_batch
+from vector.retriever_factory import get_similar_memories
+
+
+def _low_rank_vectors(count=200, dim=32, rank=4, seed=0):
+    """Unit vectors spanned by ``rank`` random directions plus a little noise."""
+    rng = random.Random(seed)
+    bases = [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(rank)]
+    vectors = []
+    for _ in range(count):
+        weights = [rng.gauss(0, 1) for _ in range(rank)]
+        vector = [sum(w * base[i] for w, base in zip(weights, bases)) + rng.gauss(0, 0.01) for i in range(dim)]
+        norm = math.sqrt(sum(v * v for v in vector))
+        vectors.append([v / norm for v in vector])
+    return vectors
+
+
+def test_truncate_vector():
+    """Test that truncation keeps the leading components at unit length."""
+    truncated = truncate_vector([3.0, 4.0, 12.0], 2)
+    assert truncated == pytest.approx([0.6, 0.8])
+
+
+def test_pca_projection_fit_apply_and_save(tmp_path, monkeypatch):
+    """Test fitting, applying with and without numpy, and saving a projection."""
+    pytest.importorskip("numpy")
+    vectors = _low_rank_vectors()
+    projection = PCAProjection.fit(vectors, 4)
+    assert (projection.source_dimensions, projection.dimensions) == (32, 4)
+    assert projection.explained_variance_ratio > 0.99
+
+    projected = projection.apply_many(vectors)
+    assert all(math.sqrt(sum(v * v for v in vector)) == pytest.approx(1.0) for vector in projected)
+    # Four components keep the neighbourhoods of rank-4 data intact
+    assert recall_at_k(vectors, projected, k=5) > 0.95
+
+    projection.save(tmp_path / "pca.json")
+    loaded = PCAProjection.load(tmp_path / "pca.json")
+    assert loaded.fingerprint == projection.fingerprint
+    monkeypatch.setattr(dimension_reduction, "numpy", None)
+    assert loaded.apply(vectors[0]) == pytest.approx(projected[0])
+    with pytest.raises(ImportError, match="numpy"):
+        PCAProjection.fit(vectors, 4)
+    with pytest.raises(ValueError, match="32-dimensional"):
+        loaded.apply([1.0, 0.0])
+
+
+def test_dimension_recall_report(monkeypatch):
+    """Test that the report ranks dimensions by recall and size."""
+    pytest.importorskip("numpy")
+    vectors = _low_rank_vectors()
+    report = dimension_recall_report(vectors, [8, 2, 4], method="pca", k=5)
+    assert [row['dimensions'] for row in report] == [2, 4, 8]
+    assert report[1]['recall_at_k'] > report[0]['recall_at_k']
+    assert report[1]['bytes_per_vector'] == 16
+    assert report[1]['size_ratio'] == pytest.approx(4 / 32)
+
+    # Without numpy the recall computation falls back to pure Python
+    truncated = dimension_recall_report(vectors, [16], method="truncate", k=5)
+    monkeypatch.setattr(dimension_reduction, "numpy", None)
+    assert dimension_recall_report(vectors, [16], method="truncate", k=5) == truncated
+    with pytest.raises(ValueError, match="between 1 and 31"):
+        dimension_recall_report(vectors, [32])
+
+
+def test_router_requests_reduced_dimensions(tmp_path):
+    """Test that the target dimension is requested and part of the cache segment."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=64), dimensions=16)
+    vector = router.get_embedding("hello")
+    assert vector == pytest.approx(truncate_vector(router.provider.vector("hello"), 16))
+    assert router.cache_namespace == "deterministic-16"
+    assert router.get_cache_info()['dimensions'] == 16
+    async_router = AsyncEmbeddingRouter(cache_dir=str(tmp_path / "async"),
+                                        provider=DeterministicProvider(dimensions=64), dimensions=16)
+    assert asyncio.run(async_router.aget_embedding("hello")) == pytest.approx(vector)
+
+    with pytest.raises(ValueError, match="between 1 and 64"):
+        EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=64), dimensions=128)
+    router.close()
+    async_router.close()
+
+
+def test_openai_dimensions_parameter(tmp_path):
+    """Test that only text-embedding-3 models get the dimensions parameter."""
+    client = Mock()
+    client.embeddings.create.return_value = Mock(data=[Mock(embedding=[0.6, 0.8])], usage=Mock(total_tokens=1))
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=OpenAIProvider(client),
+                             model="text-embedding-3-small", dimensions=2)
+    assert router.cache_namespace == "text-embedding-3-small-2"
+    router.get_embedding("hello")
+    client.embeddings.create.assert_called_once_with(input=["hello"], model="text-embedding-3-small", dimensions=2)
+
+    with pytest.raises(ValueError, match="PCAProjection"):
+        EmbeddingRouter(cache_dir=str(tmp_path), provider=OpenAIProvider(client),
+                        model="text-embedding-ada-002", dimensions=256)
+    router.close()
+
+
+def test_router_applies_projection_consistently(tmp_path):
+    """Test that a projection is applied to every vector and keys the cache segment."""
+    pytest.importorskip("numpy")
+    source = EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=32))
+    source.get_embeddings_batch([f"text {i}" for i in range(100)])
+    report = source.dimension_report([4, 8], k=5)
+    assert [row['dimensions'] for row in report] == [4, 8]
+    projection = source.fit_projection(8)
+    projection.save(tmp_path / "pca.json")
+
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=32),
+                             projection=str(tmp_path / "pca.json"))
+    async_router = AsyncEmbeddingRouter(cache_dir=str(tmp_path / "async"),
+                                        provider=DeterministicProvider(dimensions=32), projection=projection)
+    assert router.cache_namespace == f"deterministic-8-pca-{projection.fingerprint}"
+    expected = projection.apply(source.get_embedding("query"))
+    assert router.get_embedding("query") == pytest.approx(expected)
+    assert router.get_embeddings_batch(["query", "doc"])[0] == pytest.approx(expected)
+    assert asyncio.run(async_router.aget_embedding("query")) == pytest.approx(expected)
+
+    with pytest.raises(ValueError, match="does not match"):
+        EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=32),
+                        projection=projection, dimensions=4)
+    with pytest.raises(ValueError, match="32-dimensional"):
+        EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=16), projection=projection)
+    for r in (source, router, async_router):
+        r.close()
+
+
+def test_stored_and_query_vectors_share_reduced_dimensions(tmp_path, monkeypatch):
+    """Test that memory writes and retrieval queries both use the configured dimensions."""
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "16")
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=32),
+                             **router_options_from_env())
+    client = MagicMock()
+    client.batch.__exit__.return_value = False
+    with patch('vector.embedding._router', router), \
+         patch('vector.memory_writer.get_weaviate_client', return_value=client), \
+         patch('vector.retriever_factory.get_weaviate_client', return_value=client):
+        write_memories_batch([{"content": "stored memory", "project": "p", "repo": "r", "agent": "a", "tags": []}])
+        get_similar_memories("query text")
+
+    stored = client.batch.__enter__.return_value.add_data_object.call_args[1]['vector']
+    query = client.query.get.return_value.with_near_vector.call_args[0][0]['vector']
+    assert len(stored) == len(query) == 16
+    router.close()
@@ -5,6 +5,7 @@ from pathlib import Path
 import json
 from unittest.mock import Mock, patch
 
+from vector.cache_pack import export_cache_pack
 from vector.embedding_router import EmbeddingRouter
 
 # Test data
@@ -302,4 +303,149 @@ def test_batch_cache_methods(router):
     # Test partial cache
     results = router._load_batch_from_cache(texts)
     assert results[texts[0]] is not None
-    assert results[texts[1]] is None 
\ No newline at end of file
+    assert results[texts[1]] is None
+
+def test_packed_backend_migrates_json_cache(tmp_path):
+    """Test that a packed router picks up legacy JSON cache entries."""
+    json_router = EmbeddingRouter(cache_dir=str(tmp_path))
+    cache_key = json_router._get_cache_key(TEST_TEXT)
+    json_router._save_to_cache(cache_key, [0.5, 0.25], {"source": "legacy"})
+
+    packed_router = EmbeddingRouter(cache_dir=str(tmp_path), cache_backend="packed")
+    try:
+        assert packed_router.get_cache_info()['backend'] == "PackedVectorCache"
+        assert packed_router._load_from_cache(cache_key) == [0.5, 0.25]
+        assert packed_router.get_embedding(TEST_TEXT) == [0.5, 0.25]
+    finally:
+        packed_router.cache.close()
+
+def test_cache_segments_are_namespaced_by_model(tmp_path):
+    """Test that routers for different models use separate cache segments."""
+    ada_router = EmbeddingRouter(cache_dir=str(tmp_path))
+    large_router = EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-large")
+    assert ada_router.cache_namespace == "text-embedding-ada-002-1536"
+    assert large_router.cache_namespace == "text-embedding-3-large-3072"
+
+    cache_key = ada_router._get_cache_key(TEST_TEXT)
+    ada_router._save_to_cache(cache_key, [0.5, 0.25])
+    assert large_router._load_from_cache(large_router._get_cache_key(TEST_TEXT)) is None
+
+    segments = {s['namespace']: s['num_entries'] for s in ada_router.list_cache_segments()}
+    assert segments == {"text-embedding-ada-002-1536": 1, "text-embedding-3-large-3072": 0}
+
+def test_legacy_cache_entries_adopted_by_ada_segment(tmp_path):
+    """Test that pre-segment JSON files are moved into the ada-002 segment."""
+    legacy_key = EmbeddingRouter(cache_dir=str(tmp_path / "probe"))._get_cache_key(TEST_TEXT)
+    with (tmp_path / f"{legacy_key}.json").open('w') as f:
+        json.dump({"embedding": [0.5, 0.25], "metadata": {}}, f)
+
+    other = EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-large")
+    assert other._load_from_cache(legacy_key) is None
+
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    assert router._load_from_cache(legacy_key) == [0.5, 0.25]
+    assert not (tmp_path / f"{legacy_key}.json").exists()
+
+def test_legacy_migration_counts_entries(tmp_path):
+    """Test that adopted legacy entries are counted and the legacy root gets no manifest."""
+    for i in range(3):
+        with (tmp_path / f"legacy-{i}.json").open('w') as f:
+            json.dump({"embedding": [0.5, float(i)], "metadata": {}}, f)
+
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    assert router.get_cache_info()['num_entries'] == 3
+    segments = {s['namespace']: s for s in router.list_cache_segments()}
+    assert segments["text-embedding-ada-002-1536"]['num_entries'] == 3
+    assert segments["text-embedding-ada-002-1536"]['total_size_bytes'] > 0
+    assert not (tmp_path / "MANIFEST").exists()
+    router.close()
+
+    assert EmbeddingRouter(cache_dir=str(tmp_path)).get_cache_info()['num_entries'] == 3
+
+def test_list_cache_segments_is_read_only(tmp_path):
+    """Test that listing segments never writes to segments without a manifest."""
+    large_router = EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-large")
+    for i in range(3):
+        large_router._save_to_cache(large_router._get_cache_key(f"text {i}"), [0.5, float(i)])
+    large_router.close()
+    legacy_dir = tmp_path / "text-embedding-3-large-3072"
+    (legacy_dir / "MANIFEST").unlink()
+    before = sorted(p.name for p in legacy_dir.iterdir())
+
+    for backend in ("packed", "sqlite"):
+        router = EmbeddingRouter(cache_dir=str(tmp_path / backend), cache_backend=backend)
+        shutil.copytree(legacy_dir, tmp_path / backend / legacy_dir.name)
+        segment = router.get_cache_info()['segments']["text-embedding-3-large-3072"]
+        assert segment == {'num_entries': 3, 'total_size_bytes': segment['total_size_bytes']}
+        assert segment['total_size_bytes'] > 0
+        assert {s['namespace']: s['backend'] for s in router.list_cache_segments()}[legacy_dir.name] == "json"
+        assert sorted(p.name for p in (tmp_path / backend / legacy_dir.name).iterdir()) == before
+
+        report = export_cache_pack(tmp_path / backend, tmp_path / f"{backend}.pack", models=["text-embedding-3-large"])
+        assert report['segments'] == {"text-embedding-3-large-3072": 3}
+        router.close()
+
+def test_drop_cache_segment(tmp_path):
+    """Test dropping another model's segment and clearing all segments."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    large_router = EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-large")
+    large_router._save_to_cache(large_router._get_cache_key(TEST_TEXT), [0.5])
+    router._save_to_cache(router._get_cache_key(TEST_TEXT), [0.5])
+
+    with pytest.raises(ValueError, match="clear_cache"):
+        router.drop_cache_segment("text-embedding-ada-002")
+    assert router.drop_cache_segment("text-embedding-3-large")
+    assert not router.drop_cache_segment("text-embedding-3-large")
+    assert router.get_cache_info()['num_entries'] == 1
+
+    EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-small")._save_to_cache("k", [0.5])
+    router.clear_cache(all_segments=True)
+    assert [s['namespace'] for s in router.list_cache_segments()] == ["text-embedding-ada-002-1536"]
+    assert router.get_cache_info()['num_entries'] == 0
+
+def test_prewarm_embeds_only_uncached_texts(tmp_path):
+    """Test that prewarm only sends uncached texts upstream."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    router._save_to_cache(router._get_cache_key("cached"), [0.5])
+
+    with patch.object(router.client.embeddings, 'create') as mock_create:
+        mock_create.return_value = Mock(data=[Mock(embedding=[0.25]), Mock(embedding=[0.75])])
+        assert router.prewarm(["cached", "new 1", "new 2"]) == 2
+        mock_create.assert_called_once_with(input=["new 1", "new 2"], model=router.model)
+    assert router.get_embedding("new 2") == [0.75]
+
+def test_cache_info_per_model_breakdown(tmp_path):
+    """Test that cache info reports every model segment from its manifest."""
+    large_router = EmbeddingRouter(cache_dir=str(tmp_path), model="text-embedding-3-large")
+    large_router._save_to_cache("k1", [0.5])
+    large_router._save_to_cache("k2", [0.5])
+    large_router.close()
+
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    router._save_to_cache("k1", [0.5])
+    info = router.get_cache_info()
+
+    assert info['num_entries'] == 1
+    assert info['segments']['text-embedding-3-large-3072']['num_entries'] == 2
+    assert info['segments']['text-embedding-ada-002-1536']['num_entries'] == 1
+
+def test_cache_telemetry(tmp_path, fake_response):
+    """Test that hits, misses, API calls, tokens and bytes read are counted."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), memory_cache_entries=0)
+    with patch.object(router.client.embeddings, 'create') as mock_create:
+        mock_create.side_effect = lambda input, model: fake_response(input, tokens=7)
+        router.get_embedding("a")
+        assert router.get_last_call_stats() == {'cache_hits': 0, 'cache_misses': 1, 'api_calls': 1}
+        router.get_embedding("a")
+        assert router.get_last_call_stats() == {'cache_hits': 1, 'cache_misses': 0, 'api_calls': 0}
+        router.get_embeddings_batch(["a", "b", "c"])
+        assert router.get_last_call_stats() == {'cache_hits': 1, 'cache_misses': 2, 'api_calls': 1}
+
+    info = router.get_cache_info()
+    totals = info['metrics']['totals']
+    assert totals['cache_hits'] == 2
+    assert totals['cache_misses'] == 3
+    assert totals['api_calls'] == 2
+    assert totals['tokens_sent'] == 14
+    assert totals['bytes_read'] > 0
+    assert info['hit_rate'] == 2 / 5
@@ -0,0 +1,114 @@
+import io
+import json
+import time
+import pytest
+from unittest.mock import patch
+
+from vector.ingest import ingest_memories, iter_ndjson
+from vector.memory_writer import MemoryWriteResult
+
+
+def _memory(i):
+    return {"content": f"Memory {i}", "project": "project1", "repo": "repo1", "agent": "agent1", "tags": []}
+
+
+def _succeed(memories, **kwargs):
+    return [MemoryWriteResult(f"uuid-{memory['content']}", None, 1) for memory in memories]
+
+
+def test_iter_ndjson_reports_bad_lines():
+    """Test that blank lines are skipped and invalid JSON is yielded as an error."""
+    stream = io.StringIO(json.dumps(_memory(1)) + "\n\n{not json\n" + json.dumps(_memory(2)) + "\n")
+    records = list(iter_ndjson(stream))
+
+    assert [line for line, _ in records] == [1, 3, 4]
+    assert records[0][1] == _memory(1)
+    assert isinstance(records[1][1], ValueError)
+
+
+def test_ingest_streams_rolling_batches(tmp_path):
+    """Test batching, counting and error reporting of an NDJSON import."""
+    path = tmp_path / "memories.ndjson"
+    lines = [json.dumps(_memory(i)) for i in range(7)]
+    lines[2] = json.dumps({**_memory(2), "tags": "not-a-list"})
+    lines[4] = "[1, 2]"
+    path.write_text("\n".join(lines) + "\n")
+
+    def write(memories, **kwargs):
+        assert kwargs == {"num_workers": 2}
+        return [
+            MemoryWriteResult(None, "invalid vector", 1) if memory["content"] == "Memory 5"
+            else MemoryWriteResult("uuid", None, 1)
+            for memory in memories
+        ]
+
+    errors = []
+    with patch('vector.ingest.write_memories_batch_detailed', side_effect=write) as mock_write:
+        stats = ingest_memories(path, batch_size=3, parallel=2, write_options={"num_workers": 2},
+                                on_error=lambda line, error: errors.append((line, error)))
+
+    assert [len(call[0][0]) for call in mock_write.call_args_list] == [2, 2, 1]
+    assert (stats['records'], stats['written'], stats['invalid'], stats['failed']) == (7, 4, 2, 1)
+    assert stats['memories_per_second'] > 0
+    assert errors == [
+        (3, "tags must be a list of strings"),
+        (5, "record must be a JSON object"),
+        (6, "invalid vector")
+    ]
+
+
+def test_ingest_survives_embedding_failures():
+    """Test that a batch whose embedding fails is counted as failed and the import goes on."""
+    def write(memories, **kwargs):
+        if memories[0]["content"] == "Memory 0":
+            raise Exception("Failed to write memories batch: Embedding error")
+        return _succeed(memories)
+
+    errors = []
+    with patch('vector.ingest.write_memories_batch_detailed', side_effect=write):
+        stats = ingest_memories((_memory(i) for i in range(4)), batch_size=2,
+                                on_error=lambda position, error: errors.append(position))
+
+    assert (stats['written'], stats['failed']) == (2, 2)
+    assert errors == [1, 2]
+    with pytest.raises(ValueError, match="batch_size"):
+        ingest_memories([], batch_size=0)
+
+
+def test_ingest_reads_with_bounded_memory():
+    """Test that reading waits for in-flight batches instead of buffering the input."""
+    consumed = 0
+    max_ahead = []
+
+    def source():
+        nonlocal consumed
+        for i in range(100):
+            consumed += 1
+            yield _memory(i)
+
+    def write(memories, **kwargs):
+        # Give the reader the chance to run ahead
+        time.sleep(0.05)
+        max_ahead.append(consumed)
+        return _succeed(memories)
+
+    with patch('vector.ingest.write_memories_batch_detailed', side_effect=write):
+        stats = ingest_memories(source(), batch_size=10, parallel=2)
+
+    assert stats['written'] == 100
+    # Two batches in flight plus the one being filled
+    assert max_ahead[0] <= 3 * 10
+
+
+def test_ingest_counts_existing_memories():
+    """Test that memories skipped by an upsert are counted apart from new writes."""
+    def write(memories, **kwargs):
+        assert kwargs == {"upsert": True}
+        return [MemoryWriteResult("uuid", None, 0 if memory["content"] == "Memory 0" else 1,
+                                  existed=memory["content"] == "Memory 0")
+                for memory in memories]
+
+    with patch('vector.ingest.write_memories_batch_detailed', side_effect=write):
+        stats = ingest_memories([_memory(i) for i in range(3)], write_options={"upsert": True})
+
+    assert (stats['written'], stats['existing'], stats['failed']) == (2, 1, 0)
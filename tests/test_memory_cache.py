@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+from vector.cache_backends import JsonDirectoryCache
+from vector.memory_cache import MemoryCache, TieredCache
+from vector.embedding_router import EmbeddingRouter
+
+VECTOR = [0.1, 0.2, 0.3, 0.4]
+
+
+def test_memory_cache_lru_entry_budget():
+    """Test that the least recently used entry is evicted first."""
+    cache = MemoryCache(max_entries=2)
+    cache.put("a", VECTOR)
+    cache.put("b", VECTOR)
+    cache.get("a")  # a is now most recently used
+    cache.put("c", VECTOR)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_memory_cache_byte_budget():
+    """Test that the byte budget bounds the cache."""
+    cache = MemoryCache(max_entries=100, max_bytes=2 * 8 * len(VECTOR))
+    for key in ["a", "b", "c"]:
+        cache.put(key, VECTOR)
+
+    assert len(cache) == 2
+    assert cache.size_bytes == 2 * 8 * len(VECTOR)
+    assert "a" not in cache
+
+
+def test_memory_cache_returns_exact_values():
+    """Test that memory hits return exactly the stored floats."""
+    cache = MemoryCache()
+    vector = [0.123456789012345, -1e-10]
+    cache.put("a", vector)
+    assert cache.get("a") == vector
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    """Test that disk hits are promoted and then served from memory."""
+    disk = JsonDirectoryCache(tmp_path)
+    disk.put("a", VECTOR)
+    tiered = TieredCache(disk, MemoryCache())
+
+    assert tiered.get("a") == VECTOR
+    with patch.object(disk, 'get', side_effect=AssertionError("disk read")):
+        assert tiered.get("a") == VECTOR
+        assert tiered.get_many(["a"]) == {"a": VECTOR}
+
+
+def test_tiered_cache_write_and_delete(tmp_path):
+    """Test that writes and deletes reach both tiers."""
+    disk = JsonDirectoryCache(tmp_path)
+    tiered = TieredCache(disk, MemoryCache())
+
+    tiered.put_many([("a", VECTOR, None), ("b", VECTOR, {"k": "v"})])
+    assert disk.get("b") == VECTOR
+    assert "b" in tiered.memory
+
+    assert tiered.delete("b")
+    assert "b" not in tiered.memory
+    assert disk.get("b") is None
+
+    tiered.clear()
+    assert tiered.info()['num_entries'] == 0
+    assert tiered.info()['memory_entries'] == 0
+
+
+def test_tiered_cache_warm(tmp_path):
+    """Test warming the memory tier from the most recent disk entries."""
+    disk = JsonDirectoryCache(tmp_path)
+    for key in ["a", "b", "c"]:
+        disk.put(key, VECTOR)
+    tiered = TieredCache(disk, MemoryCache(max_entries=2))
+
+    with patch.object(disk, 'recent_keys', return_value=["c", "b", "a"]):
+        assert tiered.warm() == 2
+    assert "c" in tiered.memory and "b" in tiered.memory
+    assert "a" not in tiered.memory
+
+    tiered.memory.clear()
+    tiered.warm_in_background().join()
+    assert len(tiered.memory) == 2
+
+
+def test_router_memory_tier(tmp_path):
+    """Test that the router serves repeated lookups from memory."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), memory_cache_entries=8)
+    cache_key = router._get_cache_key("hot query")
+    router._save_to_cache(cache_key, VECTOR)
+
+    with patch.object(router.disk_cache, 'get', side_effect=AssertionError("disk read")):
+        assert router.get_embedding("hot query") == VECTOR
+        assert router.get_embeddings_batch(["hot query"]) == [VECTOR]
+    assert router.get_cache_info()['memory_entries'] == 1
+
+
+def test_router_memory_tier_disabled(tmp_path):
+    """Test that a zero entry budget disables the memory tier."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), memory_cache_entries=0)
+    assert router.cache is router.disk_cache
@@ -2,7 +2,11 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 import datetime
 import weaviate
-from vector.memory_writer import write_memory, write_memories_batch
+import requests
+from vector.memory_writer import (
+    write_memory, write_memories_batch, write_memories_batch_detailed, memory_uuid, existing_memory_uuids
+)
+from vector.rate_limit import RetryPolicy
 
 
 def test_write_memory_success():
@@ -169,23 +173,25 @@ def test_write_memory_data_object_structure():
         assert call_args[1]['vector'] == [0.1, 0.2, 0.3]
 
 # Batch processing tests for write_memories_batch
+def _batch_client():
+    """Create a mock Weaviate client whose batch import records added objects."""
+    client = MagicMock()
+    batch = client.batch.__enter__.return_value
+    # Like Weaviate's batch, let exceptions propagate out of the with-block
+    client.batch.__exit__.return_value = False
+    return client, batch
+
+
 def test_write_memories_batch_success():
     """Test successful batch memory write."""
     with patch('vector.memory_writer.get_weaviate_client') as mock_client, \
          patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
         
         # Setup mocks
-        mock_client_instance = Mock()
+        mock_client_instance, mock_batch = _batch_client()
         mock_client.return_value = mock_client_instance
         mock_embed_batch.return_value = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
         
-        # Mock results
-        mock_result1 = Mock()
-        mock_result1.uuid = "uuid-1"
-        mock_result2 = Mock()
-        mock_result2.uuid = "uuid-2"
-        mock_client_instance.data_object.create.side_effect = [mock_result1, mock_result2]
-        
         # Test data
         memories = [
             {
@@ -208,10 +214,37 @@ def test_write_memories_batch_success():
         # Call the function
         result = write_memories_batch(memories)
         
-        # Verify results
-        assert result == ["uuid-1", "uuid-2"]
+        # Verify results: one batch import, UUIDs in input order
+        added = [call[1] for call in mock_batch.add_data_object.call_args_list]
+        assert result == [kwargs['uuid'] for kwargs in added]
+        assert len(set(result)) == 2
+        assert [kwargs['data_object']['content'] for kwargs in added] == ["Memory 1", "Memory 2"]
+        assert [kwargs['vector'] for kwargs in added] == [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
         mock_embed_batch.assert_called_once_with(["Memory 1", "Memory 2"])
-        assert mock_client_instance.data_object.create.call_count == 2
+        mock_client_instance.data_object.create.assert_not_called()
+        mock_client_instance.batch.__exit__.assert_called_once()
+
+
+def test_write_memories_batch_configures_batch_import():
+    """Test that batch size, workers and dynamic batching are passed to Weaviate."""
+    with patch('vector.memory_writer.get_weaviate_client') as mock_client, \
+         patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
+        
+        mock_client_instance, _ = _batch_client()
+        mock_client.return_value = mock_client_instance
+        mock_embed_batch.return_value = [[0.1, 0.2, 0.3]]
+        
+        write_memories_batch([{
+            "content": "Memory 1",
+            "project": "project1",
+            "repo": "repo1",
+            "agent": "agent1",
+            "tags": ["tag1"]
+        }], batch_size=20, num_workers=4, dynamic=True)
+        
+        config = mock_client_instance.batch.configure.call_args[1]
+        assert (config['batch_size'], config['num_workers'], config['dynamic']) == (20, 4, True)
+        assert callable(config['callback'])
 
 
 def test_write_memories_batch_invalid_input():
@@ -277,7 +310,7 @@ def test_write_memories_batch_default_source():
          patch('datetime.datetime') as mock_datetime:
         
         # Setup mocks
-        mock_client_instance = Mock()
+        mock_client_instance, mock_batch = _batch_client()
         mock_client.return_value = mock_client_instance
         mock_embed_batch.return_value = [[0.1, 0.2, 0.3]]
         
@@ -285,10 +318,6 @@ def test_write_memories_batch_default_source():
         mock_now.isoformat.return_value = "2024-01-01T12:00:00"
         mock_datetime.utcnow.return_value = mock_now
         
-        mock_result = Mock()
-        mock_result.uuid = "uuid-1"
-        mock_client_instance.data_object.create.return_value = mock_result
-        
         # Test data without source
         memories = [{
             "content": "Memory 1",
@@ -301,7 +330,7 @@ def test_write_memories_batch_default_source():
         write_memories_batch(memories)
         
         # Check that default source was set
-        call_args = mock_client_instance.data_object.create.call_args
+        call_args = mock_batch.add_data_object.call_args
         data_object = call_args[1]['data_object']
         assert data_object['source'] == "agent"  # Default source
         assert data_object['timestamp'] == "2024-01-01T12:00:00"
@@ -313,12 +342,12 @@ def test_write_memories_batch_weaviate_error():
          patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
         
         # Setup mocks
-        mock_client_instance = Mock()
+        mock_client_instance, mock_batch = _batch_client()
         mock_client.return_value = mock_client_instance
         mock_embed_batch.return_value = [[0.1, 0.2, 0.3]]
         
-        # Make create method raise an exception
-        mock_client_instance.data_object.create.side_effect = Exception("Weaviate error")
+        # Make the batch import raise an exception
+        mock_batch.add_data_object.side_effect = Exception("Weaviate error")
         
         memories = [{
             "content": "Memory 1",
@@ -332,6 +361,192 @@ def test_write_memories_batch_weaviate_error():
             write_memories_batch(memories)
 
 
+def test_write_memories_batch_object_error():
+    """Test that objects rejected by the batch import raise an error."""
+    with patch('vector.memory_writer.get_weaviate_client') as mock_client, \
+         patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
+        
+        mock_client_instance, mock_batch = _batch_client()
+        mock_client.return_value = mock_client_instance
+        mock_embed_batch.return_value = [[0.1, 0.2, 0.3]]
+        
+        # Report the object as failed when the batch is flushed
+        def flush(*args):
+            callback = mock_client_instance.batch.configure.call_args[1]['callback']
+            object_uuid = mock_batch.add_data_object.call_args[1]['uuid']
+            callback([{"id": object_uuid, "result": {"errors": {"error": [{"message": "invalid vector"}]}}}])
+        mock_client_instance.batch.__exit__.side_effect = flush
+        
+        memories = [{
+            "content": "Memory 1",
+            "project": "project1",
+            "repo": "repo1",
+            "agent": "agent1",
+            "tags": ["tag1"]
+        }]
+        
+        with pytest.raises(Exception, match="Failed to write memory 'Memory 1...': invalid vector"):
+            write_memories_batch(memories)
+
+
+def _failing_batch_client(failures):
+    """
+    Create a mock client whose batch import rejects objects by content.
+
+    ``failures`` is a list with one ``{content: error_message}`` dict per
+    attempt; the objects sent in each attempt are recorded in ``client.sent``.
+    """
+    client, batch = _batch_client()
+    client.sent = []
+    added = []
+    batch.add_data_object.side_effect = lambda **kwargs: added.append(kwargs)
+
+    def flush(*args):
+        attempt_failures = failures[len(client.sent)]
+        client.sent.append([kwargs['data_object']['content'] for kwargs in added])
+        callback = client.batch.configure.call_args[1]['callback']
+        callback([
+            {"id": kwargs['uuid'], "result": {"errors": {"error": [{"message": attempt_failures[kwargs['data_object']['content']]}]}}}
+            if kwargs['data_object']['content'] in attempt_failures else {"id": kwargs['uuid'], "result": {}}
+            for kwargs in added
+        ])
+        added.clear()
+        return False
+    client.batch.__exit__.side_effect = flush
+    return client
+
+
+def _memories(*contents):
+    return [
+        {"content": content, "project": "project1", "repo": "repo1", "agent": "agent1", "tags": []}
+        for content in contents
+    ]
+
+
+def test_write_memories_batch_detailed_retries_only_failed_items():
+    """Test partial success: transient failures are resubmitted alone, permanent ones reported."""
+    client = _failing_batch_client([
+        {"B": "context deadline exceeded", "C": "invalid property 'foo'"},
+        {"B": "503 service unavailable"},
+        {}
+    ])
+    with patch('vector.memory_writer.get_weaviate_client', return_value=client), \
+         patch('vector.memory_writer.embed_texts_batch', return_value=[[0.1], [0.2], [0.3]]), \
+         patch('vector.memory_writer.time.sleep') as mock_sleep:
+        results = write_memories_batch_detailed(_memories("A", "B", "C"))
+
+    assert client.sent == [["A", "B", "C"], ["B"], ["B"]]
+    assert [result.success for result in results] == [True, True, False]
+    assert [result.attempts for result in results] == [1, 3, 1]
+    assert results[2].uuid is None and "invalid property" in results[2].error
+    assert len({results[0].uuid, results[1].uuid}) == 2
+    assert mock_sleep.call_count == 2
+
+
+def test_write_memories_batch_detailed_gives_up_after_retries():
+    """Test that transient failures are reported once the retries are used up."""
+    client, batch = _batch_client()
+    batch.add_data_object.side_effect = requests.exceptions.ConnectionError("connection refused")
+    with patch('vector.memory_writer.get_weaviate_client', return_value=client), \
+         patch('vector.memory_writer.embed_texts_batch', return_value=[[0.1], [0.2]]), \
+         patch('vector.memory_writer.time.sleep'):
+        results = write_memories_batch_detailed(_memories("A", "B"), retry_policy=RetryPolicy(max_retries=2))
+
+    assert batch.add_data_object.call_count == 3
+    assert [(result.success, result.attempts) for result in results] == [(False, 3), (False, 3)]
+    assert "connection refused" in results[0].error
+
+
+def test_memory_uuid_is_deterministic():
+    """Test that the UUID depends on content, project, repo and agent only."""
+    uuid_a = memory_uuid("Memory", "project1", "repo1", "agent1")
+
+    assert uuid_a == memory_uuid("Memory", "project1", "repo1", "agent1")
+    assert uuid_a != memory_uuid("Memory", "project1", "repo1", "agent2")
+    # Fields are not simply concatenated
+    assert memory_uuid("ab", "c", "r", "a") != memory_uuid("a", "bc", "r", "a")
+
+
+def test_write_memory_upsert_skips_existing():
+    """Test that upserting a stored memory neither embeds nor writes it."""
+    with patch('vector.memory_writer.get_weaviate_client') as mock_client, \
+         patch('vector.memory_writer.embed_text') as mock_embed:
+        mock_client_instance = Mock()
+        mock_client.return_value = mock_client_instance
+        mock_client_instance.data_object.exists.return_value = True
+
+        result = write_memory("Memory", "project1", "repo1", "agent1", [], upsert=True)
+
+    assert result == memory_uuid("Memory", "project1", "repo1", "agent1")
+    mock_embed.assert_not_called()
+    mock_client_instance.data_object.create.assert_not_called()
+
+
+def test_write_memory_upsert_creates_with_derived_uuid():
+    """Test that a new memory is created under its deterministic UUID."""
+    with patch('vector.memory_writer.get_weaviate_client') as mock_client, \
+         patch('vector.memory_writer.embed_text', return_value=[0.1]):
+        mock_client_instance = Mock()
+        mock_client.return_value = mock_client_instance
+        mock_client_instance.data_object.exists.return_value = False
+
+        result = write_memory("Memory", "project1", "repo1", "agent1", [], upsert=True)
+
+    assert result == memory_uuid("Memory", "project1", "repo1", "agent1")
+    assert mock_client_instance.data_object.create.call_args[1]['uuid'] == result
+
+
+def test_existing_memory_uuids_queries_in_chunks():
+    """Test that existence is checked with one query per chunk of UUIDs."""
+    client = MagicMock()
+    query = client.query.get.return_value.with_additional.return_value.with_where.return_value.with_limit.return_value
+    query.do.side_effect = [
+        {"data": {"Get": {"ProjectMemory": [{"_additional": {"id": "u1"}}]}}},
+        {"data": {"Get": {"ProjectMemory": []}}}
+    ]
+    with patch('vector.memory_writer.EXISTENCE_CHECK_CHUNK', 2):
+        existing = existing_memory_uuids(client, ["u1", "u2", "u1", "u3"])
+
+    assert existing == {"u1"}
+    assert query.do.call_count == 2
+    where = client.query.get.return_value.with_additional.return_value.with_where
+    assert where.call_args_list[0][0][0]["valueTextArray"] == ["u1", "u2"]
+
+    query.do.side_effect = [{"errors": [{"message": "boom"}]}]
+    with pytest.raises(Exception, match="Existence check failed"):
+        existing_memory_uuids(client, ["u1"])
+
+
+def test_write_memories_batch_upsert_embeds_only_new_memories():
+    """Test that upsert checks existence once, before embedding, and writes new memories once."""
+    client = _failing_batch_client([{}])
+    stored = memory_uuid("A", "project1", "repo1", "agent1")
+    with patch('vector.memory_writer.get_weaviate_client', return_value=client), \
+         patch('vector.memory_writer.existing_memory_uuids', return_value={stored}) as mock_exists, \
+         patch('vector.memory_writer.embed_texts_batch', return_value=[[0.2]]) as mock_embed_batch:
+        results = write_memories_batch_detailed(_memories("A", "B", "B"), upsert=True)
+
+    mock_exists.assert_called_once()
+    mock_embed_batch.assert_called_once_with(["B"])
+    assert client.sent == [["B"]]
+    assert [result.uuid for result in results] == [stored] + [memory_uuid("B", "project1", "repo1", "agent1")] * 2
+    assert [(result.existed, result.attempts) for result in results] == [(True, 0), (False, 1), (False, 1)]
+
+
+def test_write_memories_batch_upsert_all_existing():
+    """Test that a fully stored batch makes no embedding call or write."""
+    client, batch = _batch_client()
+    uuids = [memory_uuid(content, "project1", "repo1", "agent1") for content in ("A", "B")]
+    with patch('vector.memory_writer.get_weaviate_client', return_value=client), \
+         patch('vector.memory_writer.existing_memory_uuids', return_value=set(uuids)), \
+         patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
+        result = write_memories_batch(_memories("A", "B"), upsert=True)
+
+    assert result == uuids
+    mock_embed_batch.assert_not_called()
+    batch.add_data_object.assert_not_called()
+
+
 def test_write_memories_batch_embedding_error():
     """Test batch memory write with embedding error."""
     with patch('vector.memory_writer.embed_texts_batch') as mock_embed_batch:
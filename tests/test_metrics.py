@@ -0,0 +1,53 @@
+import threading
+from unittest.mock import patch
+
+from vector.metrics import RouterMetrics
+
+
+def test_counters_and_hit_rate():
+    """Test lifetime totals and the derived hit rate."""
+    metrics = RouterMetrics()
+    metrics.increment('cache_hits', 3)
+    metrics.increment('cache_misses')
+    metrics.increment('tokens_sent', 0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['totals'] == {'cache_hits': 3, 'cache_misses': 1}
+    assert snapshot['hit_rate'] == 0.75
+    assert snapshot['window_hit_rate'] == 0.75
+    assert metrics.get('cache_hits') == 3
+    assert metrics.get('unknown') == 0
+
+
+def test_empty_hit_rate():
+    """Test that the hit rate is 0.0 before any lookup."""
+    assert RouterMetrics().snapshot()['hit_rate'] == 0.0
+
+
+def test_window_rates_expire():
+    """Test that windowed rates only cover the sliding window."""
+    metrics = RouterMetrics(window_seconds=10)
+    with patch('vector.metrics.time.monotonic', return_value=1000.0):
+        metrics._started = 900.0
+        metrics.increment('api_calls', 20)
+        assert metrics.snapshot()['rates_per_second']['api_calls'] == 2.0
+    with patch('vector.metrics.time.monotonic', return_value=1011.0):
+        snapshot = metrics.snapshot()
+    assert snapshot['rates_per_second'] == {}
+    assert snapshot['totals']['api_calls'] == 20
+
+
+def test_thread_safe_increments():
+    """Test that concurrent increments are not lost."""
+    metrics = RouterMetrics()
+
+    def work():
+        for _ in range(1000):
+            metrics.increment('cache_hits')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.get('cache_hits') == 8000
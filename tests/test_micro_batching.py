@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from openai import OpenAIError
+
+from vector.async_embedding_router import AsyncEmbeddingRouter
+from vector.micro_batching import MicroBatchDispatcher
+
+
+@pytest.fixture
+def router(tmp_path, fake_response):
+    """Create an async router whose API calls are recorded."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path))
+    router.calls = []
+
+    async def create(input, model):
+        router.calls.append(list(input))
+        return fake_response(input)
+
+    router.async_client.embeddings.create = create
+    yield router
+    router.close()
+
+
+def test_rejects_invalid_settings(router):
+    """Test validation of the window and batch size."""
+    with pytest.raises(ValueError, match="window_ms"):
+        MicroBatchDispatcher(router, window_ms=-1)
+    with pytest.raises(ValueError, match="max_batch_size"):
+        MicroBatchDispatcher(router, max_batch_size=0)
+
+
+def test_misses_within_window_share_one_call(router):
+    """Test that concurrent misses are sent as one batched request."""
+    dispatcher = MicroBatchDispatcher(router, window_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(dispatcher.submit("x" * n) for n in range(1, 6)))
+
+    vectors = asyncio.run(run())
+
+    assert vectors == [[float(n), 0.5] for n in range(1, 6)]
+    assert router.calls == [["x", "xx", "xxx", "xxxx", "xxxxx"]]
+    stats = dispatcher.stats()
+    assert stats['batches'] == 1
+    assert stats['mean_batch_size'] == 5
+    assert stats['mean_queue_wait_ms'] > 0
+    assert stats['queued'] == 0
+    assert router.metrics.get('queued_texts') == 5
+
+
+def test_full_batch_dispatched_without_waiting(router):
+    """Test that reaching max_batch_size dispatches immediately."""
+    dispatcher = MicroBatchDispatcher(router, window_ms=10000, max_batch_size=2)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(dispatcher.submit(text) for text in ["a", "bb", "ccc", "dddd"])),
+            timeout=5
+        )
+
+    vectors = asyncio.run(run())
+    assert vectors == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5], [4.0, 0.5]]
+    # Cache lookups finish in any order, so only the batch sizes are fixed
+    assert [len(call) for call in router.calls] == [2, 2]
+
+
+def test_cache_hits_skip_the_queue(router):
+    """Test that cached texts are answered without queueing."""
+    router._save_to_cache(router._get_cache_key("cached"), [1.0, 2.0])
+    dispatcher = MicroBatchDispatcher(router, window_ms=10000)
+
+    async def run():
+        vector = await dispatcher.submit("cached")
+        return vector, router.get_last_call_stats()
+
+    vector, stats = asyncio.run(run())
+    assert vector == [1.0, 2.0]
+    assert stats == {'cache_hits': 1, 'cache_misses': 0, 'api_calls': 0}
+    assert router.calls == []
+
+
+def test_batch_error_reaches_every_caller(router):
+    """Test that a failed batch fails every waiting caller."""
+    async def fail(input, model):
+        raise OpenAIError("API Error")
+
+    router.async_client.embeddings.create = fail
+    dispatcher = MicroBatchDispatcher(router, window_ms=5)
+
+    async def run():
+        return await asyncio.gather(dispatcher.submit("a"), dispatcher.submit("b"), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, OpenAIError) and "Failed to generate embedding" in str(e) for e in errors)
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+
+from vector.normalization import TextNormalizer
+from vector.providers import DeterministicProvider
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+class CountingProvider(DeterministicProvider):
+    """Deterministic provider that records every request."""
+
+    def __init__(self):
+        super().__init__(dimensions=4)
+        self.requests = []
+
+    def embed(self, texts, model):
+        self.requests.append(list(texts))
+        return super().embed(texts, model)
+
+    async def aembed(self, texts, model):
+        self.requests.append(list(texts))
+        return await super().aembed(texts, model)
+
+
+def test_normalizer_steps():
+    """Test Unicode and whitespace normalization."""
+    assert TextNormalizer("NFC")("Cafe\u0301") == "Caf\u00e9"
+    assert TextNormalizer(collapse_whitespace=True)("  a \n\t b  ") == "a b"
+    assert not TextNormalizer().enabled
+    assert TextNormalizer()("  a  b ") == "  a  b "
+    with pytest.raises(ValueError, match="unicode_form"):
+        TextNormalizer("NFX")
+
+
+def test_batch_duplicates_sent_once(tmp_path):
+    """Test that repeated uncached texts are requested once and fanned out."""
+    provider = CountingProvider()
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=provider)
+
+    vectors = router.get_embeddings_batch(["a", "b", "a", "a"], use_cache=False)
+
+    assert provider.requests == [["a", "b"]]
+    assert vectors[0] == vectors[2] == vectors[3] != vectors[1]
+    assert router.metrics.get('deduplicated_texts') == 2
+
+
+def test_batch_duplicates_keep_first_metadata(tmp_path):
+    """Test that a repeated text is cached once with its first metadata."""
+    provider = CountingProvider()
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider=provider)
+
+    router.get_embeddings_batch(["a", "b", "a"], metadata=[{"n": 1}, {"n": 2}, {"n": 3}])
+
+    assert provider.requests == [["a", "b"]]
+    assert router.cache.get_metadata(router._get_cache_key("a")) == {"n": 1}
+    assert router.get_last_call_stats() == {'cache_hits': 0, 'cache_misses': 3, 'api_calls': 1}
+
+
+def test_normalization_raises_hit_rate(tmp_path):
+    """Test that normalized variants share one cache entry."""
+    provider = CountingProvider()
+    router = EmbeddingRouter(
+        cache_dir=str(tmp_path), provider=provider, normalize_unicode="NFC", collapse_whitespace=True
+    )
+
+    first = router.get_embedding("Caf\u00e9 menu")
+    variants = router.get_embeddings_batch(["Cafe\u0301 menu", "  Caf\u00e9\n menu "])
+
+    assert variants == [first, first]
+    assert provider.requests == [["Caf\u00e9 menu"]]
+    assert router.metrics.get('normalized_hits') == 2
+    assert router.get_cache_info()['hit_rate'] == 2 / 3
+
+
+def test_async_batch_dedupe_and_normalization(tmp_path):
+    """Test dedupe and normalization in the async router."""
+    provider = CountingProvider()
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path), provider=provider, collapse_whitespace=True)
+
+    vectors = asyncio.run(router.aget_embeddings_batch(["x  y", "x y", "z"]))
+
+    assert provider.requests == [["x y", "z"]]
+    assert vectors[0] == vectors[1]
+    assert router.metrics.get('deduplicated_texts') == 1
+    router.close()
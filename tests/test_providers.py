@@ -0,0 +1,109 @@
+import os
+import sys
+import math
+import asyncio
+import subprocess
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+
+from vector.providers import DeterministicProvider, EmbeddingProvider, OpenAIProvider, EmbeddingResult
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+def test_deterministic_vectors():
+    """Test that vectors are stable, unit length and text dependent."""
+    provider = DeterministicProvider()
+    a = provider.vector("hello")
+
+    assert len(a) == 1536
+    assert math.isclose(sum(x * x for x in a), 1.0)
+    assert a == DeterministicProvider().vector("hello")
+    assert a != provider.vector("hello!")
+    assert a != DeterministicProvider(seed=1).vector("hello")
+    assert abs(sum(x * y for x, y in zip(a, provider.vector("world")))) < 0.2
+
+
+def test_deterministic_provider_options():
+    """Test dimension, latency and validation."""
+    provider = DeterministicProvider(dimensions=8, latency_ms=50)
+    start = time.perf_counter()
+    result = provider.embed(["a", "b"], "any-model")
+    assert time.perf_counter() - start >= 0.05
+    assert [len(v) for v in result.vectors] == [8, 8]
+    assert result.total_tokens == 2
+
+    with pytest.raises(ValueError, match="dimensions"):
+        DeterministicProvider(dimensions=0)
+    with pytest.raises(ValueError, match="latency_ms"):
+        DeterministicProvider(latency_ms=-1)
+
+
+def test_incomplete_provider_rejected():
+    """Test that a provider without ``embed`` fails when it is created, not on its first request."""
+    class IncompleteProvider(EmbeddingProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="embed"):
+        IncompleteProvider()
+
+
+def test_openai_provider_wraps_client():
+    """Test that the OpenAI provider returns vectors and billed tokens."""
+    client = Mock()
+    client.embeddings.create.return_value = Mock(data=[Mock(embedding=[0.1])], usage=Mock(total_tokens=3))
+    result = OpenAIProvider(client).embed(["a"], "text-embedding-ada-002")
+
+    assert result == EmbeddingResult([[0.1]], 3)
+    client.embeddings.create.assert_called_once_with(input=["a"], model="text-embedding-ada-002")
+
+
+def test_router_with_offline_provider(tmp_path, monkeypatch):
+    """Test that an offline router needs no API key and has its own segment."""
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    monkeypatch.setattr('vector.embedding_router.load_dotenv', lambda: None)
+    router = EmbeddingRouter(cache_dir=str(tmp_path), provider="deterministic")
+
+    assert router.client is None
+    assert router.cache_namespace == "deterministic-1536"
+    assert router.rate_limiter.requests_per_minute is None
+    vectors = router.get_embeddings_batch(["a", "b"])
+    assert router.get_embedding("a") == vectors[0]
+    assert router.get_last_call_stats()['cache_hits'] == 1
+    assert (tmp_path / "deterministic-1536").is_dir()
+
+
+def test_router_provider_from_environment(tmp_path, monkeypatch):
+    """Test provider selection through EMBEDDING_PROVIDER."""
+    monkeypatch.setenv('EMBEDDING_PROVIDER', 'deterministic')
+    assert isinstance(EmbeddingRouter(cache_dir=str(tmp_path)).provider, DeterministicProvider)
+
+    monkeypatch.setenv('EMBEDDING_PROVIDER', 'nope')
+    with pytest.raises(ValueError, match="Unknown embedding provider"):
+        EmbeddingRouter(cache_dir=str(tmp_path))
+
+
+def test_async_router_with_offline_provider(tmp_path):
+    """Test the async router with a provider instance."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=4))
+    vectors = asyncio.run(router.aget_embeddings_batch(["a", "b"]))
+
+    assert router.async_client is None
+    assert vectors == [router.provider.vector("a"), router.provider.vector("b")]
+    asyncio.run(router.aclose())
+
+
+def test_embedding_module_imports_without_key(tmp_path):
+    """Test that vector.embedding imports offline without OPENAI_API_KEY."""
+    env = {k: v for k, v in os.environ.items() if k != 'OPENAI_API_KEY'}
+    env['EMBEDDING_PROVIDER'] = 'deterministic'
+    code = "import vector.embedding as e; print(len(e.embed_text('hi')))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path, env={**env, 'PYTHONPATH': str(Path(__file__).resolve().parents[1])},
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "1536"
@@ -0,0 +1,128 @@
+import random
+import pytest
+
+from vector.cache_backends import JsonDirectoryCache, PackedVectorCache
+from vector.memory_cache import MemoryCache
+from vector.quantization import (
+    PRECISIONS,
+    encoded_size,
+    encode_vector,
+    decode_vector,
+    quantization_error_report,
+)
+from vector.embedding_router import EmbeddingRouter
+
+# Exactly representable in float16, so round trips compare equal
+VECTOR = [0.5, -0.25, 0.125, 1.0]
+
+
+def _random_vectors(count, dim=64, seed=1):
+    rng = random.Random(seed)
+    return [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(count)]
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_encode_decode_round_trip(precision):
+    """Test that every precision round trips within its resolution."""
+    data = encode_vector(VECTOR, precision)
+    assert len(data) == encoded_size(len(VECTOR), precision)
+    decoded = decode_vector(data, precision, len(VECTOR))
+    assert decoded == pytest.approx(VECTOR, abs=1 / 127)
+
+
+def test_decode_rejects_wrong_size():
+    """Test that truncated vectors are rejected instead of misread."""
+    data = encode_vector(VECTOR, "float16")
+    with pytest.raises(ValueError, match="Expected 8 bytes"):
+        decode_vector(data[:-1], "float16", len(VECTOR))
+
+
+def test_unknown_precision():
+    """Test that unknown precisions are rejected."""
+    with pytest.raises(ValueError, match="Unknown precision"):
+        encode_vector(VECTOR, "float8")
+    with pytest.raises(ValueError, match="Unknown precision"):
+        MemoryCache(precision="float8")
+
+
+def test_float16_overflow():
+    """Test that values outside the float16 range are reported."""
+    with pytest.raises(ValueError, match="float16"):
+        encode_vector([1e6], "float16")
+
+
+def test_error_report():
+    """Test the similarity error report across precisions."""
+    report = quantization_error_report(_random_vectors(20), sample_size=50)
+
+    assert set(report) == set(PRECISIONS)
+    assert report["float32"]["max_abs_cosine_error"] < 1e-6
+    assert report["float16"]["bytes_per_vector"] == 128
+    assert report["int8"]["bytes_per_vector"] == 68
+    assert report["int8"]["max_abs_cosine_error"] < 0.02
+    assert report["int8"]["min_self_cosine"] > 0.99
+    assert report["int8"]["compression_vs_float64_json"] > report["float32"]["compression_vs_float64_json"]
+
+
+def test_error_report_needs_two_vectors():
+    """Test that a report needs at least one pair of vectors."""
+    with pytest.raises(ValueError, match="At least two vectors"):
+        quantization_error_report(_random_vectors(1))
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8"])
+def test_packed_cache_precision(tmp_path, precision):
+    """Test that packed records store their precision and shrink accordingly."""
+    cache = PackedVectorCache(tmp_path, precision=precision)
+    try:
+        cache.put("a", VECTOR)
+        assert cache.get("a") == pytest.approx(VECTOR, abs=1 / 127)
+    finally:
+        cache.close()
+
+    # Records keep their precision when reopened with a different default
+    reopened = PackedVectorCache(tmp_path)
+    try:
+        assert reopened.get("a") == pytest.approx(VECTOR, abs=1 / 127)
+        reopened.put("b", VECTOR)
+        assert reopened.get("b") == VECTOR
+    finally:
+        reopened.close()
+
+
+def test_json_cache_precision(tmp_path):
+    """Test that the JSON backend reads quantized and plain entries alike."""
+    vector = _random_vectors(1, dim=256)[0]
+    quantized = JsonDirectoryCache(tmp_path, precision="float16")
+    quantized.put("a", vector)
+    plain = JsonDirectoryCache(tmp_path)
+    plain.put("b", vector)
+
+    assert plain.get("a") == pytest.approx(vector, rel=1e-3)
+    assert quantized.get("b") == vector
+    assert quantized.path_for("a").stat().st_size < quantized.path_for("b").stat().st_size
+
+
+def test_memory_cache_precision():
+    """Test that a quantized memory tier fits more entries per byte."""
+    vectors = _random_vectors(1, dim=256)
+    exact = MemoryCache()
+    quantized = MemoryCache(precision="int8")
+    exact.put("a", vectors[0])
+    quantized.put("a", vectors[0])
+
+    assert quantized.size_bytes * 7 < exact.size_bytes
+    assert quantized.get("a") == pytest.approx(vectors[0], abs=max(map(abs, vectors[0])) / 127)
+
+
+def test_router_quantization_report(tmp_path):
+    """Test the router's report over its cached vectors."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), cache_backend="packed", cache_precision="float16")
+    try:
+        for i, vector in enumerate(_random_vectors(5)):
+            router._save_to_cache(f"key-{i}", vector)
+        assert router.disk_cache.precision == "float16"
+        report = router.quantization_report(sample_size=10)
+        assert report["float16"]["max_abs_cosine_error"] < 1e-3
+    finally:
+        router.close()
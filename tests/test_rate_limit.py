@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+from openai import OpenAIError, RateLimitError, InternalServerError
+
+from vector.rate_limit import RateLimiter, RetryPolicy, get_shared_rate_limiter
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+def _status_error(cls, status_code, headers=None):
+    """Build an API status error with the given response headers."""
+    return cls("error", response=Mock(status_code=status_code, headers=headers or {}), body=None)
+
+
+def test_token_bucket_request_budget():
+    """Test that requests beyond the bucket wait for it to refill."""
+    with patch('vector.rate_limit.time.monotonic', return_value=100.0):
+        limiter = RateLimiter(requests_per_minute=60)
+        assert sum(limiter.reserve() for _ in range(60)) == 0
+        assert limiter.reserve() == pytest.approx(1.0)
+        assert limiter.reserve() == pytest.approx(2.0)
+    with patch('vector.rate_limit.time.monotonic', return_value=103.0):
+        assert limiter.reserve() == pytest.approx(0.0)
+
+
+def test_token_bucket_token_budget():
+    """Test that the token budget throttles large requests."""
+    with patch('vector.rate_limit.time.monotonic', return_value=0.0):
+        limiter = RateLimiter(tokens_per_minute=600)
+        assert limiter.reserve(600) == 0
+        assert limiter.reserve(20) == pytest.approx(2.0)
+
+
+def test_disabled_limits_never_wait():
+    """Test that a limiter without budgets never throttles."""
+    limiter = RateLimiter()
+    assert all(limiter.reserve(10 ** 9) == 0 for _ in range(100))
+
+
+def test_shared_rate_limiter_per_budget():
+    """Test that routers with the same budgets share one limiter."""
+    assert get_shared_rate_limiter(10, 20) is get_shared_rate_limiter(10, 20)
+    assert get_shared_rate_limiter(10, 20) is not get_shared_rate_limiter(10, 30)
+
+
+def test_retry_policy():
+    """Test which errors are retried and how long to wait."""
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=1.5)
+
+    assert policy.delay_for(OpenAIError("bad request"), 0) is None
+    assert policy.delay_for(_status_error(RateLimitError, 429, {'retry-after': '1.2'}), 0) == 1.2
+    # Server-requested delays are capped at max_delay
+    assert policy.delay_for(_status_error(RateLimitError, 429, {'retry-after': '7'}), 0) == 1.5
+    assert policy.delay_for(_status_error(RateLimitError, 429, {'retry-after': '1e12'}), 0) == 1.5
+    assert policy.delay_for(_status_error(RateLimitError, 429, {'retry-after-ms': '250'}), 1) == 0.25
+    assert 0 <= policy.delay_for(_status_error(InternalServerError, 500), 1) <= 1.5
+    assert policy.delay_for(_status_error(RateLimitError, 429, {'retry-after': '7'}), 2) is None
+
+
+def test_router_retries_rate_limited_requests(tmp_path, fake_response):
+    """Test that 429s are retried after Retry-After and reported as throttling."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), requests_per_minute=None, tokens_per_minute=None)
+    throttled = _status_error(RateLimitError, 429, {'retry-after': '0.01'})
+    with patch.object(router.client.embeddings, 'create', side_effect=[throttled, throttled, fake_response(["a"])]):
+        assert router.get_embedding("a") == [1.0, 0.5]
+
+    totals = router.get_cache_info()['metrics']['totals']
+    assert totals['retries'] == 2
+    assert totals['rate_limited_responses'] == 2
+    assert totals['api_calls'] == 3
+    assert totals['throttled_seconds'] == pytest.approx(0.02)
+
+
+def test_router_gives_up_after_max_retries(tmp_path):
+    """Test that retries are bounded by the retry policy."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), retry_policy=RetryPolicy(max_retries=1, base_delay=0.001))
+    with patch.object(router.client.embeddings, 'create', side_effect=_status_error(RateLimitError, 429)) as mock_create:
+        with pytest.raises(OpenAIError, match="Failed to generate embedding"):
+            router.get_embedding("a")
+    assert mock_create.call_count == 2
+
+
+def test_router_waits_for_rate_limiter(tmp_path, fake_response):
+    """Test that time spent in the token bucket is reported."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    router.rate_limiter = Mock(acquire=Mock(return_value=0.5))
+    with patch.object(router.client.embeddings, 'create', side_effect=lambda input, model: fake_response(input)):
+        router.get_embedding("a")
+    router.rate_limiter.acquire.assert_called_once()
+    assert router.metrics.get('throttled_seconds') == 0.5
+
+
+def test_async_router_retries(tmp_path, fake_response):
+    """Test that the async router backs off without failing the call."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path), requests_per_minute=None, tokens_per_minute=None)
+    responses = [_status_error(RateLimitError, 429, {'retry-after': '0'}), fake_response(["a"])]
+
+    async def create(input, model):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    router.async_client.embeddings.create = create
+    assert asyncio.run(router.aget_embedding("a")) == [1.0, 0.5]
+    assert router.metrics.get('retries') == 1
+    router.close()
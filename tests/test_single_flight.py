@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from openai import OpenAIError
+
+from vector.single_flight import SingleFlight
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+def test_claim_leads_new_keys_and_waits_on_others():
+    """Test that only the first claimant of a key leads it."""
+    flight = SingleFlight()
+    leading, waiting = flight.claim(["a", "b", "a"])
+    assert leading == ["a", "b"]
+    assert waiting == {}
+
+    leading, waiting = flight.claim(["b", "c"])
+    assert leading == ["c"]
+    assert set(waiting) == {"b"}
+
+    flight.resolve({"a": [1.0], "b": [2.0]})
+    assert waiting["b"].result() == [2.0]
+    assert len(flight) == 1
+
+
+def test_fail_propagates_to_waiters():
+    """Test that a failed leader fails everyone waiting on it."""
+    flight = SingleFlight()
+    flight.claim(["a"])
+    _, waiting = flight.claim(["a"])
+    flight.fail(["a"], OpenAIError("boom"))
+
+    with pytest.raises(OpenAIError, match="boom"):
+        waiting["a"].result()
+    assert flight.claim(["a"])[0] == ["a"]
+
+
+def _slow_create(calls, fake_response):
+    def create(input, model):
+        calls.append(list(input))
+        time.sleep(0.1)
+        return fake_response(input)
+    return create
+
+
+def test_concurrent_threads_share_one_request(tmp_path, fake_response):
+    """Test that concurrent misses on the same text make one API call."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    calls = []
+    results = []
+    with patch.object(router.client.embeddings, 'create', side_effect=_slow_create(calls, fake_response)):
+        threads = [
+            threading.Thread(target=lambda: results.append(router.get_embedding("same text")))
+            for _ in range(5)
+        ]
+        threads.append(threading.Thread(
+            target=lambda: results.append(router.get_embeddings_batch(["same text", "other"])[0])
+        ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == [[9.0, 0.5]] * 6
+    assert sum(batch.count("same text") for batch in calls) == 1
+    assert router.metrics.get('coalesced_requests') >= 1
+
+
+def test_batch_duplicates_requested_once(tmp_path, fake_response):
+    """Test that a text repeated within a batch is requested once."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    with patch.object(router.client.embeddings, 'create', side_effect=lambda input, model: fake_response(input)) as mock_create:
+        vectors = router.get_embeddings_batch(["a", "bb", "a"])
+
+    assert vectors == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    mock_create.assert_called_once_with(input=["a", "bb"], model=router.model)
+
+
+def test_waiters_see_leader_error(tmp_path):
+    """Test that waiters get the leader's error and the key is released."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path))
+    router._in_flight.claim([router._get_cache_key("x")])
+    leader_failed = threading.Timer(
+        0.05, lambda: router._in_flight.fail([router._get_cache_key("x")], OpenAIError("upstream down"))
+    )
+    leader_failed.start()
+    with patch.object(router.client.embeddings, 'create', side_effect=AssertionError("duplicate call")):
+        with pytest.raises(OpenAIError, match="upstream down"):
+            router.get_embedding("x")
+    assert len(router._in_flight) == 0
+
+
+def test_async_callers_share_one_request(tmp_path, fake_response):
+    """Test that concurrent asyncio callers coalesce on the same text."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path))
+    calls = []
+
+    async def create(input, model):
+        calls.append(list(input))
+        await asyncio.sleep(0.05)
+        return fake_response(input)
+
+    router.async_client.embeddings.create = create
+
+    async def run():
+        return await asyncio.gather(
+            *(router.aget_embedding("same text") for _ in range(4)),
+            router.aget_embeddings_batch(["other", "same text"])
+        )
+
+    results = asyncio.run(run())
+
+    assert results[:4] == [[9.0, 0.5]] * 4
+    assert results[4] == [[5.0, 0.5], [9.0, 0.5]]
+    assert sum(batch.count("same text") for batch in calls) == 1
+    router.close()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from vector.tokenization import estimate_tokens, plan_batches, get_token_counter
+from vector.embedding_router import EmbeddingRouter
+from vector.async_embedding_router import AsyncEmbeddingRouter
+
+
+def test_estimate_tokens_is_conservative():
+    """Test the tokenizer-free estimate."""
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("abcdef") == 2
+    assert estimate_tokens("中文") == 2
+
+
+def test_token_counter_without_tiktoken():
+    """Test that the estimate is used when tiktoken is missing."""
+    with patch('vector.tokenization.tiktoken', None):
+        assert get_token_counter("text-embedding-ada-002") is estimate_tokens
+
+
+def test_plan_batches_by_items_and_tokens():
+    """Test that sub-batches respect both limits and cover the input in order."""
+    assert plan_batches([1] * 5, max_items=2, max_tokens=100) == [(0, 2), (2, 4), (4, 5)]
+    assert plan_batches([40, 40, 40, 10], max_items=10, max_tokens=90) == [(0, 2), (2, 4)]
+    assert plan_batches([500, 1], max_items=10, max_tokens=100) == [(0, 1), (1, 2)]
+    assert plan_batches([], max_items=10, max_tokens=100) == []
+
+
+def test_router_splits_large_batches(tmp_path, fake_response):
+    """Test that a large batch is split, requested concurrently and kept in order."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), max_batch_items=3, max_parallel_requests=2)
+    texts = ["x" * n for n in range(1, 11)]
+    calls = []
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def create(input, model):
+        with lock:
+            calls.append(list(input))
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return fake_response(input)
+
+    with patch.object(router.client.embeddings, 'create', side_effect=create):
+        vectors = router.get_embeddings_batch(texts)
+        stats = router.get_last_call_stats()
+
+    assert vectors == [[float(n), 0.5] for n in range(1, 11)]
+    assert sorted(len(call) for call in calls) == [1, 3, 3, 3]
+    assert in_flight[1] == 2
+    assert stats == {'cache_hits': 0, 'cache_misses': 10, 'api_calls': 4}
+    assert router.get_cache_info()['num_entries'] == 10
+
+
+def test_router_splits_by_token_budget(tmp_path, fake_response):
+    """Test that the token budget splits batches of long texts."""
+    router = EmbeddingRouter(cache_dir=str(tmp_path), max_batch_tokens=10)
+    router._count_tokens = lambda text: 6
+    with patch.object(router.client.embeddings, 'create', side_effect=lambda input, model: fake_response(input)) as mock_create:
+        vectors = router.get_embeddings_batch(["x", "xx", "xxx"], use_cache=False)
+
+    assert vectors == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+    assert mock_create.call_count == 3
+
+
+def test_async_router_splits_large_batches(tmp_path, fake_response):
+    """Test sub-batching in the async router."""
+    router = AsyncEmbeddingRouter(cache_dir=str(tmp_path), max_batch_items=4)
+    calls = []
+
+    async def create(input, model):
+        calls.append(list(input))
+        return fake_response(input)
+
+    router.async_client.embeddings.create = create
+    vectors = asyncio.run(router.aget_embeddings_batch(["x" * n for n in range(1, 10)]))
+
+    assert vectors == [[float(n), 0.5] for n in range(1, 10)]
+    assert [len(call) for call in calls] == [4, 4, 1]
+    router.close()
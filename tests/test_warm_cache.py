@@ -0,0 +1,69 @@
+import json
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from vector.providers import DeterministicProvider
+from vector.embedding_router import EmbeddingRouter
+
+_spec = importlib.util.spec_from_file_location(
+    "warm_cache", Path(__file__).resolve().parent.parent / "scripts" / "warm_cache.py"
+)
+warm_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(warm_cache)
+
+
+class FailingProvider(DeterministicProvider):
+    """Deterministic provider that fails on a given text."""
+
+    def __init__(self, fail_on=None):
+        super().__init__(dimensions=4)
+        self.fail_on = fail_on
+        self.embedded = []
+
+    def embed(self, texts, model):
+        if self.fail_on in texts:
+            raise RuntimeError("upstream down")
+        self.embedded.extend(texts)
+        return super().embed(texts, model)
+
+
+def test_iter_texts_formats(tmp_path):
+    """Test reading TXT and JSONL inputs, skipping blank and invalid lines."""
+    txt = tmp_path / "corpus.txt"
+    txt.write_text("a\n\nb\n", encoding='utf-8')
+    assert list(warm_cache.iter_texts(txt)) == [(1, "a"), (3, "b")]
+    assert list(warm_cache.iter_texts(txt, start_line=1)) == [(3, "b")]
+
+    jsonl = tmp_path / "corpus.jsonl"
+    jsonl.write_text('{"q": "x"}\n{bad\n"y"\n{"other": 1}\n', encoding='utf-8')
+    assert list(warm_cache.iter_texts(jsonl, field="q")) == [(1, "x"), (3, "y")]
+
+
+def test_warm_cache_resumes_from_checkpoint(tmp_path):
+    """Test that an interrupted warm-up resumes without re-embedding finished batches."""
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("".join(f"text {i}\n" for i in range(10)), encoding='utf-8')
+    checkpoint = tmp_path / "corpus.ckpt"
+
+    provider = FailingProvider(fail_on="text 6")
+    router = EmbeddingRouter(cache_dir=str(tmp_path / "cache"), provider=provider, memory_cache_entries=0)
+    with pytest.raises(RuntimeError):
+        warm_cache.warm_cache(router, corpus, batch_size=3, parallel=1,
+                              checkpoint_path=checkpoint, quiet=True)
+    assert json.loads(checkpoint.read_text())['line'] == 6
+
+    provider.fail_on = None
+    result = warm_cache.warm_cache(router, corpus, batch_size=3, parallel=1,
+                                   checkpoint_path=checkpoint, quiet=True)
+    # Batches completed after the failure are found in the cache on resume
+    assert result['embedded'] + result['skipped'] == 10
+    assert result['line'] == 10
+    assert sorted(provider.embedded) == sorted(f"text {i}" for i in range(10))
+
+    # A fresh run over the same corpus only finds cached texts
+    result = warm_cache.warm_cache(router, corpus, batch_size=4, parallel=2, quiet=True)
+    assert result['embedded'] == 0
+    assert result['skipped'] == 10
+    router.close()
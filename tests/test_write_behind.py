@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from vector.cache_backends import JsonDirectoryCache
+from vector.metrics import RouterMetrics
+from vector.providers import DeterministicProvider
+from vector.embedding_router import EmbeddingRouter
+from vector.write_behind import WriteBehindCache
+
+VECTOR = [0.5, -0.25, 0.125, 1.0]
+
+
+class SlowBackend(JsonDirectoryCache):
+    """JSON backend whose batch writes wait until released."""
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.release = threading.Event()
+        self.batches = []
+
+    def put_many(self, items):
+        self.release.wait(5)
+        self.batches.append(len(items))
+        super().put_many(items)
+
+
+def test_queued_entries_readable_before_persisted(tmp_path):
+    """Test that puts return at once and are served from the queue until written."""
+    backend = SlowBackend(tmp_path)
+    cache = WriteBehindCache(backend, flush_interval=0.01)
+    cache.put("key-a", VECTOR, {"source": "test"})
+    assert cache.get("key-a") == VECTOR
+    assert cache.get_many(["key-a", "missing"]) == {"key-a": VECTOR, "missing": None}
+    assert cache.get_metadata("key-a") == {"source": "test"}
+    assert cache.contains("key-a")
+    assert not backend.contains("key-a")
+
+    backend.release.set()
+    cache.close()
+    assert backend.get("key-a") == VECTOR
+    assert cache.info()['pending_writes'] == 0
+
+
+def test_writes_are_batched_and_flushed_on_close(tmp_path):
+    """Test that queued writes reach the backend in batches and close flushes the rest."""
+    backend = SlowBackend(tmp_path)
+    backend.release.set()
+    cache = WriteBehindCache(backend, batch_size=10, flush_interval=60)
+    cache.metrics = RouterMetrics()
+    cache.put_many([(f"key-{i}", VECTOR, None) for i in range(25)])
+    cache.close()
+    assert backend.info()['num_entries'] == 25
+    assert sum(backend.batches) == 25
+    assert max(backend.batches) <= 10
+    assert cache.metrics.get('write_behind_entries') == 25
+
+
+def test_backpressure_policies(tmp_path):
+    """Test that a full queue drops or blocks new writes depending on the policy."""
+    backend = SlowBackend(tmp_path / "drop")
+    cache = WriteBehindCache(backend, max_pending=2, batch_size=1, backpressure="drop")
+    cache.metrics = RouterMetrics()
+    cache.put_many([(f"key-{i}", VECTOR, None) for i in range(5)])
+    assert cache.info()['pending_writes'] <= 2
+    assert cache.metrics.get('write_behind_dropped') >= 2
+    backend.release.set()
+    cache.close()
+
+    backend = SlowBackend(tmp_path / "block")
+    cache = WriteBehindCache(backend, max_pending=2, batch_size=1)
+    writer = threading.Thread(target=cache.put_many, args=([(f"key-{i}", VECTOR, None) for i in range(5)],))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive()
+    backend.release.set()
+    writer.join(5)
+    assert not writer.is_alive()
+    cache.close()
+    assert backend.info()['num_entries'] == 5
+
+    with pytest.raises(ValueError, match="backpressure"):
+        WriteBehindCache(backend, backpressure="spill")
+
+
+def test_router_write_behind(tmp_path):
+    """Test that a write-behind router serves new vectors and persists them on close."""
+    router = EmbeddingRouter(
+        cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=8),
+        memory_cache_entries=0, write_behind=True
+    )
+    vectors = router.get_embeddings_batch(["a", "b", "c"])
+    assert router.get_embeddings_batch(["a", "b", "c"]) == vectors
+    assert router.get_last_call_stats()['cache_hits'] == 3
+    router.close()
+
+    reopened = EmbeddingRouter(cache_dir=str(tmp_path), provider=DeterministicProvider(dimensions=8))
+    assert reopened.get_cache_info()['num_entries'] == 3
+    reopened.close()
@@ -0,0 +1,274 @@
+import os
+import asyncio
+import itertools
+from typing import List, Optional, Dict, Tuple
+from openai import AsyncOpenAI, OpenAIError
+from .embedding_router import EmbeddingRouter
+from .providers import OpenAIProvider
+
+
+class AsyncEmbeddingRouter(EmbeddingRouter):
+    """
+    Asyncio counterpart of ``EmbeddingRouter``.
+
+    Embeddings are requested through the provider's ``aembed`` (backed by
+    ``AsyncOpenAI`` for the OpenAI provider) and cache reads and
+    writes run in worker threads, so a slow API call or disk access never
+    blocks the event loop. The number of API requests in flight at once is
+    bounded by ``max_concurrent_requests``; further calls wait for a slot.
+
+    The cache segment, memory tier, maintenance and metrics are the ones of
+    ``EmbeddingRouter``, so the synchronous methods keep working on the
+    same cache and both paths count into the same telemetry. Cache misses
+    are coalesced across sync and async callers alike: a text that is
+    already being fetched is awaited instead of requested again.
+    """
+
+    def __init__(self, *args, max_concurrent_requests: int = 8, **kwargs):
+        """
+        Initialize the async embedding router.
+
+        Args:
+            *args: Positional arguments of ``EmbeddingRouter``
+            max_concurrent_requests (int): Maximum number of embedding API
+                requests in flight at once. Defaults to 8.
+            **kwargs: Keyword arguments of ``EmbeddingRouter``
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not found, the async client cannot
+                be created or ``max_concurrent_requests`` is not positive
+        """
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+        super().__init__(*args, **kwargs)
+
+        self.async_client = None
+        if isinstance(self.provider, OpenAIProvider):
+            if self.provider.async_client is None:
+                try:
+                    self.provider.async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+                except Exception as e:
+                    raise ValueError(f"Failed to initialize OpenAI client: {str(e)}")
+            self.async_client = self.provider.async_client
+
+        self.max_concurrent_requests = max_concurrent_requests
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+
+    async def _arequest_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the embeddings API for ``texts`` once a request slot is free.
+
+        Async version of ``_request_embeddings``: waits for the shared rate
+        limiter and backs off without blocking the event loop.
+
+        Args:
+            texts (List[str]): Texts to embed, sent as a single request
+
+        Returns:
+            List[List[float]]: Embedding vectors in input order
+
+        Raises:
+            OpenAIError: If the API call fails and is not retried
+        """
+        tokens = self._token_count(texts)
+        async with self._request_slots:
+            for attempt in itertools.count():
+                throttle = self.rate_limiter.reserve(tokens)
+                if throttle > 0:
+                    self.metrics.increment('throttled_seconds', throttle)
+                    await asyncio.sleep(throttle)
+                self.metrics.increment('api_calls')
+                try:
+                    result = await self.provider.aembed(texts, self.model, **self._request_options)
+                except OpenAIError as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                return self._parse_result(texts, result)
+
+    async def _aembed_texts(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Async version of ``_embed_texts``.
+
+        Sub-batches are requested concurrently; the router-wide
+        ``max_concurrent_requests`` limit bounds how many are in flight.
+        """
+        batches = self._plan_requests(texts)
+        results = await asyncio.gather(*(self._arequest_embeddings(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch], len(batches)
+
+    async def _aembed_uncached(
+        self,
+        texts: List[str],
+        metadata: Optional[List[Optional[Dict]]] = None
+    ) -> Tuple[List[List[float]], int]:
+        """
+        Async version of ``_embed_uncached``.
+
+        Waiting on another caller's request suspends only this task.
+        """
+        cache_keys = [self._get_cache_key(text) for text in texts]
+        leading, waiting = self._in_flight.claim(cache_keys)
+        results = {}
+        api_calls = 0
+        if leading:
+            lead_texts, lead_metadata = self._lead_keys(texts, cache_keys, leading, metadata)
+            try:
+                embeddings, api_calls = await self._aembed_texts(lead_texts)
+                await asyncio.to_thread(self._save_batch_to_cache, lead_texts, embeddings, lead_metadata)
+            except BaseException as e:
+                self._in_flight.fail(leading, e)
+                raise
+            results = dict(zip(leading, embeddings))
+            self._in_flight.resolve(results)
+        if waiting:
+            self.metrics.increment('coalesced_requests', len(waiting))
+            for cache_key, future in waiting.items():
+                results[cache_key] = await asyncio.wrap_future(future)
+        return [results[cache_key] for cache_key in cache_keys], api_calls
+
+    async def aget_embedding(
+        self,
+        text: str,
+        use_cache: bool = True,
+        metadata: Optional[Dict] = None
+    ) -> List[float]:
+        """
+        Get embedding vector for text without blocking the event loop.
+
+        Args:
+            text (str): Text to generate embedding for
+            use_cache (bool): Whether to use cache. Defaults to True.
+            metadata (Dict, optional): Additional metadata to store with the embedding
+
+        Returns:
+            List[float]: The embedding vector
+
+        Raises:
+            ValueError: If text is empty or invalid
+            OpenAIError: If there's an error calling the OpenAI API
+        """
+        if not text or not isinstance(text, str):
+            raise ValueError("Text must be a non-empty string")
+        if self.chunker is not None and self.chunker.needs_split(text):
+            return (await self.aget_embeddings_batch([text], use_cache=use_cache, metadata=[metadata]))[0]
+        normalized = self._normalize(text)
+
+        cache_key = self._get_cache_key(normalized)
+        if use_cache:
+            cached = await asyncio.to_thread(self._load_from_cache, cache_key)
+            if cached is not None:
+                if normalized != text:
+                    self.metrics.increment('normalized_hits')
+                self._record_call(hits=1, misses=0, api_calls=0)
+                return cached
+
+        try:
+            if use_cache:
+                embeddings, api_calls = await self._aembed_uncached([normalized], [metadata])
+                embedding = embeddings[0]
+            else:
+                embedding = (await self._arequest_embeddings([normalized]))[0]
+                api_calls = 1
+        except OpenAIError as e:
+            self._record_call(hits=0, misses=1 if use_cache else 0, api_calls=1)
+            raise OpenAIError(f"Failed to generate embedding: {str(e)}")
+        self._record_call(hits=0, misses=1 if use_cache else 0, api_calls=api_calls)
+        return embedding
+
+    async def aget_embeddings_batch(
+        self,
+        texts: List[str],
+        use_cache: bool = True,
+        metadata: Optional[List[Dict]] = None
+    ) -> List[List[float]]:
+        """
+        Get embedding vectors for multiple texts without blocking the event loop.
+
+        Cached texts are read in one worker-thread lookup and only the
+        distinct uncached ones are sent to the API, split into concurrent sub-batches
+        within the per-request item and token limits. Long texts are chunked
+        and pooled as in ``get_embeddings_batch`` when chunking is enabled.
+
+        Args:
+            texts (List[str]): List of texts to generate embeddings for
+            use_cache (bool): Whether to use cache. Defaults to True.
+            metadata (Optional[List[Dict]]): Optional metadata for each text
+
+        Returns:
+            List[List[float]]: List of embedding vectors in the same order as input texts
+
+        Raises:
+            ValueError: If texts list is empty or contains invalid items
+            OpenAIError: If there's an error calling the OpenAI API
+        """
+        self._validate_batch(texts, metadata)
+
+        plan = self._plan_chunks(texts, metadata)
+        if plan is not None:
+            chunks, chunk_metadata, spans = plan
+            return self._pool_chunks(await self._aget_embeddings_batch(chunks, use_cache, chunk_metadata), spans)
+        return await self._aget_embeddings_batch(texts, use_cache, metadata)
+
+    async def _aget_embeddings_batch(
+        self,
+        texts: List[str],
+        use_cache: bool,
+        metadata: Optional[List[Dict]]
+    ) -> List[List[float]]:
+        """Embed validated texts as they are, without chunking."""
+        results = [None] * len(texts)
+        normalized = [self._normalize(text) for text in texts]
+        if use_cache:
+            cached_results = await asyncio.to_thread(self._load_batch_from_cache, normalized)
+            indices_to_process = []
+            for i, text in enumerate(normalized):
+                cached = cached_results.get(text)
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    indices_to_process.append(i)
+            self._count_normalized_hits(texts, normalized, results)
+        else:
+            indices_to_process = list(range(len(texts)))
+        texts_to_process = [normalized[i] for i in indices_to_process]
+
+        cache_hits = len(texts) - len(texts_to_process) if use_cache else 0
+        cache_misses = len(texts_to_process) if use_cache else 0
+
+        if not texts_to_process:
+            self._record_call(hits=cache_hits, misses=0, api_calls=0)
+            return results
+
+        unique_texts, positions = self._dedupe(texts_to_process)
+        self.metrics.increment('deduplicated_texts', len(texts_to_process) - len(unique_texts))
+        try:
+            if use_cache:
+                batch_metadata = self._unique_metadata(metadata, indices_to_process, positions, len(unique_texts))
+                new_embeddings, api_calls = await self._aembed_uncached(unique_texts, batch_metadata)
+            else:
+                new_embeddings, api_calls = await self._aembed_texts(unique_texts)
+        except OpenAIError as e:
+            self._record_call(hits=cache_hits, misses=cache_misses, api_calls=1)
+            raise OpenAIError(f"Failed to generate batch embeddings: {str(e)}")
+        self._record_call(hits=cache_hits, misses=cache_misses, api_calls=api_calls)
+
+        for result_index, position in zip(indices_to_process, positions):
+            results[result_index] = new_embeddings[position]
+        return results
+
+    async def aget_cache_info(self) -> Dict:
+        """Async wrapper of ``get_cache_info`` that reads the cache in a worker thread."""
+        return await asyncio.to_thread(self.get_cache_info)
+
+    async def aclear_cache(self, all_segments: bool = False):
+        """Async wrapper of ``clear_cache`` that deletes entries in a worker thread."""
+        await asyncio.to_thread(self.clear_cache, all_segments)
+
+    async def aclose(self):
+        """Close the async HTTP client, stop maintenance and close the cache."""
+        if self.async_client is not None:
+            await self.async_client.close()
+        await asyncio.to_thread(self.close)
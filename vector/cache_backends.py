@@ -0,0 +1,1195 @@
+import os
+import json
+import base64
+import mmap
+import sqlite3
+import struct
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Dict, Iterator, Tuple, Union, NamedTuple
+
+from .quantization import PRECISION_CODES, PRECISION_NAMES, encode_vector, decode_vector, encoded_size
+
+# A cache item as handed to ``put_many``: (cache_key, embedding, metadata)
+CacheItem = Tuple[str, List[float], Optional[Dict]]
+
+
+class CacheEntryInfo(NamedTuple):
+    """Storage facts about one cache entry, as used by cache maintenance."""
+    cache_key: str
+    size_bytes: int
+    created_at: float
+
+
+class CacheBackend(ABC):
+    """
+    Base class for embedding cache storage backends.
+
+    A backend maps a cache key (a hex digest produced by the router) to an
+    embedding vector plus an optional metadata dict. Subclasses must implement
+    ``get``, ``get_metadata``, ``put``, ``delete``, ``keys``, ``clear``,
+    ``info`` and ``entries``; a backend without them cannot be instantiated.
+    The batch helpers fall back to looping over the single-item methods.
+
+    If ``metrics`` is set to a ``RouterMetrics`` instance the backend reports
+    the bytes it reads from storage under ``bytes_read``.
+    """
+
+    metrics = None
+
+    def _count_read(self, num_bytes: int):
+        if self.metrics is not None:
+            self.metrics.increment('bytes_read', num_bytes)
+
+    @abstractmethod
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        """Return the cached embedding for ``cache_key`` or None on a miss."""
+
+    @abstractmethod
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        """Return the metadata stored with ``cache_key`` or None on a miss."""
+
+    @abstractmethod
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        """Store ``embedding`` (and optional metadata) under ``cache_key``."""
+
+    @abstractmethod
+    def delete(self, cache_key: str) -> bool:
+        """Remove ``cache_key``. Returns True if an entry was removed."""
+
+    @abstractmethod
+    def keys(self) -> Iterator[str]:
+        """Iterate over all cache keys currently stored."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every entry from the cache."""
+
+    def get_many(self, cache_keys: List[str]) -> Dict[str, Optional[List[float]]]:
+        """Look up several keys at once. Missing keys map to None."""
+        return {cache_key: self.get(cache_key) for cache_key in cache_keys}
+
+    def put_many(self, items: List[CacheItem]):
+        """Store several (cache_key, embedding, metadata) items at once."""
+        for cache_key, embedding, metadata in items:
+            self.put(cache_key, embedding, metadata)
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        """
+        Store items that were cached before, keeping their creation times.
+
+        Used when importing cache packs, so TTL expiry and age filters see
+        the original age of each entry instead of the time of the import.
+        The default implementation stores them as new entries, for backends
+        that do not record creation times.
+
+        Args:
+            items (List[CacheItem]): ``(cache_key, embedding, metadata)`` items
+            created_at (List[float]): Unix creation time of each item
+        """
+        self.put_many(items)
+
+    def contains(self, cache_key: str) -> bool:
+        """Return True if ``cache_key`` is cached."""
+        return self.get(cache_key) is not None
+
+    def recent_keys(self, limit: int) -> List[str]:
+        """Return up to ``limit`` keys, most recently written first."""
+        return list(itertools.islice(self.keys(), limit))
+
+    @abstractmethod
+    def info(self) -> Dict:
+        """
+        Return storage statistics for the backend.
+
+        Returns:
+            Dict: ``num_entries`` and ``total_size_bytes`` of the backend
+        """
+
+    @abstractmethod
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        """Iterate over size and creation time of every stored entry."""
+
+    def compact(self) -> Dict:
+        """
+        Reclaim space and drop entries that can no longer be read.
+
+        The default implementation deletes every key whose vector fails to
+        load. Backends with their own storage layout override this.
+
+        Returns:
+            Dict: ``removed_corrupt`` entries and ``reclaimed_bytes``
+        """
+        removed = 0
+        reclaimed = 0
+        sizes = {entry.cache_key: entry.size_bytes for entry in self.entries()}
+        for cache_key in list(self.keys()):
+            if self.get(cache_key) is None and self.delete(cache_key):
+                removed += 1
+                reclaimed += sizes.get(cache_key, 0)
+        return {'removed_corrupt': removed, 'reclaimed_bytes': reclaimed}
+
+    def close(self):
+        """Release any open file handles. The default implementation is a no-op."""
+
+
+class CacheManifest:
+    """
+    Persisted entry count and byte total of one cache directory.
+
+    Backends update the manifest incrementally as entries are written and
+    removed, so statistics never require walking the cache. Changes are
+    flushed to a ``MANIFEST`` file (atomically, via a temp file and rename)
+    every ``flush_every`` updates or ``flush_interval`` seconds, and on
+    ``flush``. A crash can lose the unflushed tail; compaction recounts the
+    directory and resets the manifest to the true figures.
+    """
+
+    # Deliberately not *.json so it never looks like a cache entry
+    FILE_NAME = "MANIFEST"
+
+    def __init__(self, directory: Union[str, Path], flush_every: int = 100, flush_interval: float = 5.0):
+        self.path = Path(directory) / self.FILE_NAME
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.num_entries = 0
+        self.total_size_bytes = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def read(cls, directory: Union[str, Path]) -> Optional[Dict]:
+        """
+        Read the persisted statistics of a cache directory.
+
+        Returns:
+            Optional[Dict]: ``num_entries`` and ``total_size_bytes``, or None if
+            the directory has no valid manifest
+        """
+        try:
+            with (Path(directory) / cls.FILE_NAME).open('r') as f:
+                data = json.load(f)
+            return {
+                'num_entries': int(data['num_entries']),
+                'total_size_bytes': int(data['total_size_bytes'])
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def load(self) -> bool:
+        """Load persisted statistics. Returns False if there were none."""
+        data = self.read(self.path.parent)
+        if data is None:
+            return False
+        self.num_entries = data['num_entries']
+        self.total_size_bytes = data['total_size_bytes']
+        return True
+
+    def record(self, entries_delta: int, bytes_delta: int):
+        """Apply an incremental change to the statistics."""
+        with self._lock:
+            self.num_entries += entries_delta
+            self.total_size_bytes += bytes_delta
+            self._pending += 1
+            due = (self._pending >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def reset(self, num_entries: int, total_size_bytes: int):
+        """Replace the statistics with freshly counted figures and persist them."""
+        with self._lock:
+            self.num_entries = num_entries
+            self.total_size_bytes = total_size_bytes
+            self._pending += 1
+        self.flush()
+
+    def snapshot(self) -> Dict:
+        """Return the current statistics."""
+        with self._lock:
+            return {'num_entries': self.num_entries, 'total_size_bytes': self.total_size_bytes}
+
+    def flush(self):
+        """Persist pending changes to disk."""
+        with self._lock:
+            if not self._pending and self.path.exists():
+                return
+            data = {
+                'num_entries': self.num_entries,
+                'total_size_bytes': self.total_size_bytes,
+                'updated_at': time.time()
+            }
+            self._pending = 0
+            self._last_flush = time.monotonic()
+            tmp_path = self.path.with_name(f".{self.FILE_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with tmp_path.open('w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except FileNotFoundError:
+                # The cache directory was removed underneath us (segment dropped)
+                pass
+
+
+class JsonDirectoryCache(CacheBackend):
+    """
+    The original cache layout: one ``<cache_key>.json`` file per embedding.
+
+    Simple and human-readable, but every entry costs an inode and ~30KB of
+    JSON text that has to be re-parsed on each hit. Kept as the default so
+    existing cache directories keep working unchanged. Entry counts and
+    sizes are tracked in a ``CacheManifest`` so ``info`` is constant-time.
+    Entries are written atomically (temp file plus rename), but the
+    manifest is per process; use ``SqliteCache`` when several worker
+    processes share one cache directory.
+
+    With a ``precision`` set, vectors are stored as base64 of their
+    quantized bytes (``{"vector", "precision", "dim", "metadata"}``) instead
+    of a list of floats. Both forms are readable regardless of the setting.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], precision: Optional[str] = None):
+        """
+        Open (or create) a JSON directory cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding the JSON files
+            precision (str, optional): Storage precision for new entries, one
+                of ``PRECISIONS``. None keeps full-precision float lists.
+        """
+        if precision is not None and precision not in PRECISION_CODES:
+            raise ValueError(f"Unknown precision '{precision}'")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.precision = precision
+        self.manifest = CacheManifest(self.cache_dir)
+        if not self.manifest.load():
+            self._recount()
+
+    def _recount(self):
+        """Rebuild the manifest from a full scan of the directory."""
+        entries = list(self.entries())
+        self.manifest.reset(len(entries), sum(entry.size_bytes for entry in entries))
+
+    def _file_size(self, cache_key: str) -> Optional[int]:
+        try:
+            return self.path_for(cache_key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def path_for(self, cache_key: str) -> Path:
+        """Get the full path of the file holding ``cache_key``."""
+        return self.cache_dir / f"{cache_key}.json"
+
+    def _read(self, cache_key: str) -> Optional[Dict]:
+        cache_path = self.path_for(cache_key)
+        if cache_path.exists():
+            try:
+                with cache_path.open('r') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                return None
+            self._count_read(len(raw))
+            try:
+                return json.loads(raw)
+            except (json.JSONDecodeError, KeyError):
+                return None
+        return None
+
+    @staticmethod
+    def _embedding_from(cache_data) -> Optional[List[float]]:
+        """Extract the vector from a parsed cache file, None if it is unusable."""
+        if not isinstance(cache_data, dict):
+            return None
+        if 'vector' in cache_data:
+            try:
+                return decode_vector(
+                    base64.b64decode(cache_data['vector']),
+                    cache_data['precision'],
+                    cache_data['dim']
+                )
+            except (KeyError, TypeError, ValueError):
+                return None
+        embedding = cache_data.get('embedding')
+        return embedding if isinstance(embedding, list) else None
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        return self._embedding_from(self._read(cache_key))
+
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        cache_data = self._read(cache_key)
+        if not isinstance(cache_data, dict):
+            return None
+        return cache_data.get('metadata')
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        # The file's modification time is the entry's creation time
+        for (cache_key, embedding, metadata), timestamp in zip(items, created_at):
+            self.put(cache_key, embedding, metadata)
+            os.utime(self.path_for(cache_key), (timestamp, timestamp))
+
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        if self.precision is None:
+            cache_data = {'embedding': embedding}
+        else:
+            cache_data = {
+                'vector': base64.b64encode(encode_vector(embedding, self.precision)).decode('ascii'),
+                'precision': self.precision,
+                'dim': len(embedding)
+            }
+        cache_data['metadata'] = metadata if metadata is not None else {}
+        cache_path = self.path_for(cache_key)
+        previous_size = self._file_size(cache_key)
+        # Write to a private temp file and rename it into place, so concurrent
+        # readers (other threads or worker processes) never see a torn entry
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open('w') as f:
+            json.dump(cache_data, f)
+            size = f.tell()
+        os.replace(tmp_path, cache_path)
+        if previous_size is None:
+            self.manifest.record(1, size)
+        else:
+            self.manifest.record(0, size - previous_size)
+
+    def delete(self, cache_key: str) -> bool:
+        size = self._file_size(cache_key)
+        try:
+            self.path_for(cache_key).unlink()
+        except FileNotFoundError:
+            return False
+        self.manifest.record(-1, -(size or 0))
+        return True
+
+    def contains(self, cache_key: str) -> bool:
+        return self.path_for(cache_key).exists()
+
+    def keys(self) -> Iterator[str]:
+        for cache_file in self.cache_dir.glob("*.json"):
+            yield cache_file.stem
+
+    def recent_keys(self, limit: int) -> List[str]:
+        by_mtime = []
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                by_mtime.append((cache_file.stat().st_mtime, cache_file.stem))
+            except FileNotFoundError:
+                continue
+        by_mtime.sort(reverse=True)
+        return [cache_key for _, cache_key in by_mtime[:limit]]
+
+    def clear(self):
+        for cache_file in self.cache_dir.glob("*.json"):
+            cache_file.unlink()
+        self.manifest.reset(0, 0)
+
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                stat = cache_file.stat()
+            except FileNotFoundError:
+                continue
+            yield CacheEntryInfo(cache_file.stem, stat.st_size, stat.st_mtime)
+
+    def compact(self) -> Dict:
+        removed = 0
+        reclaimed = 0
+        for entry in list(self.entries()):
+            if self._embedding_from(self._read(entry.cache_key)) is not None:
+                continue
+            if self.delete(entry.cache_key):
+                removed += 1
+                reclaimed += entry.size_bytes
+        self._recount()
+        return {'removed_corrupt': removed, 'reclaimed_bytes': reclaimed}
+
+    def info(self) -> Dict:
+        return self.manifest.snapshot()
+
+    def close(self):
+        self.manifest.flush()
+
+
+class PackedVectorCache(CacheBackend):
+    """
+    Binary cache storing vectors as contiguous little-endian binary records.
+
+    Records are appended to segment files (``segment-00000.bin``, ...) that
+    roll over once they reach ``segment_max_bytes``. A separate append-only
+    ``index.bin`` log maps each cache key to its (segment, offset) and is
+    replayed into memory on open, so a lookup is a dict access followed by a
+    slice of a memory-mapped segment - no per-entry files and no float
+    parsing.
+
+    Record layout in a segment::
+
+        <HIIdB  key_len, dim, meta_len, created_at (unix time), precision code
+        key bytes (utf-8), metadata bytes (JSON, utf-8), encoded vector
+
+    Vectors are float32 by default; with ``precision="float16"`` or
+    ``"int8"`` they are quantized (see ``vector.quantization``). The
+    precision is recorded per record, so changing it only affects new writes.
+
+    Index log entry::
+
+        <HIQ  key_len, segment_id, offset   followed by the key bytes
+
+    A ``segment_id`` of ``TOMBSTONE`` marks a deleted key. Records are written
+    and flushed before their index entry, so a crash can at worst leave an
+    unreferenced record behind, never an index entry pointing at garbage.
+    Overwritten and deleted records stay in their segment until ``compact``
+    rewrites the live records into fresh segments.
+    """
+
+    RECORD_HEADER = struct.Struct("<HIIdB")
+    INDEX_ENTRY = struct.Struct("<HIQ")
+    TOMBSTONE = 0xFFFFFFFF
+    INDEX_FILE = "index.bin"
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        precision: Optional[str] = None
+    ):
+        """
+        Open (or create) a packed cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding segments and index
+            segment_max_bytes (int): Size at which a new segment is started
+            precision (str, optional): Storage precision for new records, one
+                of ``PRECISIONS``. Defaults to "float32".
+        """
+        if precision is None:
+            precision = "float32"
+        if precision not in PRECISION_CODES:
+            raise ValueError(f"Unknown precision '{precision}'")
+        self.precision = precision
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.RLock()
+        # cache_key -> (segment_id, offset, record_size)
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._live_bytes = 0
+        self._active_id = 0
+        self._active_file = None
+        self._index_file = None
+        self.manifest = CacheManifest(self.cache_dir)
+        self._open()
+        self.manifest.reset(len(self._index), self._live_bytes)
+
+    # -- file helpers -------------------------------------------------------
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.cache_dir / f"segment-{segment_id:05d}.bin"
+
+    def _segment_ids(self) -> List[int]:
+        ids = []
+        for path in self.cache_dir.glob("segment-*.bin"):
+            try:
+                ids.append(int(path.stem.split("-", 1)[1]))
+            except ValueError:
+                continue
+        return sorted(ids)
+
+    def _open(self):
+        segment_sizes = {sid: self._segment_path(sid).stat().st_size for sid in self._segment_ids()}
+        index_path = self.cache_dir / self.INDEX_FILE
+        if index_path.exists():
+            self._replay_index(index_path, segment_sizes)
+        self._active_id = max(segment_sizes) if segment_sizes else 0
+        self._active_file = self._segment_path(self._active_id).open('ab')
+        self._index_file = index_path.open('ab')
+
+    def _replay_index(self, index_path: Path, segment_sizes: Dict[int, int]):
+        with index_path.open('rb') as f:
+            data = f.read()
+        pos = 0
+        entry_size = self.INDEX_ENTRY.size
+        while pos + entry_size <= len(data):
+            key_len, segment_id, offset = self.INDEX_ENTRY.unpack_from(data, pos)
+            pos += entry_size
+            if pos + key_len > len(data):
+                break  # torn trailing entry
+            cache_key = data[pos:pos + key_len].decode('utf-8')
+            pos += key_len
+            if segment_id == self.TOMBSTONE:
+                self._forget(cache_key)
+                continue
+            record_size = self._record_size_at(segment_id, offset, segment_sizes)
+            if record_size is None:
+                continue
+            self._forget(cache_key)
+            self._index[cache_key] = (segment_id, offset, record_size)
+            self._live_bytes += record_size
+
+    def _record_size_at(self, segment_id: int, offset: int, segment_sizes: Dict[int, int]) -> Optional[int]:
+        """Validate that a full record exists at ``offset`` and return its size."""
+        segment_size = segment_sizes.get(segment_id)
+        if segment_size is None or offset + self.RECORD_HEADER.size > segment_size:
+            return None
+        view = self._map(segment_id, offset + self.RECORD_HEADER.size)
+        key_len, dim, meta_len, _, code = self.RECORD_HEADER.unpack_from(view, offset)
+        if code not in PRECISION_NAMES:
+            return None
+        record_size = self.RECORD_HEADER.size + key_len + meta_len + encoded_size(dim, PRECISION_NAMES[code])
+        if offset + record_size > segment_size:
+            return None
+        return record_size
+
+    def _forget(self, cache_key: str):
+        previous = self._index.pop(cache_key, None)
+        if previous is not None:
+            self._live_bytes -= previous[2]
+
+    def _map(self, segment_id: int, needed_end: int = 0) -> mmap.mmap:
+        """Return a read-only map of a segment covering at least ``needed_end`` bytes."""
+        current = self._maps.get(segment_id)
+        if current is not None and len(current) >= needed_end:
+            return current
+        if current is not None:
+            current.close()
+        path = self._segment_path(segment_id)
+        with path.open('rb') as f:
+            mapped = mmap.mmap(f.fileno(), path.stat().st_size, access=mmap.ACCESS_READ)
+        self._maps[segment_id] = mapped
+        return mapped
+
+    def _read_record(self, cache_key: str) -> Optional[Tuple[Dict, List[float]]]:
+        with self._lock:
+            location = self._index.get(cache_key)
+            if location is None:
+                return None
+            segment_id, offset, record_size = location
+            try:
+                view = self._map(segment_id, offset + record_size)
+                key_len, dim, meta_len, _, code = self.RECORD_HEADER.unpack_from(view, offset)
+            except (OSError, ValueError, struct.error):
+                return None
+            pos = offset + self.RECORD_HEADER.size + key_len
+            meta_bytes = view[pos:pos + meta_len]
+            pos += meta_len
+            vector_bytes = view[pos:offset + record_size]
+        self._count_read(record_size)
+        try:
+            vector = decode_vector(vector_bytes, PRECISION_NAMES[code], dim)
+            metadata = json.loads(meta_bytes.decode('utf-8')) if meta_len else {}
+        except (KeyError, ValueError):
+            # Record overwritten or truncated since it was indexed; bad JSON
+            # and UTF-8 surface as ValueError subclasses
+            return None
+        return metadata, vector
+
+    def _append(
+        self,
+        cache_key: str,
+        embedding: List[float],
+        metadata: Optional[Dict],
+        created_at: Optional[float] = None
+    ):
+        key_bytes = cache_key.encode('utf-8')
+        meta_bytes = json.dumps(metadata).encode('utf-8') if metadata else b""
+        record = b"".join([
+            self.RECORD_HEADER.pack(
+                len(key_bytes), len(embedding), len(meta_bytes),
+                time.time() if created_at is None else created_at, PRECISION_CODES[self.precision]
+            ),
+            key_bytes,
+            meta_bytes,
+            encode_vector(embedding, self.precision)
+        ])
+        offset = self._active_file.tell()
+        if offset > 0 and offset + len(record) > self.segment_max_bytes:
+            self._active_file.close()
+            self._active_id += 1
+            self._active_file = self._segment_path(self._active_id).open('ab')
+            offset = 0
+        self._active_file.write(record)
+        self._active_file.flush()
+        self._write_index_entry(key_bytes, self._active_id, offset)
+        previous = self._index.get(cache_key)
+        self._forget(cache_key)
+        self._index[cache_key] = (self._active_id, offset, len(record))
+        self._live_bytes += len(record)
+        if previous is None:
+            self.manifest.record(1, len(record))
+        else:
+            self.manifest.record(0, len(record) - previous[2])
+
+    def _write_index_entry(self, key_bytes: bytes, segment_id: int, offset: int):
+        self._index_file.write(self.INDEX_ENTRY.pack(len(key_bytes), segment_id, offset) + key_bytes)
+        self._index_file.flush()
+
+    # -- CacheBackend -------------------------------------------------------
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        record = self._read_record(cache_key)
+        return record[1] if record is not None else None
+
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        record = self._read_record(cache_key)
+        return record[0] if record is not None else None
+
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        with self._lock:
+            self._append(cache_key, embedding, metadata)
+
+    def put_many(self, items: List[CacheItem]):
+        with self._lock:
+            for cache_key, embedding, metadata in items:
+                self._append(cache_key, embedding, metadata)
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        with self._lock:
+            for (cache_key, embedding, metadata), timestamp in zip(items, created_at):
+                self._append(cache_key, embedding, metadata, timestamp)
+
+    def delete(self, cache_key: str) -> bool:
+        with self._lock:
+            if cache_key not in self._index:
+                return False
+            self._write_index_entry(cache_key.encode('utf-8'), self.TOMBSTONE, 0)
+            size = self._index[cache_key][2]
+            self._forget(cache_key)
+            self.manifest.record(-1, -size)
+            return True
+
+    def contains(self, cache_key: str) -> bool:
+        with self._lock:
+            return cache_key in self._index
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = list(self._index)
+        return iter(snapshot)
+
+    def recent_keys(self, limit: int) -> List[str]:
+        # The index dict is ordered by the time each key was (re)written
+        with self._lock:
+            return list(itertools.islice(reversed(self._index), limit))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self):
+        with self._lock:
+            self._close_files()
+            for segment_id in self._segment_ids():
+                self._segment_path(segment_id).unlink()
+            index_path = self.cache_dir / self.INDEX_FILE
+            if index_path.exists():
+                index_path.unlink()
+            self._index.clear()
+            self._live_bytes = 0
+            self._open()
+            self.manifest.reset(0, 0)
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {
+                'num_entries': len(self._index),
+                'total_size_bytes': self._live_bytes
+            }
+
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        with self._lock:
+            snapshot = list(self._index.items())
+        for cache_key, (segment_id, offset, record_size) in snapshot:
+            with self._lock:
+                if self._index.get(cache_key) != (segment_id, offset, record_size):
+                    continue
+                view = self._map(segment_id, offset + record_size)
+                created_at = self.RECORD_HEADER.unpack_from(view, offset)[3]
+            yield CacheEntryInfo(cache_key, record_size, created_at)
+
+    def _valid_record(self, cache_key: str, segment_id: int, offset: int, record_size: int) -> Optional[bytes]:
+        """Return the raw bytes of a record if it is intact, otherwise None."""
+        view = self._map(segment_id, offset + record_size)
+        if offset + record_size > len(view):
+            return None
+        key_len, dim, meta_len, _, _ = self.RECORD_HEADER.unpack_from(view, offset)
+        pos = offset + self.RECORD_HEADER.size
+        if dim == 0 or bytes(view[pos:pos + key_len]) != cache_key.encode('utf-8'):
+            return None
+        if meta_len:
+            try:
+                json.loads(bytes(view[pos + key_len:pos + key_len + meta_len]).decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                return None
+        return bytes(view[offset:offset + record_size])
+
+    def compact(self) -> Dict:
+        """
+        Rewrite live records into fresh segments and drop everything else.
+
+        Reclaims space held by overwritten and deleted records and removes
+        records that fail validation. The new index is swapped in atomically,
+        so a crash mid-compaction leaves the old segments and index usable.
+        """
+        with self._lock:
+            old_ids = self._segment_ids()
+            bytes_before = sum(self._segment_path(sid).stat().st_size for sid in old_ids)
+            segment_id = old_ids[-1] + 1 if old_ids else 0
+            index_path = self.cache_dir / self.INDEX_FILE
+            tmp_index_path = self.cache_dir / (self.INDEX_FILE + ".tmp")
+            removed = 0
+            segment_file = self._segment_path(segment_id).open('wb')
+            offset = 0
+            try:
+                with tmp_index_path.open('wb') as index_out:
+                    for cache_key, location in list(self._index.items()):
+                        record = self._valid_record(cache_key, *location)
+                        if record is None:
+                            removed += 1
+                            continue
+                        if offset > 0 and offset + len(record) > self.segment_max_bytes:
+                            segment_file.close()
+                            segment_id += 1
+                            segment_file = self._segment_path(segment_id).open('wb')
+                            offset = 0
+                        segment_file.write(record)
+                        key_bytes = cache_key.encode('utf-8')
+                        index_out.write(self.INDEX_ENTRY.pack(len(key_bytes), segment_id, offset) + key_bytes)
+                        offset += len(record)
+                    index_out.flush()
+                    os.fsync(index_out.fileno())
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+            finally:
+                segment_file.close()
+            self._close_files()
+            os.replace(tmp_index_path, index_path)
+            for sid in old_ids:
+                self._segment_path(sid).unlink()
+            self._index.clear()
+            self._live_bytes = 0
+            self._open()
+            self.manifest.reset(len(self._index), self._live_bytes)
+            bytes_after = sum(self._segment_path(sid).stat().st_size for sid in self._segment_ids())
+            return {'removed_corrupt': removed, 'reclaimed_bytes': bytes_before - bytes_after}
+
+    def _close_files(self):
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+            self.manifest.flush()
+
+
+class SqliteCache(CacheBackend):
+    """
+    Cache stored in one SQLite database in WAL mode, safe to share between processes.
+
+    Meant for deployments running several worker processes on one cache
+    directory (e.g. ``uvicorn --workers N``): readers never block each other
+    or the writer, every write is a transaction so no reader ever sees a
+    torn entry, and all processes see one consistent cache. Writers from
+    different processes are serialized by SQLite and wait up to
+    ``busy_timeout`` seconds for the write lock.
+
+    Entry counts and sizes are kept in a one-row ``stats`` table maintained
+    by triggers, so ``info`` is constant-time and correct across processes.
+    Vectors are stored as encoded bytes (float32 unless ``precision`` says
+    otherwise, see ``vector.quantization``).
+    """
+
+    DB_FILE = "cache.sqlite3"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            cache_key TEXT PRIMARY KEY,
+            dim INTEGER NOT NULL,
+            precision TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            metadata TEXT,
+            created_at REAL NOT NULL,
+            size_bytes INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at);
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            num_entries INTEGER NOT NULL,
+            total_size_bytes INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO stats VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+            UPDATE stats SET num_entries = num_entries + 1,
+                             total_size_bytes = total_size_bytes + NEW.size_bytes;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE ON entries BEGIN
+            UPDATE stats SET total_size_bytes = total_size_bytes - OLD.size_bytes + NEW.size_bytes;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE stats SET num_entries = num_entries - 1,
+                             total_size_bytes = total_size_bytes - OLD.size_bytes;
+        END;
+    """
+
+    UPSERT = """
+        INSERT INTO entries (cache_key, dim, precision, vector, metadata, created_at, size_bytes)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (cache_key) DO UPDATE SET
+            dim = excluded.dim, precision = excluded.precision, vector = excluded.vector,
+            metadata = excluded.metadata, created_at = excluded.created_at,
+            size_bytes = excluded.size_bytes
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        precision: Optional[str] = None,
+        busy_timeout: float = 30.0
+    ):
+        """
+        Open (or create) an SQLite cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding the database file
+            precision (str, optional): Storage precision for new entries, one
+                of ``PRECISIONS``. Defaults to "float32".
+            busy_timeout (float): Seconds a write waits while another process
+                holds the write lock
+        """
+        if precision is None:
+            precision = "float32"
+        if precision not in PRECISION_CODES:
+            raise ValueError(f"Unknown precision '{precision}'")
+        self.precision = precision
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.cache_dir / self.DB_FILE
+        # One connection per backend, shared by this process's threads under the lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # Mirror the statistics into the directory manifest so other routers
+        # can list this segment without opening the database
+        self.manifest = CacheManifest(self.cache_dir)
+        self.manifest.reset(**self.info())
+
+    def _row(
+        self,
+        cache_key: str,
+        embedding: List[float],
+        metadata: Optional[Dict],
+        created_at: Optional[float] = None
+    ) -> Tuple:
+        vector = encode_vector(embedding, self.precision)
+        meta = json.dumps(metadata) if metadata else None
+        size = len(cache_key) + len(vector) + len(meta or "")
+        created_at = time.time() if created_at is None else created_at
+        return (cache_key, len(embedding), self.precision, vector, meta, created_at, size)
+
+    def _write(self, rows: List[Tuple]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(self.UPSERT, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _fetch(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _decode(self, row: Tuple) -> Optional[List[float]]:
+        dim, precision, vector = row
+        self._count_read(len(vector))
+        try:
+            return decode_vector(vector, precision, dim)
+        except (ValueError, struct.error):
+            return None
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        rows = self._fetch("SELECT dim, precision, vector FROM entries WHERE cache_key = ?", (cache_key,))
+        return self._decode(rows[0]) if rows else None
+
+    def get_many(self, cache_keys: List[str]) -> Dict[str, Optional[List[float]]]:
+        results = {cache_key: None for cache_key in cache_keys}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(cache_keys), 500):
+            chunk = cache_keys[start:start + 500]
+            rows = self._fetch(
+                f"SELECT cache_key, dim, precision, vector FROM entries "
+                f"WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            for cache_key, *row in rows:
+                results[cache_key] = self._decode(row)
+        return results
+
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        rows = self._fetch("SELECT metadata FROM entries WHERE cache_key = ?", (cache_key,))
+        if not rows:
+            return None
+        return json.loads(rows[0][0]) if rows[0][0] else {}
+
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        self._write([self._row(cache_key, embedding, metadata)])
+
+    def put_many(self, items: List[CacheItem]):
+        if items:
+            self._write([self._row(*item) for item in items])
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        if items:
+            self._write([self._row(*item, timestamp) for item, timestamp in zip(items, created_at)])
+
+    def delete(self, cache_key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,)).rowcount > 0
+
+    def contains(self, cache_key: str) -> bool:
+        return bool(self._fetch("SELECT 1 FROM entries WHERE cache_key = ?", (cache_key,)))
+
+    def keys(self) -> Iterator[str]:
+        return iter([row[0] for row in self._fetch("SELECT cache_key FROM entries")])
+
+    def recent_keys(self, limit: int) -> List[str]:
+        rows = self._fetch("SELECT cache_key FROM entries ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [row[0] for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+        self.manifest.reset(0, 0)
+
+    def info(self) -> Dict:
+        num_entries, total_size_bytes = self._fetch("SELECT num_entries, total_size_bytes FROM stats")[0]
+        return {'num_entries': num_entries, 'total_size_bytes': total_size_bytes}
+
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        rows = self._fetch("SELECT cache_key, size_bytes, created_at FROM entries")
+        return iter([CacheEntryInfo(*row) for row in rows])
+
+    def compact(self) -> Dict:
+        """
+        Drop undecodable entries, then checkpoint the WAL and vacuum the database.
+
+        Returns:
+            Dict: ``removed_corrupt`` entries and ``reclaimed_bytes`` of the
+            database file
+        """
+        removed = 0
+        for cache_key in list(self.keys()):
+            if self.get(cache_key) is None and self.delete(cache_key):
+                removed += 1
+        with self._lock:
+            size_before = self._disk_size()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            reclaimed = size_before - self._disk_size()
+        self.manifest.reset(**self.info())
+        return {'removed_corrupt': removed, 'reclaimed_bytes': max(reclaimed, 0)}
+
+    def _disk_size(self) -> int:
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += self.path.with_name(self.path.name + suffix).stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def close(self):
+        with self._lock:
+            try:
+                self.manifest.reset(**self.info())
+            except sqlite3.ProgrammingError:
+                return  # already closed
+            self._conn.close()
+
+
+def migrate_json_cache(
+    source_dir: Union[str, Path],
+    target: CacheBackend,
+    remove_source: bool = False
+) -> int:
+    """
+    Copy every entry of a JSON-directory cache into another backend.
+
+    Unreadable or corrupt JSON files are skipped. Keys already present in
+    ``target`` are left untouched. The source directory is only read (and,
+    with ``remove_source``, emptied); no manifest is written into it.
+
+    Args:
+        source_dir (Union[str, Path]): Directory of ``<cache_key>.json`` files
+        target (CacheBackend): Backend to copy the entries into
+        remove_source (bool): Delete each JSON file once it has been copied
+
+    Returns:
+        int: Number of entries copied
+    """
+    copied = 0
+    for cache_file in list(Path(source_dir).glob("*.json")):
+        cache_key = cache_file.stem
+        if remove_source and isinstance(target, JsonDirectoryCache):
+            # Same on-disk format: moving the file is enough
+            if not target.contains(cache_key):
+                try:
+                    size = cache_file.stat().st_size
+                    os.replace(cache_file, target.path_for(cache_key))
+                except FileNotFoundError:
+                    continue
+                target.manifest.record(1, size)
+                copied += 1
+            else:
+                cache_file.unlink(missing_ok=True)
+            continue
+        if not target.contains(cache_key):
+            try:
+                cache_data = json.loads(cache_file.read_text())
+            except (OSError, ValueError):
+                continue
+            embedding = JsonDirectoryCache._embedding_from(cache_data)
+            if embedding is None:
+                continue
+            target.put(cache_key, embedding, cache_data.get('metadata') or None)
+            copied += 1
+        if remove_source:
+            cache_file.unlink(missing_ok=True)
+    if copied and isinstance(target, JsonDirectoryCache):
+        target.manifest.flush()
+    return copied
+
+
+CACHE_BACKENDS = {
+    'json': JsonDirectoryCache,
+    'packed': PackedVectorCache,
+    'sqlite': SqliteCache,
+}
+
+
+def detect_cache_backend(cache_dir: Union[str, Path]) -> Optional[str]:
+    """
+    Name the backend whose files are stored in ``cache_dir``.
+
+    Args:
+        cache_dir (Union[str, Path]): Segment directory to inspect
+
+    Returns:
+        Optional[str]: A key of ``CACHE_BACKENDS``, or None if the directory
+        holds no entries of any backend
+    """
+    cache_dir = Path(cache_dir)
+    if (cache_dir / SqliteCache.DB_FILE).exists():
+        return "sqlite"
+    if (cache_dir / PackedVectorCache.INDEX_FILE).exists():
+        return "packed"
+    if any(cache_dir.glob("*.json")):
+        return "json"
+    return None
+
+
+def read_segment_info(cache_dir: Union[str, Path]) -> Dict:
+    """
+    Read the statistics of a segment directory without opening it for writing.
+
+    The manifest is used when there is one. Otherwise the entries of the
+    detected backend are counted read-only (for packed segments the byte
+    total is the size of the segment files, dead records included). Nothing
+    is created or modified, so this is safe on segments of other backends
+    and on every stats request.
+
+    Args:
+        cache_dir (Union[str, Path]): Segment directory to inspect
+
+    Returns:
+        Dict: ``backend`` (None if no backend's files are present),
+        ``num_entries`` and ``total_size_bytes``
+    """
+    cache_dir = Path(cache_dir)
+    backend = detect_cache_backend(cache_dir)
+    info = CacheManifest.read(cache_dir)
+    if info is None:
+        info = {'num_entries': 0, 'total_size_bytes': 0}
+        try:
+            if backend == "json":
+                sizes = [path.stat().st_size for path in cache_dir.glob("*.json")]
+                info = {'num_entries': len(sizes), 'total_size_bytes': sum(sizes)}
+            elif backend == "sqlite":
+                uri = f"{(cache_dir / SqliteCache.DB_FILE).resolve().as_uri()}?mode=ro"
+                conn = sqlite3.connect(uri, uri=True)
+                try:
+                    num_entries, total_size_bytes = conn.execute(
+                        "SELECT num_entries, total_size_bytes FROM stats WHERE id = 0"
+                    ).fetchone()
+                finally:
+                    conn.close()
+                info = {'num_entries': num_entries, 'total_size_bytes': total_size_bytes}
+            elif backend == "packed":
+                info = {
+                    'num_entries': len(_packed_live_keys(cache_dir / PackedVectorCache.INDEX_FILE)),
+                    'total_size_bytes': sum(path.stat().st_size for path in cache_dir.glob("segment-*.bin"))
+                }
+        except (OSError, sqlite3.Error, TypeError):
+            # Files vanished or the database is unreadable: report it as empty
+            pass
+    return {'backend': backend, **info}
+
+
+def _packed_live_keys(index_path: Path) -> set:
+    """Replay a packed cache's index log and return the keys not deleted."""
+    data = index_path.read_bytes()
+    entry = PackedVectorCache.INDEX_ENTRY
+    live = set()
+    pos = 0
+    while pos + entry.size <= len(data):
+        key_len, segment_id, _ = entry.unpack_from(data, pos)
+        pos += entry.size
+        if pos + key_len > len(data):
+            break  # torn trailing entry
+        cache_key = data[pos:pos + key_len].decode('utf-8', errors='replace')
+        pos += key_len
+        if segment_id == PackedVectorCache.TOMBSTONE:
+            live.discard(cache_key)
+        else:
+            live.add(cache_key)
+    return live
+
+
+def create_cache_backend(name: str, cache_dir: Union[str, Path], **options) -> CacheBackend:
+    """
+    Instantiate a cache backend by name.
+
+    Args:
+        name (str): One of the keys of ``CACHE_BACKENDS``
+        cache_dir (Union[str, Path]): Directory the backend stores its data in
+        **options: Extra keyword arguments for the backend constructor
+
+    Returns:
+        CacheBackend: The configured backend
+
+    Raises:
+        ValueError: If ``name`` is not a known backend
+    """
+    try:
+        backend_cls = CACHE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache backend '{name}'. Available: {', '.join(sorted(CACHE_BACKENDS))}"
+        )
+    return backend_cls(cache_dir, **options)
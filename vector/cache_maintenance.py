@@ -0,0 +1,191 @@
+import time
+import logging
+import threading
+from typing import List, Optional, Dict
+
+from .cache_backends import CacheBackend, CacheEntryInfo
+
+logger = logging.getLogger(__name__)
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+class CachePolicy:
+    """
+    Limits applied to an embedding cache by ``CacheMaintainer``.
+
+    Any limit left as None is not enforced.
+    """
+
+    def __init__(
+        self,
+        max_size_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        eviction: str = "lru"
+    ):
+        """
+        Initialize the cache policy.
+
+        Args:
+            max_size_bytes (int, optional): Maximum total size of stored entries
+            max_entries (int, optional): Maximum number of stored entries
+            ttl_seconds (float, optional): Entries older than this are expired
+            eviction (str): "lru" evicts the least recently used entries first,
+                "lfu" the least frequently used ones. Defaults to "lru".
+
+        Raises:
+            ValueError: If ``eviction`` is not a known policy
+        """
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction must be one of {', '.join(EVICTION_POLICIES)}")
+        self.max_size_bytes = max_size_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.eviction = eviction
+
+
+class CacheMaintainer:
+    """
+    Enforces a ``CachePolicy`` on a cache backend from a background thread.
+
+    Each maintenance pass expires entries past their TTL, then evicts entries
+    in LRU or LFU order until the size and entry limits hold. Access recency
+    and frequency are recorded in memory via ``touch``; entries that have not
+    been accessed since the process started fall back to their creation time
+    with zero hits.
+    """
+
+    def __init__(
+        self,
+        cache: CacheBackend,
+        policy: CachePolicy,
+        interval_seconds: float = 300.0,
+        compact_every: int = 12
+    ):
+        """
+        Initialize the maintainer.
+
+        Args:
+            cache (CacheBackend): Cache to maintain. Evictions go through its
+                ``delete`` so every tier above the disk sees them.
+            policy (CachePolicy): Limits to enforce
+            interval_seconds (float): Time between maintenance passes
+            compact_every (int): Run ``compact`` on every n-th pass. 0 disables
+                periodic compaction.
+        """
+        self.cache = cache
+        self.policy = policy
+        self.interval_seconds = interval_seconds
+        self.compact_every = compact_every
+        self._access: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._passes = 0
+
+    def touch(self, cache_key: str):
+        """Record a cache hit for ``cache_key``."""
+        now = time.time()
+        with self._lock:
+            access = self._access.get(cache_key)
+            if access is None:
+                self._access[cache_key] = [now, 1]
+            else:
+                access[0] = now
+                access[1] += 1
+
+    def _rank(self, entry: CacheEntryInfo):
+        last_access, hits = self._access.get(entry.cache_key, (entry.created_at, 0))
+        if self.policy.eviction == "lfu":
+            return (hits, last_access)
+        return (last_access,)
+
+    def _evict(self, cache_key: str) -> bool:
+        with self._lock:
+            self._access.pop(cache_key, None)
+        return self.cache.delete(cache_key)
+
+    def run_once(self) -> Dict:
+        """
+        Run a single maintenance pass.
+
+        Returns:
+            Dict: Numbers of ``expired`` and ``evicted`` entries and the
+            ``remaining_entries`` / ``remaining_bytes`` after the pass
+        """
+        entries = list(self.cache.entries())
+        expired = 0
+        if self.policy.ttl_seconds is not None:
+            cutoff = time.time() - self.policy.ttl_seconds
+            kept = []
+            for entry in entries:
+                if entry.created_at < cutoff:
+                    expired += self._evict(entry.cache_key)
+                else:
+                    kept.append(entry)
+            entries = kept
+
+        total_bytes = sum(entry.size_bytes for entry in entries)
+        count = len(entries)
+        evicted = 0
+        if self._over_limits(count, total_bytes):
+            with self._lock:
+                entries.sort(key=self._rank)
+            for entry in entries:
+                if not self._over_limits(count, total_bytes):
+                    break
+                if self._evict(entry.cache_key):
+                    evicted += 1
+                count -= 1
+                total_bytes -= entry.size_bytes
+
+        if expired or evicted:
+            logger.info("Embedding cache maintenance: expired %d, evicted %d entries", expired, evicted)
+        return {
+            'expired': expired,
+            'evicted': evicted,
+            'remaining_entries': count,
+            'remaining_bytes': total_bytes
+        }
+
+    def _over_limits(self, count: int, total_bytes: int) -> bool:
+        if self.policy.max_entries is not None and count > self.policy.max_entries:
+            return True
+        if self.policy.max_size_bytes is not None and total_bytes > self.policy.max_size_bytes:
+            return True
+        return False
+
+    def compact(self) -> Dict:
+        """Compact the cache and drop access records of removed entries."""
+        report = self.cache.compact()
+        with self._lock:
+            stale = [key for key in self._access if not self.cache.contains(key)]
+            for cache_key in stale:
+                del self._access[cache_key]
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+                self._passes += 1
+                if self.compact_every and self._passes % self.compact_every == 0:
+                    self.compact()
+            except Exception:
+                logger.exception("Embedding cache maintenance pass failed")
+
+    def start(self):
+        """Start the background maintenance thread if it is not running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="embedding-cache-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for the current pass to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
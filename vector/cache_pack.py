@@ -0,0 +1,331 @@
+import json
+import gzip
+import time
+import base64
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Dict, Iterator, Tuple, Union
+
+from .cache_backends import CacheBackend, CacheManifest, create_cache_backend, detect_cache_backend
+from .quantization import PRECISION_CODES, encode_vector, decode_vector
+
+PACK_FORMAT = "doji-embedding-cache-pack"
+PACK_VERSION = 1
+IMPORT_MODES = ("merge", "replace")
+
+# Entries written per ``put_many`` call during import
+_IMPORT_CHUNK = 500
+
+
+class CachePackError(ValueError):
+    """Raised when a cache pack is malformed, truncated or fails its checksum."""
+
+
+def _segment_dirs(cache_dir: Path) -> List[Path]:
+    if not cache_dir.is_dir():
+        return []
+    return sorted(path for path in cache_dir.iterdir() if path.is_dir())
+
+
+def _matches(namespace: str, models: Optional[List[str]]) -> bool:
+    """Whether a segment is selected by a model filter of model names or namespaces."""
+    if not models:
+        return True
+    return any(namespace == model or namespace.startswith(f"{model}-") for model in models)
+
+
+def export_cache_pack(
+    cache_dir: Union[str, Path],
+    pack_path: Union[str, Path],
+    models: Optional[List[str]] = None,
+    max_age_seconds: Optional[float] = None,
+    precision: str = "float32",
+    segments: Optional[Dict[str, CacheBackend]] = None
+) -> Dict:
+    """
+    Write the cached embeddings under ``cache_dir`` to a single pack file.
+
+    The pack is a gzip-compressed stream of JSON lines: a header naming the
+    exported segments (``<model>-<dimensions>``) and the vector precision, one
+    line per entry, and a trailer with per-segment entry counts and
+    dimensions plus the SHA-256 of all entry lines. Cache keys are content
+    hashes, so a pack can be imported into any node's cache directory.
+
+    Each segment is read with the backend its files belong to, whatever
+    backend the caller uses, so segments written by another backend are
+    exported too.
+
+    Args:
+        cache_dir (Union[str, Path]): Router cache directory holding one
+            subdirectory per model segment
+        pack_path (Union[str, Path]): File to write; replaced atomically
+        models (List[str], optional): Only export segments of these models.
+            Entries are model names ("text-embedding-3-small") or segment
+            namespaces ("text-embedding-3-small-1536").
+        max_age_seconds (float, optional): Only export entries cached within
+            this many seconds
+        precision (str): Encoding of the vectors in the pack, one of
+            ``PRECISIONS``. float32 keeps vectors as the API returns them.
+        segments (Dict[str, CacheBackend], optional): Already open backends by
+            namespace, used instead of opening those segments again
+
+    Returns:
+        Dict: ``num_entries`` exported, per-namespace entry counts under
+        ``segments`` and the pack's ``size_bytes`` and ``sha256``
+
+    Raises:
+        ValueError: If ``precision`` is unknown
+        CachePackError: If a selected segment claims entries that cannot be
+            read, e.g. files of an unknown layout
+    """
+    if precision not in PRECISION_CODES:
+        raise ValueError(f"Unknown precision '{precision}'")
+    cache_dir = Path(cache_dir)
+    pack_path = Path(pack_path)
+    segments = segments or {}
+    min_created_at = time.time() - max_age_seconds if max_age_seconds is not None else None
+
+    selected = [path for path in _segment_dirs(cache_dir) if _matches(path.name, models)]
+    counts: Dict[str, int] = {}
+    dims: Dict[str, Optional[int]] = {}
+    checksum = hashlib.sha256()
+    tmp_path = pack_path.with_name(f".{pack_path.name}.tmp")
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with gzip.open(tmp_path, 'wb') as out:
+        out.write(_line({
+            'format': PACK_FORMAT,
+            'version': PACK_VERSION,
+            'created_at': time.time(),
+            'precision': precision,
+            'segments': [path.name for path in selected]
+        }))
+        for path in selected:
+            source = segments.get(path.name)
+            opened = source is None
+            if opened:
+                backend = detect_cache_backend(path)
+                if backend is None:
+                    manifest = CacheManifest.read(path)
+                    if manifest is None or manifest['num_entries']:
+                        raise CachePackError(f"Cache segment {path} holds no readable cache entries")
+                    # A segment that was cleared
+                    counts[path.name] = 0
+                    dims[path.name] = None
+                    continue
+                source = create_cache_backend(backend, path)
+            try:
+                counts[path.name] = 0
+                dim = None
+                for cache_key, created_at in _select_entries(source, min_created_at):
+                    embedding = source.get(cache_key)
+                    if embedding is None:
+                        continue
+                    dim = len(embedding)
+                    record = _line({
+                        'segment': path.name,
+                        'key': cache_key,
+                        'dim': dim,
+                        'vector': base64.b64encode(encode_vector(embedding, precision)).decode('ascii'),
+                        'metadata': source.get_metadata(cache_key) or {},
+                        'created_at': created_at
+                    })
+                    checksum.update(record)
+                    out.write(record)
+                    counts[path.name] += 1
+                if min_created_at is None and not counts[path.name] and source.info()['num_entries']:
+                    raise CachePackError(f"Cache segment {path} has entries but none of them could be read")
+                dims[path.name] = dim
+            finally:
+                if opened:
+                    source.close()
+        num_entries = sum(counts.values())
+        out.write(_line({
+            'num_entries': num_entries,
+            'segments': {
+                namespace: {'num_entries': counts[namespace], 'dim': dims.get(namespace)}
+                for namespace in counts
+            },
+            'sha256': checksum.hexdigest()
+        }))
+    tmp_path.replace(pack_path)
+    return {
+        'num_entries': num_entries,
+        'segments': counts,
+        'size_bytes': pack_path.stat().st_size,
+        'sha256': checksum.hexdigest()
+    }
+
+
+def _line(record: Dict) -> bytes:
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b"\n"
+
+
+def _select_entries(source: CacheBackend, min_created_at: Optional[float]) -> Iterator[Tuple[str, float]]:
+    for entry in source.entries():
+        if min_created_at is None or entry.created_at >= min_created_at:
+            yield entry.cache_key, entry.created_at
+
+
+def _read_records(pack_path: Path) -> Iterator[Tuple[bytes, Dict]]:
+    """Yield the raw and parsed header, entry lines and trailer of a pack, in file order."""
+    try:
+        with gzip.open(pack_path, 'rb') as f:
+            for raw in f:
+                yield raw, json.loads(raw)
+    except (OSError, EOFError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise CachePackError(f"Unreadable cache pack {pack_path}: {str(e)}")
+
+
+def verify_cache_pack(pack_path: Union[str, Path]) -> Dict:
+    """
+    Check a pack's format and checksum without importing it.
+
+    Args:
+        pack_path (Union[str, Path]): Pack file to check
+
+    Returns:
+        Dict: ``created_at``, ``precision``, ``num_entries``, ``sha256`` and
+        per-namespace ``num_entries`` and ``dim`` under ``segments``
+
+    Raises:
+        CachePackError: If the pack is not a cache pack, is truncated or its
+            entries do not match the checksum
+    """
+    pack_path = Path(pack_path)
+    header = trailer = None
+    checksum = hashlib.sha256()
+    count = 0
+    for raw, record in _read_records(pack_path):
+        if header is None:
+            if record.get('format') != PACK_FORMAT:
+                raise CachePackError(f"{pack_path} is not an embedding cache pack")
+            if record.get('version') != PACK_VERSION:
+                raise CachePackError(f"Unsupported cache pack version {record.get('version')}")
+            header = record
+        elif 'sha256' in record:
+            trailer = record
+        elif trailer is not None:
+            raise CachePackError(f"Cache pack {pack_path} has entries after its trailer")
+        else:
+            checksum.update(raw)
+            count += 1
+    if header is None or trailer is None:
+        raise CachePackError(f"Cache pack {pack_path} is truncated")
+    if trailer['sha256'] != checksum.hexdigest() or trailer['num_entries'] != count:
+        raise CachePackError(f"Cache pack {pack_path} failed checksum verification")
+    return {
+        'created_at': header['created_at'],
+        'precision': header['precision'],
+        'num_entries': count,
+        'sha256': trailer['sha256'],
+        'segments': trailer['segments']
+    }
+
+
+def import_cache_pack(
+    pack_path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    models: Optional[List[str]] = None,
+    max_age_seconds: Optional[float] = None,
+    mode: str = "merge",
+    backend: str = "json",
+    segments: Optional[Dict[str, CacheBackend]] = None
+) -> Dict:
+    """
+    Load a pack written by ``export_cache_pack`` into ``cache_dir``.
+
+    The whole pack is verified before anything is written, so a corrupt or
+    truncated pack never leaves a half-imported cache behind. Entries keep
+    the creation time recorded in the pack, so TTL ages carry over.
+
+    Args:
+        pack_path (Union[str, Path]): Pack file to import
+        cache_dir (Union[str, Path]): Router cache directory to import into
+        models (List[str], optional): Only import segments of these models
+            (model names or segment namespaces)
+        max_age_seconds (float, optional): Only import entries that were
+            cached within this many seconds of now
+        mode (str): "merge" adds entries whose keys are not cached yet and
+            keeps existing ones; "replace" first clears every selected segment
+            present in the pack
+        backend (str): Cache backend for segments that do not exist yet;
+            existing segments are written with the backend their files
+            belong to
+        segments (Dict[str, CacheBackend], optional): Already open backends by
+            namespace, written to instead of opening those segments again
+
+    Returns:
+        Dict: ``imported`` and ``skipped`` (already cached or filtered)
+        entries, with per-namespace import counts under ``segments``
+
+    Raises:
+        ValueError: If ``mode`` is unknown
+        CachePackError: If the pack fails verification
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"mode must be one of {', '.join(IMPORT_MODES)}")
+    pack_path = Path(pack_path)
+    cache_dir = Path(cache_dir)
+    pack_info = verify_cache_pack(pack_path)
+    precision = pack_info['precision']
+    segments = dict(segments or {})
+    opened: Dict[str, CacheBackend] = {}
+    min_created_at = time.time() - max_age_seconds if max_age_seconds is not None else None
+
+    def target_for(namespace: str) -> CacheBackend:
+        if namespace not in segments:
+            if Path(namespace).name != namespace or namespace in ('.', '..'):
+                raise CachePackError(f"Invalid segment name '{namespace}' in cache pack")
+            segment_dir = cache_dir / namespace
+            segment_backend = detect_cache_backend(segment_dir) or backend
+            opened[namespace] = segments[namespace] = create_cache_backend(segment_backend, segment_dir)
+            if mode == "replace":
+                segments[namespace].clear()
+        return segments[namespace]
+
+    if mode == "replace":
+        for namespace in pack_info['segments']:
+            if namespace in segments and _matches(namespace, models):
+                segments[namespace].clear()
+
+    counts: Dict[str, int] = {}
+    skipped = 0
+    pending: Dict[str, List] = {}
+    records = _read_records(pack_path)
+    try:
+        next(records)
+        for _, record in records:
+            if 'sha256' in record:
+                break
+            namespace = record['segment']
+            if not _matches(namespace, models) or (
+                min_created_at is not None and record['created_at'] < min_created_at
+            ):
+                skipped += 1
+                continue
+            target = target_for(namespace)
+            if mode == "merge" and target.contains(record['key']):
+                skipped += 1
+                continue
+            embedding = decode_vector(base64.b64decode(record['vector']), precision, record['dim'])
+            batch = pending.setdefault(namespace, [])
+            batch.append(((record['key'], embedding, record['metadata'] or None), record['created_at']))
+            counts[namespace] = counts.get(namespace, 0) + 1
+            if len(batch) >= _IMPORT_CHUNK:
+                _restore(target, batch)
+                pending[namespace] = []
+        for namespace, batch in pending.items():
+            if batch:
+                _restore(segments[namespace], batch)
+    finally:
+        records.close()
+        for source in opened.values():
+            source.close()
+
+    return {'imported': sum(counts.values()), 'skipped': skipped, 'segments': counts}
+
+
+def _restore(target: CacheBackend, batch: List[Tuple[Tuple, float]]):
+    """Write ``(item, created_at)`` pairs, keeping their creation times."""
+    target.restore_many([item for item, _ in batch], [created_at for _, created_at in batch])
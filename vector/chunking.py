@@ -0,0 +1,167 @@
+import re
+import math
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+from .tokenization import tiktoken
+
+POOLING_MODES = ("mean", "weighted")
+
+# Paragraph breaks: a newline followed by optional whitespace and another newline
+_PARAGRAPH_BREAK = re.compile(r"(\n\s*\n)")
+# Fallback "tokens" without tiktoken: runs of up to 3 ASCII characters or one
+# other character, i.e. at most ~3 UTF-8 bytes each, matching ``estimate_tokens``
+_FALLBACK_TOKEN = re.compile(r"[\x00-\x7f]{1,3}|[^\x00-\x7f]", re.DOTALL)
+
+
+class TextChunker:
+    """
+    Splits long texts into overlapping chunks within a token budget.
+
+    Chunks are made of whole paragraphs, and where they end is decided by
+    the content rather than by position: a paragraph closes its chunk when
+    its hash selects it as a cut point (on average every half budget of
+    tokens), or when the next paragraph would not fit. Boundaries therefore
+    depend only on the paragraphs since the previous cut point, so editing
+    one paragraph of a long text only changes the chunks between the cut
+    points around it (plus the overlap carried into the next chunk); all
+    other chunks keep their text and their cache entries. A single
+    paragraph above the budget is cut on token boundaries into chunks of
+    its own. Every chunk after the first starts with the last
+    ``overlap_tokens`` tokens of the previous chunk, so text at a boundary
+    is seen in context.
+
+    Tokens come from ``tiktoken`` when it is installed; otherwise texts are
+    cut into pieces of at most ~3 UTF-8 bytes, which never undercounts
+    compared to ``estimate_tokens``.
+    """
+
+    def __init__(self, max_tokens: int, overlap_tokens: int = 0, model: str = "text-embedding-ada-002"):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_tokens (int): Maximum tokens per chunk, overlap included
+            overlap_tokens (int): Tokens repeated from the end of the previous chunk
+            model (str): Embedding model whose tokenizer defines token boundaries
+
+        Raises:
+            ValueError: If ``max_tokens`` is not positive or the overlap is
+                negative or not smaller than half of ``max_tokens``
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+        if overlap_tokens < 0 or 2 * overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be between 0 and half of max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self._encode, self._decode = _get_tokenizer(model)
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of ``text`` as the chunker sees them."""
+        return len(self._encode(text))
+
+    def needs_split(self, text: str) -> bool:
+        """Whether ``text`` exceeds the token budget of one chunk."""
+        return self.count_tokens(text) > self.max_tokens
+
+    def split(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Split ``text`` into chunks.
+
+        Args:
+            text (str): Text to split
+
+        Returns:
+            List[Tuple[str, int]]: ``(chunk, token_count)`` pairs in text
+            order; a text within the budget is returned as its only chunk
+        """
+        tokens = self._encode(text)
+        if len(tokens) <= self.max_tokens:
+            return [(text, len(tokens))]
+
+        # Token budget for new content; the overlap is prepended afterwards
+        budget = self.max_tokens - self.overlap_tokens
+        bodies: List[list] = []
+        current: list = []
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            if not paragraph:
+                continue
+            paragraph_tokens = self._encode(paragraph)
+            if len(current) + len(paragraph_tokens) > budget and current:
+                bodies.append(current)
+                current = []
+            if len(paragraph_tokens) > budget:
+                while paragraph_tokens:
+                    bodies.append(paragraph_tokens[:budget])
+                    paragraph_tokens = paragraph_tokens[budget:]
+                continue
+            current.extend(paragraph_tokens)
+            if not _PARAGRAPH_BREAK.fullmatch(paragraph) and _is_cut_point(paragraph, len(paragraph_tokens), budget):
+                bodies.append(current)
+                current = []
+        if current:
+            bodies.append(current)
+
+        chunks = []
+        for i, body in enumerate(bodies):
+            chunk_tokens = body
+            if i > 0 and self.overlap_tokens:
+                chunk_tokens = bodies[i - 1][-self.overlap_tokens:] + body
+            chunk = self._decode(chunk_tokens)
+            if chunk.strip():
+                chunks.append((chunk, len(chunk_tokens)))
+        return chunks
+
+
+def _is_cut_point(paragraph: str, token_count: int, budget: int) -> bool:
+    """
+    Whether ``paragraph`` ends its chunk, decided by its content alone.
+
+    A paragraph is selected with probability ``2 * token_count / budget``,
+    so chunks hold about half the budget on average whatever the paragraph
+    lengths are.
+    """
+    return zlib.crc32(paragraph.encode('utf-8')) % budget < 2 * token_count
+
+
+def _get_tokenizer(model: str) -> Tuple[Callable[[str], list], Callable[[list], str]]:
+    """Return ``(encode, decode)`` functions for ``model``'s token boundaries."""
+    if tiktoken is None:
+        return _FALLBACK_TOKEN.findall, "".join
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    # Token boundaries can fall inside a multi-byte character; drop the partial bytes
+    return encoding.encode, lambda tokens: encoding.decode_bytes(tokens).decode('utf-8', errors='ignore')
+
+
+def pool_vectors(vectors: List[List[float]], weights: Optional[List[float]] = None) -> List[float]:
+    """
+    Pool chunk embeddings into one unit-length vector.
+
+    Args:
+        vectors (List[List[float]]): Chunk embeddings of equal dimension
+        weights (List[float], optional): Weight of each chunk, e.g. its token
+            count. None gives every chunk the same weight (mean pooling).
+
+    Returns:
+        List[float]: The weighted mean, rescaled to unit length so cosine
+        similarity and dot products behave like for a single embedding
+
+    Raises:
+        ValueError: If ``vectors`` is empty or the weights do not match
+    """
+    if not vectors:
+        raise ValueError("Cannot pool an empty list of vectors")
+    if weights is None:
+        weights = [1.0] * len(vectors)
+    if len(weights) != len(vectors) or sum(weights) <= 0:
+        raise ValueError("weights must be positive and match the vectors")
+    pooled = [0.0] * len(vectors[0])
+    for vector, weight in zip(vectors, weights):
+        for i, value in enumerate(vector):
+            pooled[i] += weight * value
+    norm = math.sqrt(sum(value * value for value in pooled)) or 1.0
+    return [value / norm for value in pooled]
@@ -1,24 +1,163 @@
+import os
+import time
+import threading
 import weaviate
-from typing import Optional
+from weaviate.config import Config, ConnectionConfig
+from typing import Optional, Dict, Tuple
 
-def get_weaviate_client(url: str = "http://localhost:8080") -> weaviate.Client:
+DEFAULT_WEAVIATE_URL = "http://localhost:8080"
+
+
+class WeaviateClientManager:
+    """
+    Owns one reusable Weaviate client for a URL.
+
+    Building a ``weaviate.Client`` runs startup checks and opens a new HTTP
+    session, so it is done once and the client (with its keep-alive
+    connection pool) is shared by every caller in the process. At most every
+    ``health_check_interval`` seconds, handing out the client first checks
+    that Weaviate is still ready; if not, a fresh client is built, so the
+    process recovers after a Weaviate restart without being restarted itself.
+
+    Settings not passed explicitly come from the environment:
+    WEAVIATE_URL, WEAVIATE_CONNECT_TIMEOUT, WEAVIATE_READ_TIMEOUT,
+    WEAVIATE_POOL_CONNECTIONS, WEAVIATE_POOL_MAXSIZE and
+    WEAVIATE_HEALTH_CHECK_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        timeout_config: Optional[Tuple[float, float]] = None,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        health_check_interval: Optional[float] = None
+    ):
+        """
+        Initialize the manager. The client is built on first use.
+
+        Args:
+            url (str, optional): Weaviate URL. Defaults to WEAVIATE_URL, or
+                "http://localhost:8080".
+            timeout_config (Tuple[float, float], optional): Connect and read
+                timeouts in seconds. Defaults to (10, 60).
+            pool_connections (int, optional): Number of connection pools the
+                session caches. Defaults to 20.
+            pool_maxsize (int, optional): Keep-alive connections per pool,
+                i.e. concurrent requests without opening new connections.
+                Defaults to 20.
+            health_check_interval (float, optional): Minimum seconds between
+                readiness checks of the shared client. Defaults to 30; 0
+                checks on every use.
+
+        Raises:
+            ValueError: If a size is not positive or the interval is negative
+        """
+        self.url = url or os.getenv("WEAVIATE_URL", DEFAULT_WEAVIATE_URL)
+        if timeout_config is None:
+            timeout_config = (
+                float(os.getenv("WEAVIATE_CONNECT_TIMEOUT", "10")),
+                float(os.getenv("WEAVIATE_READ_TIMEOUT", "60"))
+            )
+        if pool_connections is None:
+            pool_connections = int(os.getenv("WEAVIATE_POOL_CONNECTIONS", "20"))
+        if pool_maxsize is None:
+            pool_maxsize = int(os.getenv("WEAVIATE_POOL_MAXSIZE", "20"))
+        if health_check_interval is None:
+            health_check_interval = float(os.getenv("WEAVIATE_HEALTH_CHECK_INTERVAL", "30"))
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise ValueError("pool_connections and pool_maxsize must be positive")
+        if health_check_interval < 0:
+            raise ValueError("health_check_interval must not be negative")
+        self.timeout_config = timeout_config
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.health_check_interval = health_check_interval
+        self.reconnects = 0
+        self._client = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> weaviate.Client:
+        return weaviate.Client(
+            self.url,
+            timeout_config=self.timeout_config,
+            additional_config=Config(connection_config=ConnectionConfig(
+                session_pool_connections=self.pool_connections,
+                session_pool_maxsize=self.pool_maxsize
+            ))
+        )
+
+    @staticmethod
+    def _is_healthy(client: weaviate.Client) -> bool:
+        try:
+            return client.is_ready()
+        except Exception:
+            return False
+
+    def get_client(self) -> weaviate.Client:
+        """
+        Return the shared client, building or rebuilding it when needed.
+
+        Returns:
+            weaviate.Client: The process-wide client for this URL
+
+        Raises:
+            Exception: If a new client cannot connect to Weaviate
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._client is not None and now - self._checked_at >= self.health_check_interval:
+                if not self._is_healthy(self._client):
+                    self._client = None
+                    self.reconnects += 1
+                self._checked_at = now
+            if self._client is None:
+                self._client = self._connect()
+                self._checked_at = now
+            return self._client
+
+    def reset(self):
+        """Drop the shared client; the next ``get_client`` builds a new one."""
+        with self._lock:
+            self._client = None
+
+
+_managers: Dict[str, WeaviateClientManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_weaviate_client(url: Optional[str] = None) -> weaviate.Client:
     """
     Get a configured Weaviate client instance.
-    
-    This function creates and returns a Weaviate client that can be used to interact
-    with the Weaviate vector database. The client is configured with the specified URL.
-    
+
+    This function returns the process-wide Weaviate client for the URL,
+    managed by a ``WeaviateClientManager``: it is built on first use and
+    then reused by every caller, so requests share its keep-alive
+    connection pool instead of connecting anew each time.
+
     Args:
-        url (str): The URL where the Weaviate instance is running. 
-                  Defaults to "http://localhost:8080" for local development.
-        
+        url (str, optional): The URL where the Weaviate instance is running.
+                  Defaults to the WEAVIATE_URL environment variable, or
+                  "http://localhost:8080" for local development.
+
     Returns:
         weaviate.Client: A configured Weaviate client instance ready for use.
-        
+
     Example:
         >>> client = get_weaviate_client()
         >>> # Use client to interact with Weaviate
         >>> client.schema.get()
     """
-    client = weaviate.Client(url)
-    return client 
\ No newline at end of file
+    url = url or os.getenv("WEAVIATE_URL", DEFAULT_WEAVIATE_URL)
+    with _managers_lock:
+        manager = _managers.get(url)
+        if manager is None:
+            manager = _managers[url] = WeaviateClientManager(url)
+    return manager.get_client()
+
+
+def reset_weaviate_clients():
+    """Forget every shared Weaviate client, e.g. after a fork or in tests."""
+    with _managers_lock:
+        _managers.clear()
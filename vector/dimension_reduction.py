@@ -0,0 +1,332 @@
+import json
+import math
+import random
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Optional, Sequence, Union
+
+try:
+    import numpy
+except ImportError:  # Optional dependency: only needed to fit projections
+    numpy = None
+
+# Models that accept the ``dimensions`` request parameter. They are trained
+# so that a shortened embedding is the full one truncated and rescaled to
+# unit length, which ``truncate_vector`` reproduces locally.
+NATIVE_DIMENSION_MODELS = ("text-embedding-3-small", "text-embedding-3-large")
+
+REDUCTION_METHODS = ("truncate", "pca")
+
+PROJECTION_FORMAT = "doji-pca-projection"
+PROJECTION_VERSION = 1
+
+
+def supports_native_dimensions(model: str) -> bool:
+    """Whether ``model`` accepts the ``dimensions`` request parameter."""
+    return model in NATIVE_DIMENSION_MODELS
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def truncate_vector(vector: Sequence[float], dimensions: int) -> List[float]:
+    """
+    Shorten an embedding the way the ``dimensions`` request parameter does.
+
+    Args:
+        vector (Sequence[float]): Full embedding
+        dimensions (int): Number of leading components to keep
+
+    Returns:
+        List[float]: The first ``dimensions`` components, rescaled to unit length
+    """
+    return _unit(vector[:dimensions])
+
+
+class PCAProjection:
+    """
+    Linear projection of embeddings onto their top principal components.
+
+    For models without the ``dimensions`` parameter (ada-002), a projection
+    fitted on a representative sample of the corpus keeps most of the
+    neighbourhood structure in far fewer dimensions. Projected vectors are
+    rescaled to unit length so cosine and dot-product search keep working.
+    Query and document vectors must go through the same projection; the
+    ``fingerprint`` identifies it, e.g. in cache segment names.
+
+    Fitting needs ``numpy``; applying a saved projection works without it.
+    """
+
+    def __init__(
+        self,
+        mean: Sequence[float],
+        components: Sequence[Sequence[float]],
+        explained_variance_ratio: Optional[float] = None
+    ):
+        """
+        Initialize the projection.
+
+        Args:
+            mean (Sequence[float]): Mean vector subtracted before projecting
+            components (Sequence[Sequence[float]]): One row per output
+                dimension, each as long as ``mean``
+            explained_variance_ratio (float, optional): Share of the sample's
+                variance the components keep, for reporting
+
+        Raises:
+            ValueError: If there are no components or their length does not
+                match the mean
+        """
+        if not components or any(len(row) != len(mean) for row in components):
+            raise ValueError("components must be non-empty rows as long as the mean vector")
+        self.mean = [float(value) for value in mean]
+        self.components = [[float(value) for value in row] for row in components]
+        self.explained_variance_ratio = explained_variance_ratio
+        self._arrays = None
+
+    @property
+    def source_dimensions(self) -> int:
+        """Dimension of the vectors the projection accepts."""
+        return len(self.mean)
+
+    @property
+    def dimensions(self) -> int:
+        """Dimension of the projected vectors."""
+        return len(self.components)
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the projection's parameters."""
+        digest = hashlib.sha256(json.dumps([self.mean, self.components]).encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+    @classmethod
+    def fit(cls, vectors: List[List[float]], dimensions: int) -> "PCAProjection":
+        """
+        Fit a projection on a sample of embeddings.
+
+        Args:
+            vectors (List[List[float]]): Representative embeddings of equal dimension
+            dimensions (int): Number of principal components to keep
+
+        Returns:
+            PCAProjection: The fitted projection
+
+        Raises:
+            ImportError: If numpy is not installed
+            ValueError: If ``dimensions`` is not below the vector dimension
+                or there are not more vectors than ``dimensions``
+        """
+        if numpy is None:
+            raise ImportError("Fitting a PCA projection requires numpy (pip install numpy)")
+        data = numpy.asarray(vectors, dtype=numpy.float64)
+        if data.ndim != 2 or not 0 < dimensions < data.shape[1]:
+            raise ValueError("dimensions must be positive and below the vector dimension")
+        if data.shape[0] <= dimensions:
+            raise ValueError(f"Fitting {dimensions} components needs more than {dimensions} vectors")
+        mean = data.mean(axis=0)
+        _, singular_values, components = numpy.linalg.svd(data - mean, full_matrices=False)
+        variance = singular_values ** 2
+        ratio = float(variance[:dimensions].sum() / variance.sum()) if variance.sum() else 1.0
+        return cls(mean.tolist(), components[:dimensions].tolist(), ratio)
+
+    def apply(self, vector: Sequence[float]) -> List[float]:
+        """
+        Project one vector.
+
+        Args:
+            vector (Sequence[float]): Vector of ``source_dimensions`` components
+
+        Returns:
+            List[float]: Unit-length vector of ``dimensions`` components
+
+        Raises:
+            ValueError: If the vector has the wrong dimension
+        """
+        return self.apply_many([vector])[0]
+
+    def apply_many(self, vectors: List[Sequence[float]]) -> List[List[float]]:
+        """Project several vectors, see ``apply``."""
+        if any(len(vector) != self.source_dimensions for vector in vectors):
+            raise ValueError(f"Projection expects {self.source_dimensions}-dimensional vectors")
+        if not vectors:
+            return []
+        if numpy is not None:
+            if self._arrays is None:
+                self._arrays = (numpy.asarray(self.mean), numpy.asarray(self.components).T)
+            mean, components = self._arrays
+            projected = (numpy.asarray(vectors, dtype=numpy.float64) - mean) @ components
+            norms = numpy.linalg.norm(projected, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return (projected / norms).tolist()
+        results = []
+        for vector in vectors:
+            centered = [value - m for value, m in zip(vector, self.mean)]
+            results.append(_unit([sum(c * r for c, r in zip(centered, row)) for row in self.components]))
+        return results
+
+    def save(self, path: Union[str, Path]):
+        """
+        Write the projection to a JSON file.
+
+        Args:
+            path (Union[str, Path]): Destination file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'format': PROJECTION_FORMAT,
+                'version': PROJECTION_VERSION,
+                'source_dimensions': self.source_dimensions,
+                'dimensions': self.dimensions,
+                'explained_variance_ratio': self.explained_variance_ratio,
+                'mean': self.mean,
+                'components': self.components
+            }, f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PCAProjection":
+        """
+        Read a projection written by ``save``.
+
+        Args:
+            path (Union[str, Path]): Projection file
+
+        Returns:
+            PCAProjection: The stored projection
+
+        Raises:
+            ValueError: If the file is not a projection of a supported version
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('format') != PROJECTION_FORMAT or data.get('version') != PROJECTION_VERSION:
+            raise ValueError(f"{path} is not a supported PCA projection file")
+        return cls(data['mean'], data['components'], data.get('explained_variance_ratio'))
+
+
+def _neighbours(vectors: List[List[float]], query: int, k: int) -> set:
+    """Indices of the ``k`` vectors most similar to ``vectors[query]``, itself excluded."""
+    target = vectors[query]
+    scores = [
+        (sum(a * b for a, b in zip(target, vector)), i)
+        for i, vector in enumerate(vectors) if i != query
+    ]
+    scores.sort(reverse=True)
+    return {i for _, i in scores[:k]}
+
+
+def recall_at_k(
+    full_vectors: List[List[float]],
+    reduced_vectors: List[List[float]],
+    k: int = 10,
+    num_queries: int = 100,
+    seed: int = 0
+) -> float:
+    """
+    Measure how well reduced vectors preserve nearest-neighbour search.
+
+    A sample of the vectors is used as queries against all others. For each
+    query, the ``k`` nearest neighbours by dot product (cosine for unit
+    vectors) among the reduced vectors are compared with those among the
+    full vectors.
+
+    Args:
+        full_vectors (List[List[float]]): Unit-length embeddings at full dimension
+        reduced_vectors (List[List[float]]): The same embeddings after reduction, in the same order
+        k (int): Number of neighbours per query
+        num_queries (int): Maximum number of query vectors
+        seed (int): Seed for the query sampling
+
+    Returns:
+        float: Mean share of the true ``k`` nearest neighbours found, 1.0 being lossless
+
+    Raises:
+        ValueError: If the lists differ in length or hold no more than ``k`` vectors
+    """
+    if len(full_vectors) != len(reduced_vectors):
+        raise ValueError("full_vectors and reduced_vectors must have the same length")
+    if len(full_vectors) <= k:
+        raise ValueError(f"Recall@{k} needs more than {k} vectors")
+    rng = random.Random(seed)
+    queries = rng.sample(range(len(full_vectors)), min(num_queries, len(full_vectors)))
+    if numpy is not None:
+        full = numpy.asarray(full_vectors, dtype=numpy.float64)
+        reduced = numpy.asarray(reduced_vectors, dtype=numpy.float64)
+        found = 0
+        for query in queries:
+            full_scores = full @ full[query]
+            reduced_scores = reduced @ reduced[query]
+            full_scores[query] = reduced_scores[query] = -numpy.inf
+            expected = set(numpy.argsort(-full_scores, kind='stable')[:k].tolist())
+            actual = set(numpy.argsort(-reduced_scores, kind='stable')[:k].tolist())
+            found += len(expected & actual)
+        return found / (k * len(queries))
+    found = sum(
+        len(_neighbours(full_vectors, query, k) & _neighbours(reduced_vectors, query, k))
+        for query in queries
+    )
+    return found / (k * len(queries))
+
+
+def dimension_recall_report(
+    vectors: List[List[float]],
+    candidates: Sequence[int],
+    method: str = "truncate",
+    k: int = 10,
+    num_queries: int = 100,
+    seed: int = 0
+) -> List[Dict]:
+    """
+    Compare the search recall of several target dimensions.
+
+    Args:
+        vectors (List[List[float]]): Representative full-dimension embeddings,
+            e.g. read from the cache
+        candidates (Sequence[int]): Target dimensions to evaluate
+        method (str): "truncate" for models with the ``dimensions`` parameter
+            (what the API would return), or "pca" to fit a ``PCAProjection``
+            on ``vectors`` for each candidate
+        k (int): Number of neighbours per query
+        num_queries (int): Maximum number of query vectors
+        seed (int): Seed for the query sampling
+
+    Returns:
+        List[Dict]: One row per candidate, smallest first: ``dimensions``,
+        ``recall_at_k``, ``bytes_per_vector`` (as float32) and
+        ``size_ratio`` relative to the full vectors; PCA rows also hold
+        ``explained_variance_ratio``
+
+    Raises:
+        ValueError: If the method is unknown or a candidate is not below
+            the full dimension
+    """
+    if method not in REDUCTION_METHODS:
+        raise ValueError(f"method must be one of {', '.join(REDUCTION_METHODS)}")
+    full_dimensions = len(vectors[0]) if vectors else 0
+    full_vectors = [_unit(vector) for vector in vectors]
+    report = []
+    for dimensions in sorted(set(candidates)):
+        if not 0 < dimensions < full_dimensions:
+            raise ValueError(f"Candidate dimension {dimensions} must be between 1 and {full_dimensions - 1}")
+        projection = None
+        if method == "truncate":
+            reduced = [truncate_vector(vector, dimensions) for vector in full_vectors]
+        else:
+            projection = PCAProjection.fit(vectors, dimensions)
+            reduced = projection.apply_many(vectors)
+        row = {
+            'dimensions': dimensions,
+            'recall_at_k': recall_at_k(full_vectors, reduced, k, num_queries, seed),
+            'bytes_per_vector': 4 * dimensions,
+            'size_ratio': dimensions / full_dimensions
+        }
+        if projection is not None:
+            row['explained_variance_ratio'] = projection.explained_variance_ratio
+        report.append(row)
+    return report
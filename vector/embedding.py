@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from openai import OpenAI, OpenAIError
 from dotenv import load_dotenv
 from .embedding_router import EmbeddingRouter
@@ -7,13 +7,62 @@ from .embedding_router import EmbeddingRouter
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure OpenAI with API key
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-# Create a global router instance
-_router = EmbeddingRouter()
+def router_options_from_env() -> Dict[str, Any]:
+    """
+    Read the embedding router settings from the environment.
+    
+    Every path that produces vectors (the module functions below, memory
+    writes, retrieval and the API) builds its router from these settings,
+    so vectors written to Weaviate and query vectors are always comparable.
+    
+    Environment variables:
+        EMBEDDING_MODEL: Embedding model. Defaults to text-embedding-ada-002.
+        EMBEDDING_CACHE_BACKEND: Cache backend, "json", "packed" or "sqlite".
+            Defaults to "json".
+        EMBEDDING_CHUNK_MAX_TOKENS: Enables chunking of long texts with this
+            token budget per chunk.
+        EMBEDDING_CHUNK_POOLING: "mean" or "weighted". Defaults to "mean".
+        EMBEDDING_DIMENSIONS: Reduced vector size requested from models that
+            support it (text-embedding-3).
+        EMBEDDING_PCA_PROJECTION: Path of a fitted PCA projection applied to
+            every vector.
+        
+    Returns:
+        Dict[str, Any]: Keyword arguments for ``EmbeddingRouter``
+    """
+    chunk_max_tokens = os.getenv("EMBEDDING_CHUNK_MAX_TOKENS")
+    dimensions = os.getenv("EMBEDDING_DIMENSIONS")
+    return {
+        "model": os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002"),
+        "cache_backend": os.getenv("EMBEDDING_CACHE_BACKEND", "json"),
+        "chunk_max_tokens": int(chunk_max_tokens) if chunk_max_tokens else None,
+        "chunk_pooling": os.getenv("EMBEDDING_CHUNK_POOLING", "mean"),
+        "dimensions": int(dimensions) if dimensions else None,
+        "projection": os.getenv("EMBEDDING_PCA_PROJECTION") or None
+    }
+
+
+# Create a global router instance. The provider comes from EMBEDDING_PROVIDER;
+# only the default OpenAI provider requires OPENAI_API_KEY.
+_router = EmbeddingRouter(**router_options_from_env())
+
+
+def use_router(router: EmbeddingRouter):
+    """
+    Route the functions of this module through ``router``.
+    
+    The API installs its own router here, so memory writes and retrieval
+    share its cache, memory tier and statistics instead of opening the same
+    cache segment a second time. The previous router is closed.
+    
+    Args:
+        router (EmbeddingRouter): Router to use from now on
+    """
+    global _router
+    previous, _router = _router, router
+    if previous is not router:
+        previous.close()
 
 def embed_text(text: str) -> List[float]:
     """
@@ -1,57 +1,389 @@
 import os
-import json
+import re
+import time
+import itertools
+import shutil
 import hashlib
-from typing import List, Optional, Dict, Union
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Union, Tuple
 from pathlib import Path
 from openai import OpenAI, OpenAIError
 from dotenv import load_dotenv
+from .cache_backends import (
+    CacheBackend, create_cache_backend, detect_cache_backend, migrate_json_cache, read_segment_info
+)
+from .memory_cache import MemoryCache, TieredCache
+from .cache_maintenance import CachePolicy, CacheMaintainer
+from .metrics import RouterMetrics
+from .quantization import PRECISIONS, quantization_error_report
+from .single_flight import SingleFlight
+from .tokenization import MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST, get_token_counter, plan_batches
+from .rate_limit import RetryPolicy, get_shared_rate_limiter
+from .providers import EmbeddingProvider, OpenAIProvider, EMBEDDING_PROVIDERS
+from .normalization import TextNormalizer
+from .cache_pack import export_cache_pack, import_cache_pack
+from .write_behind import WriteBehindCache
+from .chunking import POOLING_MODES, TextChunker, pool_vectors
+from .dimension_reduction import PCAProjection, dimension_recall_report, supports_native_dimensions
+
+# Output dimension of the OpenAI embedding models we know about. Used to
+# namespace cache segments so vectors of different shapes never mix.
+MODEL_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+# Segment that pre-namespacing cache entries (stored directly in cache_dir)
+# belong to: before segments existed every cached vector came from ada-002.
+LEGACY_CACHE_NAMESPACE = "text-embedding-ada-002-1536"
+
+
+def get_cache_namespace(model: str, dimensions: Optional[int] = None) -> str:
+    """
+    Build the cache segment name for a model and output dimension.
+    
+    Args:
+        model (str): Embedding model name
+        dimensions (int, optional): Output dimension. Defaults to the model's
+            known native dimension, if any.
+            
+    Returns:
+        str: A filesystem-safe segment name such as "text-embedding-ada-002-1536"
+    """
+    if dimensions is None:
+        dimensions = MODEL_DIMENSIONS.get(model)
+    namespace = re.sub(r"[^A-Za-z0-9._-]", "_", model)
+    if dimensions is not None:
+        namespace = f"{namespace}-{dimensions}"
+    return namespace
 
 class EmbeddingRouter:
     """
     A router for handling text embeddings with caching support.
-    Currently supports OpenAI's text-embedding-ada-002 model.
+    Embeddings come from a pluggable ``EmbeddingProvider``: OpenAI's
+    text-embedding-ada-002 model by default, or e.g. the offline
+    ``DeterministicProvider`` for tests and benchmarks.
+    
+    Cached vectors are stored in one segment per model and dimension
+    (``<cache_dir>/<model>-<dimensions>/``), so switching models never serves
+    another model's vectors and each segment can be kept, dropped or warmed
+    on its own.
     """
     
     def __init__(
         self,
         cache_dir: str = ".cache/embeddings",
-        model: str = "text-embedding-ada-002"
+        model: str = "text-embedding-ada-002",
+        cache_backend: Union[str, CacheBackend] = "json",
+        memory_cache_entries: int = 1024,
+        memory_cache_bytes: int = 64 * 1024 * 1024,
+        warm_memory_cache: bool = False,
+        cache_policy: Optional[CachePolicy] = None,
+        maintenance_interval: float = 300.0,
+        cache_precision: Optional[str] = None,
+        max_batch_items: int = MAX_INPUTS_PER_REQUEST,
+        max_batch_tokens: int = MAX_TOKENS_PER_REQUEST,
+        max_parallel_requests: int = 4,
+        requests_per_minute: Optional[float] = 3000,
+        tokens_per_minute: Optional[float] = 1000000,
+        retry_policy: Optional[RetryPolicy] = None,
+        provider: Union[str, EmbeddingProvider, None] = None,
+        normalize_unicode: Optional[str] = None,
+        collapse_whitespace: bool = False,
+        write_behind: bool = False,
+        write_behind_max_pending: int = 10000,
+        write_behind_backpressure: str = "block",
+        chunk_max_tokens: Optional[int] = None,
+        chunk_overlap_tokens: Optional[int] = None,
+        chunk_pooling: str = "mean",
+        dimensions: Optional[int] = None,
+        projection: Union[str, Path, PCAProjection, None] = None
     ):
         """
         Initialize the embedding router.
         
         Args:
-            cache_dir (str): Directory to store embedding cache
+            cache_dir (str): Root directory of the embedding cache. Each model
+                gets its own segment directory below it.
             model (str): OpenAI embedding model to use
+            cache_backend (Union[str, CacheBackend]): Cache storage backend, either
+                a name from ``CACHE_BACKENDS`` ("json", "packed" or "sqlite") or a
+                backend instance, which is then used as this model's segment
+                as-is. Defaults to the one-JSON-file-per-vector layout; use
+                "sqlite" when several worker processes share the cache. When a non-JSON
+                backend is opened empty on a segment holding JSON entries, those
+                entries are migrated into it.
+            memory_cache_entries (int): Entry budget of the in-process LRU tier
+                placed in front of the disk cache. 0 disables the memory tier.
+            memory_cache_bytes (int): Byte budget of the in-process LRU tier
+            warm_memory_cache (bool): Load the most recently written disk
+                entries into the memory tier in a background thread at startup
+            cache_policy (CachePolicy, optional): Size, entry count and TTL limits
+                for this router's cache segment. When set, a background thread
+                enforces them with LRU or LFU eviction and periodically
+                compacts the segment. Without a policy the cache is unbounded.
+            maintenance_interval (float): Seconds between maintenance passes
+            cache_precision (str, optional): Store cached vectors quantized as
+                "float32", "float16" or "int8" in both the memory tier and a
+                named disk backend. Already cached entries keep the precision
+                they were written with. Use ``quantization_report`` to check
+                the similarity error before switching. Defaults to None
+                (each backend's native precision).
+            max_batch_items (int): Maximum number of texts per embeddings request.
+                Larger batches are split into sub-batches.
+            max_batch_tokens (int): Maximum total tokens per embeddings request.
+                Tokens are counted with ``tiktoken`` when installed and
+                conservatively estimated otherwise.
+            max_parallel_requests (int): Maximum number of sub-batches of one
+                ``get_embeddings_batch`` call requested concurrently
+            requests_per_minute (float, optional): Client-side request budget,
+                shared by every router in the process with the same budgets.
+                None disables it.
+            tokens_per_minute (float, optional): Client-side token budget,
+                shared like ``requests_per_minute``. None disables it.
+            retry_policy (RetryPolicy, optional): Backoff for rate-limited and
+                transient API failures. Defaults to ``RetryPolicy()``.
+            provider (Union[str, EmbeddingProvider], optional): Embedding provider,
+                either a name from ``EMBEDDING_PROVIDERS`` or an instance.
+                Defaults to the EMBEDDING_PROVIDER environment variable, or
+                "openai". Only the OpenAI provider needs OPENAI_API_KEY.
+                Other providers get their own cache segments and are not
+                subject to the rate limits.
+            normalize_unicode (str, optional): Unicode normalization form (e.g.
+                "NFC") applied to texts before they are hashed and embedded,
+                so differently composed copies share a cache entry
+            collapse_whitespace (bool): Strip texts and collapse internal
+                whitespace runs before hashing and embedding. Enabling either
+                normalization changes the cache keys of affected texts.
+            write_behind (bool): Persist new vectors from a background thread
+                instead of in the request path. New vectors are served from
+                memory at once; ``close`` (or ``flush_cache``) persists what
+                is still queued.
+            write_behind_max_pending (int): Maximum number of queued writes
+            write_behind_backpressure (str): What a write does when the queue
+                is full: "block" waits for room, "drop" skips caching the
+                vector
+            chunk_max_tokens (int, optional): Enable chunking mode: texts longer
+                than this many tokens are split into chunks (see
+                ``TextChunker``), the chunks are embedded and cached one by
+                one in a single batch, and the pooled vector is returned. Use
+                at most the model's input limit (8191 for ada-002). None
+                (the default) sends every text whole.
+            chunk_overlap_tokens (int, optional): Tokens each chunk repeats from
+                the previous one. Defaults to a tenth of ``chunk_max_tokens``.
+            chunk_pooling (str): How chunk vectors are combined: "mean", or
+                "weighted" by chunk token count
+            dimensions (int, optional): Output dimension below the model's
+                native one, requested through the ``dimensions`` parameter
+                (text-embedding-3 models and the deterministic provider).
+                Smaller vectors cut storage and vector search cost; use
+                ``dimension_report`` to pick the size. Defaults to the
+                native dimension.
+            projection (Union[str, Path, PCAProjection], optional): PCA
+                projection (or the path of one saved with
+                ``PCAProjection.save``) applied to every vector the provider
+                returns, for models without the ``dimensions`` parameter
+                such as ada-002. Query and document vectors must come from
+                routers with the same projection.
             
         Raises:
-            ValueError: If OPENAI_API_KEY is not found in environment variables
+            ValueError: If the provider is unknown, OPENAI_API_KEY is not
+                found in environment variables when using OpenAI, or the
+                chunking or dimension settings are invalid
         """
         # Load environment variables
         load_dotenv()
         
+        if provider is None:
+            provider = os.getenv("EMBEDDING_PROVIDER", "openai")
+        if isinstance(provider, str):
+            provider = self._create_provider(provider)
+        self.provider = provider
+        self.client = provider.client if isinstance(provider, OpenAIProvider) else None
+        
+        # Setup cache
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self.normalizer = TextNormalizer(normalize_unicode, collapse_whitespace)
+        if chunk_pooling not in POOLING_MODES:
+            raise ValueError(f"chunk_pooling must be one of {', '.join(POOLING_MODES)}")
+        self.chunker = None
+        if chunk_max_tokens is not None:
+            if chunk_overlap_tokens is None:
+                chunk_overlap_tokens = chunk_max_tokens // 10
+            self.chunker = TextChunker(chunk_max_tokens, chunk_overlap_tokens, model)
+        self.chunk_pooling = chunk_pooling
+        
+        # Reduced output dimension: requested from the provider or projected locally
+        is_openai = isinstance(provider, OpenAIProvider)
+        native_dimensions = MODEL_DIMENSIONS.get(model) if is_openai else provider.dimensions
+        if isinstance(projection, (str, Path)):
+            projection = PCAProjection.load(projection)
+        self.projection = projection
+        self._request_options = {}
+        if projection is not None:
+            if native_dimensions is not None and projection.source_dimensions != native_dimensions:
+                raise ValueError(
+                    f"Projection expects {projection.source_dimensions}-dimensional vectors, "
+                    f"{model if is_openai else provider.name} returns {native_dimensions}"
+                )
+            if dimensions is not None and dimensions != projection.dimensions:
+                raise ValueError(f"dimensions={dimensions} does not match the projection's {projection.dimensions}")
+            dimensions = projection.dimensions
+        elif dimensions is not None:
+            if dimensions < 1 or (native_dimensions is not None and dimensions > native_dimensions):
+                raise ValueError(f"dimensions must be between 1 and {native_dimensions}")
+            if is_openai and not supports_native_dimensions(model):
+                raise ValueError(
+                    f"{model} does not support the dimensions parameter; "
+                    "pass a PCAProjection fitted on its vectors as projection instead"
+                )
+            self._request_options['dimensions'] = dimensions
+        self.dimensions = dimensions
+        if is_openai:
+            self.cache_namespace = get_cache_namespace(model, dimensions)
+        else:
+            self.cache_namespace = get_cache_namespace(provider.name, dimensions or provider.dimensions)
+        if projection is not None:
+            # Projections fitted on different samples give incompatible vectors
+            self.cache_namespace = f"{self.cache_namespace}-pca-{projection.fingerprint}"
+        self.segment_dir = self.cache_dir / self.cache_namespace
+        
+        if isinstance(cache_backend, CacheBackend):
+            self.cache_backend_name = None
+            self.disk_cache = cache_backend
+        else:
+            self.cache_backend_name = cache_backend
+            options = {'precision': cache_precision} if cache_precision else {}
+            self.disk_cache = create_cache_backend(cache_backend, self.segment_dir, **options)
+            self._migrate_legacy_entries()
+        
+        # Optional write-behind queue between the router and the disk backend
+        self.write_behind = None
+        storage = self.disk_cache
+        if write_behind:
+            self.write_behind = storage = WriteBehindCache(
+                self.disk_cache,
+                max_pending=write_behind_max_pending,
+                backpressure=write_behind_backpressure
+            )
+        
+        if memory_cache_entries > 0:
+            self.cache = TieredCache(
+                storage,
+                MemoryCache(
+                    max_entries=memory_cache_entries,
+                    max_bytes=memory_cache_bytes,
+                    precision=cache_precision
+                )
+            )
+            if warm_memory_cache:
+                self.cache.warm_in_background()
+        else:
+            self.cache = storage
+        
+        # Telemetry: lifetime and per-window counters plus per-call stats
+        self.metrics = RouterMetrics()
+        self.disk_cache.metrics = self.metrics
+        self.cache.metrics = self.metrics
+        self._last_call = contextvars.ContextVar(f"embedding_router_last_call_{id(self)}", default=None)
+        
+        # Request splitting for large batches
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.max_parallel_requests = max_parallel_requests
+        self._count_tokens = None
+        
+        # Client-side throttling and retries
+        if not provider.rate_limited:
+            requests_per_minute = tokens_per_minute = None
+        self.rate_limiter = get_shared_rate_limiter(requests_per_minute, tokens_per_minute)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        
+        # Cache misses currently being fetched, shared by all callers of this router
+        self._in_flight = SingleFlight()
+        
+        self.maintainer = None
+        if cache_policy is not None:
+            self.maintainer = CacheMaintainer(self.cache, cache_policy, interval_seconds=maintenance_interval)
+            self.maintainer.start()
+        
+    @staticmethod
+    def _create_provider(name: str) -> EmbeddingProvider:
+        """
+        Create a provider by name with its default settings.
+        
+        Raises:
+            ValueError: If the name is unknown, or the OpenAI API key is
+                missing or the client cannot be created
+        """
+        if name not in EMBEDDING_PROVIDERS:
+            raise ValueError(
+                f"Unknown embedding provider '{name}'. Available: {', '.join(sorted(EMBEDDING_PROVIDERS))}"
+            )
+        if name != "openai":
+            return EMBEDDING_PROVIDERS[name]()
+        
         # Configure OpenAI
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
             
         try:
-            self.client = OpenAI(api_key=api_key)
+            # Retries are handled by retry_policy, not by the client
+            client = OpenAI(api_key=api_key, max_retries=0)
         except Exception as e:
             raise ValueError(f"Failed to initialize OpenAI client: {str(e)}")
+        return OpenAIProvider(client)
+    
+    def _migrate_legacy_entries(self):
+        """
+        Move JSON entries that predate this segment's backend into it.
         
-        # Setup cache
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.model = model
-        
+        Covers two cases: flat ``<cache_dir>/<key>.json`` files written before
+        cache segments existed (adopted by the ada-002 segment they came
+        from), and JSON files left in the segment directory when it is
+        reopened with a non-JSON backend.
+        """
+        if self.cache_namespace == LEGACY_CACHE_NAMESPACE and any(self.cache_dir.glob("*.json")):
+            migrate_json_cache(self.cache_dir, self.disk_cache, remove_source=True)
+        if self.cache_backend_name != "json" and self.disk_cache.info()['num_entries'] == 0:
+            migrate_json_cache(self.segment_dir, self.disk_cache)
+    
     def _get_cache_key(self, text: str) -> str:
-        """Generate a unique cache key for the text."""
-        return hashlib.sha256(text.encode()).hexdigest()
+        """
+        Generate a unique cache key for the text.
+        
+        Keys are scoped to the router's cache segment, which is namespaced by
+        model and dimension, so the same text never resolves to another
+        model's vector. The text is normalized first if normalization is
+        enabled.
+        """
+        return hashlib.sha256(self._normalize(text).encode()).hexdigest()
+    
+    def _normalize(self, text: str) -> str:
+        """Apply the configured text normalization, if any."""
+        return self.normalizer(text) if self.normalizer.enabled else text
+    
+    @staticmethod
+    def _dedupe(texts: List[str]) -> Tuple[List[str], List[int]]:
+        """
+        Collapse repeated texts.
+        
+        Returns:
+            Tuple[List[str], List[int]]: The distinct texts in first-seen order
+            and, for every input text, its index among them
+        """
+        index: Dict[str, int] = {}
+        positions = [index.setdefault(text, len(index)) for text in texts]
+        return list(index), positions
     
     def _get_cache_path(self, cache_key: str) -> Path:
-        """Get the full path for a cache file."""
-        return self.cache_dir / f"{cache_key}.json"
+        """Get the full path for a cache file in the JSON directory layout."""
+        return self.segment_dir / f"{cache_key}.json"
     
     def _load_from_cache(self, cache_key: str) -> Optional[List[float]]:
         """
@@ -63,15 +395,10 @@ class EmbeddingRouter:
         Returns:
             Optional[List[float]]: The cached embedding vector if found, None otherwise
         """
-        cache_path = self._get_cache_path(cache_key)
-        if cache_path.exists():
-            try:
-                with cache_path.open('r') as f:
-                    cache_data = json.load(f)
-                return cache_data.get('embedding')
-            except (json.JSONDecodeError, KeyError):
-                return None
-        return None
+        embedding = self.cache.get(cache_key)
+        if embedding is not None and self.maintainer is not None:
+            self.maintainer.touch(cache_key)
+        return embedding
     
     def _save_to_cache(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
         """
@@ -82,13 +409,7 @@ class EmbeddingRouter:
             embedding (List[float]): The embedding vector to cache
             metadata (Dict, optional): Additional metadata to cache
         """
-        cache_path = self._get_cache_path(cache_key)
-        cache_data = {
-            'embedding': embedding,
-            'metadata': metadata if metadata is not None else {}
-        }
-        with cache_path.open('w') as f:
-            json.dump(cache_data, f)
+        self.cache.put(cache_key, embedding, metadata)
     
     def _load_batch_from_cache(self, texts: List[str]) -> Dict[str, Optional[List[float]]]:
         """
@@ -100,11 +421,13 @@ class EmbeddingRouter:
         Returns:
             Dict[str, Optional[List[float]]]: Mapping of text to cached embedding (None if not cached)
         """
-        results = {}
-        for text in texts:
-            cache_key = self._get_cache_key(text)
-            results[text] = self._load_from_cache(cache_key)
-        return results
+        cache_keys = {text: self._get_cache_key(text) for text in texts}
+        cached = self.cache.get_many(list(set(cache_keys.values())))
+        if self.maintainer is not None:
+            for cache_key, embedding in cached.items():
+                if embedding is not None:
+                    self.maintainer.touch(cache_key)
+        return {text: cached.get(cache_key) for text, cache_key in cache_keys.items()}
     
     def _save_batch_to_cache(
         self, 
@@ -123,9 +446,253 @@ class EmbeddingRouter:
         if metadata is None:
             metadata = [None] * len(texts)
             
-        for text, embedding, meta in zip(texts, embeddings, metadata):
-            cache_key = self._get_cache_key(text)
-            self._save_to_cache(cache_key, embedding, meta)
+        self.cache.put_many([
+            (self._get_cache_key(text), embedding, meta)
+            for text, embedding, meta in zip(texts, embeddings, metadata)
+        ])
+    
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the embeddings API for ``texts`` and record usage metrics.
+        
+        Every attempt first waits for the shared rate limiter. Rate-limited
+        and transient failures are retried as the retry policy allows; time
+        spent waiting either way is counted as ``throttled_seconds``.
+        
+        Args:
+            texts (List[str]): Texts to embed, sent as a single request
+            
+        Returns:
+            List[List[float]]: Embedding vectors in input order
+            
+        Raises:
+            OpenAIError: If the API call fails and is not retried
+        """
+        tokens = self._token_count(texts)
+        for attempt in itertools.count():
+            self.metrics.increment('throttled_seconds', self.rate_limiter.acquire(tokens))
+            self.metrics.increment('api_calls')
+            try:
+                result = self.provider.embed(texts, self.model, **self._request_options)
+            except OpenAIError as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            return self._parse_result(texts, result)
+    
+    def _token_count(self, texts: List[str]) -> int:
+        """Count the tokens of ``texts`` with the model's token counter."""
+        if self._count_tokens is None:
+            self._count_tokens = get_token_counter(self.model)
+        return sum(self._count_tokens(text) for text in texts)
+    
+    def _retry_delay(self, error: OpenAIError, attempt: int) -> Optional[float]:
+        """Return the backoff before retrying ``error``, or None to give up."""
+        delay = self.retry_policy.delay_for(error, attempt)
+        if getattr(error, 'status_code', None) == 429:
+            self.metrics.increment('rate_limited_responses')
+        if delay is not None:
+            self.metrics.increment('retries')
+            self.metrics.increment('throttled_seconds', delay)
+        return delay
+    
+    def _parse_result(self, texts: List[str], result) -> List[List[float]]:
+        """Record usage of a successful request and return its (projected) vectors."""
+        self.metrics.increment('texts_embedded', len(texts))
+        if result.total_tokens is not None:
+            self.metrics.increment('tokens_sent', result.total_tokens)
+        if self.projection is not None:
+            return self.projection.apply_many(result.vectors)
+        return result.vectors
+    
+    def _plan_requests(self, texts: List[str]) -> List[List[str]]:
+        """Split ``texts`` into in-order sub-batches within the request limits."""
+        if len(texts) <= 1:
+            return [texts]
+        token_counts = [self._token_count([text]) for text in texts]
+        return [
+            texts[start:end]
+            for start, end in plan_batches(token_counts, self.max_batch_items, self.max_batch_tokens)
+        ]
+    
+    def _embed_texts(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Embed any number of texts, split into sub-batches requested in parallel.
+        
+        Args:
+            texts (List[str]): Texts to embed
+            
+        Returns:
+            Tuple[List[List[float]], int]: Embedding vectors in input order and
+            the number of API requests made
+            
+        Raises:
+            OpenAIError: If any sub-batch request fails
+        """
+        batches = self._plan_requests(texts)
+        if len(batches) == 1:
+            return self._request_embeddings(batches[0]), 1
+        workers = min(self.max_parallel_requests, len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding-request") as executor:
+            results = list(executor.map(self._request_embeddings, batches))
+        return [embedding for batch in results for embedding in batch], len(batches)
+    
+    def _lead_keys(
+        self,
+        texts: List[str],
+        cache_keys: List[str],
+        leading: List[str],
+        metadata: Optional[List[Optional[Dict]]]
+    ) -> Tuple[List[str], Optional[List[Optional[Dict]]]]:
+        """Select the text and metadata to request for each led cache key."""
+        first_index = {}
+        for i, cache_key in enumerate(cache_keys):
+            first_index.setdefault(cache_key, i)
+        lead_texts = [texts[first_index[cache_key]] for cache_key in leading]
+        lead_metadata = None
+        if metadata is not None:
+            lead_metadata = [metadata[first_index[cache_key]] for cache_key in leading]
+        return lead_texts, lead_metadata
+    
+    def _embed_uncached(
+        self,
+        texts: List[str],
+        metadata: Optional[List[Optional[Dict]]] = None
+    ) -> Tuple[List[List[float]], int]:
+        """
+        Embed and cache texts that missed the cache, coalescing with other callers.
+        
+        Texts another caller is already fetching are not requested again;
+        this call waits for that caller's result instead. Only one upstream
+        request per text is in flight at any time.
+        
+        Args:
+            texts (List[str]): Texts missing from the cache
+            metadata (Optional[List[Optional[Dict]]]): Metadata to cache with each text
+            
+        Returns:
+            Tuple[List[List[float]], int]: Embeddings in input order and the
+            number of API calls this caller made
+            
+        Raises:
+            OpenAIError: If this caller's request, or the request it waited
+                on, failed
+        """
+        cache_keys = [self._get_cache_key(text) for text in texts]
+        leading, waiting = self._in_flight.claim(cache_keys)
+        results = {}
+        api_calls = 0
+        if leading:
+            lead_texts, lead_metadata = self._lead_keys(texts, cache_keys, leading, metadata)
+            try:
+                embeddings, api_calls = self._embed_texts(lead_texts)
+                self._save_batch_to_cache(lead_texts, embeddings, lead_metadata)
+            except BaseException as e:
+                self._in_flight.fail(leading, e)
+                raise
+            results = dict(zip(leading, embeddings))
+            self._in_flight.resolve(results)
+        if waiting:
+            self.metrics.increment('coalesced_requests', len(waiting))
+            for cache_key, future in waiting.items():
+                results[cache_key] = future.result()
+        return [results[cache_key] for cache_key in cache_keys], api_calls
+    
+    @staticmethod
+    def _unique_metadata(
+        metadata: Optional[List[Dict]],
+        indices: List[int],
+        positions: List[int],
+        count: int
+    ) -> Optional[List[Optional[Dict]]]:
+        """Pick the metadata of each distinct text's first occurrence."""
+        if metadata is None:
+            return None
+        unique = [None] * count
+        for i, position in reversed(list(zip(indices, positions))):
+            unique[position] = metadata[i]
+        return unique
+    
+    def _count_normalized_hits(self, texts: List[str], normalized: List[str], results: List):
+        """Count cache hits on texts the normalization changed."""
+        if self.normalizer.enabled:
+            self.metrics.increment('normalized_hits', sum(
+                1 for text, norm, result in zip(texts, normalized, results)
+                if result is not None and norm != text
+            ))
+    
+    def _record_call(self, hits: int, misses: int, api_calls: int):
+        self.metrics.increment('cache_hits', hits)
+        self.metrics.increment('cache_misses', misses)
+        self._last_call.set({'cache_hits': hits, 'cache_misses': misses, 'api_calls': api_calls})
+    
+    @staticmethod
+    def _validate_batch(texts: List[str], metadata: Optional[List[Dict]]):
+        """Check the arguments of a batch call, raising ValueError if invalid."""
+        if not texts or not isinstance(texts, list):
+            raise ValueError("Texts must be a non-empty list")
+        
+        if not all(isinstance(text, str) and text.strip() for text in texts):
+            raise ValueError("All texts must be non-empty strings")
+        
+        if metadata is not None and len(metadata) != len(texts):
+            raise ValueError("Metadata list must have the same length as texts list")
+    
+    def _plan_chunks(
+        self,
+        texts: List[str],
+        metadata: Optional[List[Dict]]
+    ) -> Optional[Tuple[List[str], Optional[List[Dict]], List[Tuple[int, int, List[int]]]]]:
+        """
+        Split the texts that exceed the chunk budget.
+        
+        Returns:
+            Optional[Tuple]: None if chunking is off or no text needs it.
+            Otherwise the flat list of chunks, their metadata (each chunk
+            inherits its text's) and per text the ``(start, end)`` range of
+            its chunks plus their token counts.
+        """
+        if self.chunker is None:
+            return None
+        splits = [self.chunker.split(text) for text in texts]
+        if all(len(parts) == 1 for parts in splits):
+            return None
+        chunks, chunk_metadata, spans = [], [], []
+        for i, parts in enumerate(splits):
+            start = len(chunks)
+            chunks.extend(chunk for chunk, _ in parts)
+            chunk_metadata.extend([metadata[i] if metadata is not None else None] * len(parts))
+            spans.append((start, len(chunks), [tokens for _, tokens in parts]))
+            if len(parts) > 1:
+                self.metrics.increment('chunked_texts')
+                self.metrics.increment('text_chunks', len(parts))
+        return chunks, chunk_metadata if metadata is not None else None, spans
+    
+    def _pool_chunks(self, vectors: List[List[float]], spans: List[Tuple[int, int, List[int]]]) -> List[List[float]]:
+        """Pool the chunk vectors of each text into the text's vector."""
+        results = []
+        for start, end, token_counts in spans:
+            if end - start == 1:
+                results.append(vectors[start])
+            else:
+                weights = token_counts if self.chunk_pooling == "weighted" else None
+                results.append(pool_vectors(vectors[start:end], weights))
+        return results
+    
+    def get_last_call_stats(self) -> Dict:
+        """
+        Get cache statistics of the most recent embedding call in this context.
+        
+        The value is tracked per thread and per asyncio task, so concurrent
+        callers each see their own call.
+        
+        Returns:
+            Dict: ``cache_hits``, ``cache_misses`` and ``api_calls`` of the last
+            ``get_embedding``/``get_embeddings_batch`` call, all 0 if none was made
+        """
+        return self._last_call.get() or {'cache_hits': 0, 'cache_misses': 0, 'api_calls': 0}
     
     def get_embedding(
         self,
@@ -150,29 +717,33 @@ class EmbeddingRouter:
         """
         if not text or not isinstance(text, str):
             raise ValueError("Text must be a non-empty string")
+        if self.chunker is not None and self.chunker.needs_split(text):
+            return self.get_embeddings_batch([text], use_cache=use_cache, metadata=[metadata])[0]
+        normalized = self._normalize(text)
             
         # Try cache first
-        cache_key = self._get_cache_key(text)
+        cache_key = self._get_cache_key(normalized)
         if use_cache:
             cached = self._load_from_cache(cache_key)
             if cached is not None:
+                if normalized != text:
+                    self.metrics.increment('normalized_hits')
+                self._record_call(hits=1, misses=0, api_calls=0)
                 return cached
         
-        # Generate new embedding
+        # Generate new embedding; cache misses share in-flight requests
         try:
-            response = self.client.embeddings.create(
-                input=[text],
-                model=self.model
-            )
-            embedding = response.data[0].embedding
-            
-            # Cache the result
             if use_cache:
-                self._save_to_cache(cache_key, embedding, metadata)
-            
+                embeddings, api_calls = self._embed_uncached([normalized], [metadata])
+                embedding = embeddings[0]
+            else:
+                embedding = self._request_embeddings([normalized])[0]
+                api_calls = 1
+            self._record_call(hits=0, misses=1 if use_cache else 0, api_calls=api_calls)
             return embedding
             
         except OpenAIError as e:
+            self._record_call(hits=0, misses=1 if use_cache else 0, api_calls=1)
             raise OpenAIError(f"Failed to generate embedding: {str(e)}")
     
     def get_embeddings_batch(
@@ -186,8 +757,16 @@ class EmbeddingRouter:
         
         This method optimizes API calls by:
         1. Checking cache for all texts first
-        2. Only calling OpenAI API for uncached texts
-        3. Batch processing uncached texts in a single API call
+        2. Only calling OpenAI API for uncached texts, once per distinct text
+           (after the optional normalization)
+        3. Batch processing uncached texts in as few API calls as the
+           per-request item and token limits allow, sent concurrently
+        4. Waiting on, rather than repeating, requests other callers already
+           have in flight for the same texts
+        
+        In chunking mode, texts above ``chunk_max_tokens`` are embedded as
+        chunks within the same batch and replaced by their pooled vector;
+        the per-call stats then count chunks rather than texts.
         
         Args:
             texts (List[str]): List of texts to generate embeddings for
@@ -201,80 +780,394 @@ class EmbeddingRouter:
             ValueError: If texts list is empty or contains invalid items
             OpenAIError: If there's an error calling the OpenAI API
         """
-        if not texts or not isinstance(texts, list):
-            raise ValueError("Texts must be a non-empty list")
-        
-        if not all(isinstance(text, str) and text.strip() for text in texts):
-            raise ValueError("All texts must be non-empty strings")
-        
-        # Handle metadata
-        if metadata is not None and len(metadata) != len(texts):
-            raise ValueError("Metadata list must have the same length as texts list")
+        self._validate_batch(texts, metadata)
         
+        # In chunking mode long texts are embedded chunk by chunk and pooled
+        plan = self._plan_chunks(texts, metadata)
+        if plan is not None:
+            chunks, chunk_metadata, spans = plan
+            return self._pool_chunks(self._get_embeddings_batch(chunks, use_cache, chunk_metadata), spans)
+        return self._get_embeddings_batch(texts, use_cache, metadata)
+    
+    def _get_embeddings_batch(
+        self,
+        texts: List[str],
+        use_cache: bool,
+        metadata: Optional[List[Dict]]
+    ) -> List[List[float]]:
+        """Embed validated texts as they are, without chunking."""
         # Initialize results list to maintain order
         results = [None] * len(texts)
+        normalized = [self._normalize(text) for text in texts]
         texts_to_process = []
         indices_to_process = []
         
         # Check cache for all texts if enabled
         if use_cache:
-            cached_results = self._load_batch_from_cache(texts)
-            for i, text in enumerate(texts):
+            cached_results = self._load_batch_from_cache(normalized)
+            for i, text in enumerate(normalized):
                 cached = cached_results.get(text)
                 if cached is not None:
                     results[i] = cached
                 else:
                     texts_to_process.append(text)
                     indices_to_process.append(i)
+            self._count_normalized_hits(texts, normalized, results)
         else:
-            texts_to_process = texts
+            texts_to_process = normalized
             indices_to_process = list(range(len(texts)))
         
-        # Process uncached texts in batch if any
+        cache_hits = len(texts) - len(texts_to_process) if use_cache else 0
+        cache_misses = len(texts_to_process) if use_cache else 0
+        
+        # Process uncached texts in batch if any, each distinct text once
+        api_calls = 0
         if texts_to_process:
+            unique_texts, positions = self._dedupe(texts_to_process)
+            self.metrics.increment('deduplicated_texts', len(texts_to_process) - len(unique_texts))
             try:
-                # Make batch API call to OpenAI
-                response = self.client.embeddings.create(
-                    input=texts_to_process,
-                    model=self.model
-                )
-                
-                # Extract embeddings from response
-                new_embeddings = [item.embedding for item in response.data]
-                
-                # Store results in correct positions
-                for i, embedding in enumerate(new_embeddings):
-                    result_index = indices_to_process[i]
-                    results[result_index] = embedding
-                
-                # Cache the new embeddings if enabled
                 if use_cache:
-                    batch_metadata = None
-                    if metadata is not None:
-                        batch_metadata = [metadata[i] for i in indices_to_process]
-                    self._save_batch_to_cache(texts_to_process, new_embeddings, batch_metadata)
+                    # Embeds and caches the misses, sharing in-flight requests
+                    batch_metadata = self._unique_metadata(metadata, indices_to_process, positions, len(unique_texts))
+                    new_embeddings, api_calls = self._embed_uncached(unique_texts, batch_metadata)
+                else:
+                    # Make batch API call to OpenAI
+                    new_embeddings, api_calls = self._embed_texts(unique_texts)
+                
+                # Fan results out to every position of each text
+                for result_index, position in zip(indices_to_process, positions):
+                    results[result_index] = new_embeddings[position]
                 
             except OpenAIError as e:
+                self._record_call(hits=cache_hits, misses=cache_misses, api_calls=1)
                 raise OpenAIError(f"Failed to generate batch embeddings: {str(e)}")
         
+        self._record_call(hits=cache_hits, misses=cache_misses, api_calls=api_calls)
         return results
             
-    def clear_cache(self):
-        """Clear all cached embeddings."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+    def clear_cache(self, all_segments: bool = False):
+        """
+        Clear cached embeddings.
+        
+        Args:
+            all_segments (bool): Also drop the segments of every other model.
+                By default only this router's model segment is cleared.
+        """
+        self.cache.clear()
+        if all_segments:
+            for segment in self.list_cache_segments():
+                if segment['namespace'] != self.cache_namespace:
+                    shutil.rmtree(self.cache_dir / segment['namespace'], ignore_errors=True)
+    
+    def run_cache_maintenance(self) -> Dict:
+        """
+        Enforce the cache policy now instead of waiting for the next pass.
+        
+        Returns:
+            Dict: Report of the pass (see ``CacheMaintainer.run_once``)
+            
+        Raises:
+            ValueError: If the router was created without a cache policy
+        """
+        if self.maintainer is None:
+            raise ValueError("No cache_policy configured for this router")
+        return self.maintainer.run_once()
+    
+    def compact_cache(self) -> Dict:
+        """
+        Reclaim cache space and remove corrupt entries from this router's segment.
+        
+        Returns:
+            Dict: ``removed_corrupt`` entries and ``reclaimed_bytes``
+        """
+        if self.maintainer is not None:
+            return self.maintainer.compact()
+        return self.cache.compact()
+    
+    def flush_cache(self):
+        """Persist vectors still queued by write-behind. A no-op without write-behind."""
+        if self.write_behind is not None:
+            self.write_behind.flush()
+    
+    def close(self):
+        """Stop background cache maintenance and close the cache, flushing queued writes."""
+        if self.maintainer is not None:
+            self.maintainer.stop()
+        self.cache.close()
+    
+    def list_cache_segments(self) -> List[Dict]:
+        """
+        List the per-model cache segments under the cache directory.
+        
+        Statistics come from each segment's manifest, so this costs one small
+        file read per segment regardless of how many entries they hold.
+        Segments without one are counted read-only (see
+        ``read_segment_info``); listing never writes to other segments.
+        
+        Returns:
+            List[Dict]: One entry per segment with its ``namespace``,
+            ``backend`` (None if unknown), ``num_entries`` and
+            ``total_size_bytes``
+        """
+        segments = []
+        for path in sorted(self.cache_dir.iterdir()):
+            if not path.is_dir():
+                continue
+            if path.name == self.cache_namespace:
+                info = {'backend': self.cache_backend_name or detect_cache_backend(path), **self.disk_cache.info()}
+            else:
+                info = read_segment_info(path)
+            segments.append({
+                'namespace': path.name,
+                'backend': info['backend'],
+                'num_entries': info['num_entries'],
+                'total_size_bytes': info['total_size_bytes']
+            })
+        return segments
+    
+    def drop_cache_segment(self, model: str, dimensions: Optional[int] = None) -> bool:
+        """
+        Delete the cache segment of another model.
+        
+        Args:
+            model (str): Model whose segment should be dropped
+            dimensions (int, optional): Output dimension of that segment.
+                Defaults to the model's native dimension.
+                
+        Returns:
+            bool: True if a segment was removed
+            
+        Raises:
+            ValueError: If asked to drop this router's own segment; use
+                ``clear_cache`` for that instead
+        """
+        namespace = get_cache_namespace(model, dimensions)
+        if namespace == self.cache_namespace:
+            raise ValueError("Use clear_cache() to drop the router's own cache segment")
+        segment_dir = self.cache_dir / namespace
+        if not segment_dir.is_dir():
+            return False
+        shutil.rmtree(segment_dir)
+        return True
+    
+    def prewarm(self, texts: List[str], batch_size: int = 100) -> int:
+        """
+        Embed texts into this router's cache segment ahead of time.
+        
+        Useful before switching traffic to a new model: a router for the new
+        model can fill its own segment while the old segment keeps serving.
+        
+        Args:
+            texts (List[str]): Texts to embed
+            batch_size (int): Number of texts per batch call
+            
+        Returns:
+            int: Number of texts that were not cached yet and got embedded
+        """
+        embedded = 0
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            cached = self._load_batch_from_cache(batch)
+            uncached = [text for text in batch if cached.get(text) is None]
+            if uncached:
+                self.get_embeddings_batch(uncached)
+                embedded += len(uncached)
+        return embedded
+            
+    def export_cache(
+        self,
+        pack_path: Union[str, Path],
+        models: Optional[List[str]] = None,
+        max_age_seconds: Optional[float] = None,
+        precision: str = "float32"
+    ) -> Dict:
+        """
+        Export the cache directory to a compressed, checksummed pack file.
+        
+        Packs can be baked into container images or copied between nodes
+        and loaded with ``import_cache``. All segments are exported unless
+        filtered (see ``vector.cache_pack.export_cache_pack``).
+        
+        Args:
+            pack_path (Union[str, Path]): File to write
+            models (List[str], optional): Only export these models' segments
+            max_age_seconds (float, optional): Only export entries cached
+                within this many seconds
+            precision (str): Vector encoding inside the pack
+            
+        Returns:
+            Dict: ``num_entries``, per-segment counts, ``size_bytes`` and ``sha256``
+        """
+        self.flush_cache()
+        return export_cache_pack(
+            self.cache_dir,
+            pack_path,
+            models=models,
+            max_age_seconds=max_age_seconds,
+            precision=precision,
+            segments={self.cache_namespace: self.disk_cache}
+        )
+    
+    def import_cache(
+        self,
+        pack_path: Union[str, Path],
+        models: Optional[List[str]] = None,
+        max_age_seconds: Optional[float] = None,
+        mode: str = "merge"
+    ) -> Dict:
+        """
+        Import a pack written by ``export_cache`` into the cache directory.
+        
+        Args:
+            pack_path (Union[str, Path]): Pack file to load
+            models (List[str], optional): Only import these models' segments
+            max_age_seconds (float, optional): Only import entries cached
+                within this many seconds
+            mode (str): "merge" keeps existing entries and adds the missing
+                ones; "replace" clears the imported segments first
+            
+        Returns:
+            Dict: ``imported`` and ``skipped`` entries and per-segment counts
+            
+        Raises:
+            ValueError: If ``mode`` is unknown
+            CachePackError: If the pack is corrupt or truncated; nothing is
+                imported in that case
+        """
+        self.flush_cache()
+        report = import_cache_pack(
+            pack_path,
+            self.cache_dir,
+            models=models,
+            max_age_seconds=max_age_seconds,
+            mode=mode,
+            backend=self.cache_backend_name or "json",
+            segments={self.cache_namespace: self.disk_cache}
+        )
+        if mode == "replace" and isinstance(self.cache, TieredCache):
+            self.cache.memory.clear()
+        return report
+            
+    def quantization_report(self, sample_size: int = 200) -> Dict[str, Dict[str, float]]:
+        """
+        Measure the similarity error each storage precision would introduce.
+        
+        Evaluated on up to ``sample_size`` of the most recently cached vectors
+        of this router's segment.
+        
+        Args:
+            sample_size (int): Maximum number of cached vectors and vector pairs
+                to evaluate
+            
+        Returns:
+            Dict[str, Dict[str, float]]: Per precision report, see
+            ``vector.quantization.quantization_error_report``
+            
+        Raises:
+            ValueError: If the segment holds fewer than two vectors
+        """
+        return quantization_error_report(self._sample_cached_vectors(sample_size), PRECISIONS, sample_size=sample_size)
+    
+    def dimension_report(
+        self,
+        candidates: List[int],
+        sample_size: int = 1000,
+        k: int = 10,
+        method: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Measure the search recall each reduced output dimension would keep.
+        
+        Evaluated on up to ``sample_size`` of the most recently cached vectors
+        of this router's segment, so run it on a router without
+        ``dimensions`` or ``projection``. Nearest neighbours of a sample of
+        them among the reduced vectors are compared with those among the
+        full vectors.
+        
+        Args:
+            candidates (List[int]): Target dimensions to evaluate
+            sample_size (int): Maximum number of cached vectors to evaluate
+            k (int): Number of neighbours per query
+            method (str, optional): "truncate" (what the ``dimensions``
+                parameter returns) or "pca" (a projection fitted on the
+                sample). Defaults to "truncate" for models with the
+                ``dimensions`` parameter and "pca" otherwise.
+            
+        Returns:
+            List[Dict]: Per candidate report, see
+            ``vector.dimension_reduction.dimension_recall_report``
+            
+        Raises:
+            ValueError: If the segment holds no more than ``k`` vectors
+            ImportError: If the "pca" method is used without numpy
+        """
+        if method is None:
+            method = "truncate" if supports_native_dimensions(self.model) else "pca"
+        vectors = self._sample_cached_vectors(sample_size)
+        if len(vectors) <= k:
+            raise ValueError(f"At least {k + 1} cached vectors are needed for a dimension report")
+        return dimension_recall_report(vectors, candidates, method=method, k=k)
+    
+    def fit_projection(self, dimensions: int, sample_size: int = 1000) -> PCAProjection:
+        """
+        Fit a PCA projection on this segment's cached vectors.
+        
+        Save the result with ``PCAProjection.save`` and pass it as
+        ``projection`` to the routers that embed queries and documents.
+        
+        Args:
+            dimensions (int): Output dimension of the projection
+            sample_size (int): Maximum number of recently cached vectors to fit on
+            
+        Returns:
+            PCAProjection: The fitted projection
+            
+        Raises:
+            ValueError: If the segment holds no more than ``dimensions`` vectors
+            ImportError: If numpy is not installed
+        """
+        return PCAProjection.fit(self._sample_cached_vectors(sample_size), dimensions)
+    
+    def _sample_cached_vectors(self, sample_size: int) -> List[List[float]]:
+        """Return up to ``sample_size`` of the most recently cached vectors of this segment."""
+        self.flush_cache()
+        keys = list(self.disk_cache.recent_keys(sample_size))
+        return [vector for vector in self.disk_cache.get_many(keys).values() if vector is not None]
             
     def get_cache_info(self) -> Dict:
         """
         Get information about the cache.
         
+        Runs in constant time per cache segment: entry counts and sizes are
+        maintained incrementally in segment manifests rather than counted.
+        
         Returns:
-            Dict: Cache statistics including size and number of entries
+            Dict: Statistics of this router's segment (``num_entries``,
+            ``total_size_bytes``, memory tier usage, ``pending_writes`` queued
+            by write-behind), a per-model ``segments``
+            breakdown of the whole cache directory, the lifetime ``hit_rate``
+            and the router's telemetry counters under ``metrics``
         """
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files)
+        info = self.cache.info()
+        metrics = self.metrics.snapshot()
         return {
-            'num_entries': len(cache_files),
-            'total_size_bytes': total_size,
-            'cache_dir': str(self.cache_dir)
-        } 
\ No newline at end of file
+            'num_entries': info['num_entries'],
+            'total_size_bytes': info['total_size_bytes'],
+            'memory_entries': info.get('memory_entries', 0),
+            'memory_size_bytes': info.get('memory_size_bytes', 0),
+            'pending_writes': info.get('pending_writes', 0),
+            'cache_dir': str(self.cache_dir),
+            'namespace': self.cache_namespace,
+            'dimensions': self.dimensions,
+            'backend': type(self.disk_cache).__name__,
+            'hit_rate': metrics['hit_rate'],
+            'metrics': metrics,
+            'segments': {
+                segment['namespace']: {
+                    'num_entries': segment['num_entries'],
+                    'total_size_bytes': segment['total_size_bytes']
+                }
+                for segment in self.list_cache_segments()
+            }
+        }
+ 
\ No newline at end of file
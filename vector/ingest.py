@@ -0,0 +1,181 @@
+import io
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from vector.memory_writer import _validate_memories, write_memories_batch_detailed
+
+# A record of the input stream: its position (line number for NDJSON) and the parsed memory
+Record = Tuple[int, Any]
+
+
+def iter_ndjson(source: Union[str, Path, TextIO]) -> Iterator[Record]:
+    """
+    Stream memories from an NDJSON file, one JSON object per line.
+
+    Blank lines are skipped. A line that is not valid JSON is yielded as a
+    ``ValueError``, so the ingest reports it instead of stopping.
+
+    Args:
+        source (Union[str, Path, TextIO]): File path, or an open text stream such as stdin
+
+    Yields:
+        Tuple[int, Any]: One-based line number and the parsed record
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_ndjson(f)
+        return
+    for line_number, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"invalid JSON: {e.msg}")
+
+
+def _write_batch(batch: List[Record], write_options: Dict[str, Any]) -> Tuple[int, int, List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Validate, embed and write one batch.
+
+    Returns:
+        Tuple: Number of memories written and of memories skipped because
+        they already existed (upsert mode), then ``(position, error)`` of
+        the invalid records and of the records whose write failed
+    """
+    invalid = []
+    valid = []
+    for position, memory in batch:
+        if isinstance(memory, Exception):
+            invalid.append((position, str(memory)))
+            continue
+        if not isinstance(memory, dict):
+            invalid.append((position, "record must be a JSON object"))
+            continue
+        try:
+            _validate_memories([memory])
+        except ValueError as e:
+            invalid.append((position, str(e).replace("Memory at index 0: ", "")))
+            continue
+        valid.append((position, memory))
+    if not valid:
+        return 0, 0, invalid, []
+    try:
+        results = write_memories_batch_detailed([memory for _, memory in valid], **write_options)
+    except Exception as e:
+        # Embedding the batch failed; none of it was written
+        return 0, 0, invalid, [(position, str(e)) for position, _ in valid]
+    failed = [(position, result.error) for (position, _), result in zip(valid, results) if not result.success]
+    existed = sum(1 for result in results if result.existed)
+    return len(valid) - len(failed) - existed, existed, invalid, failed
+
+
+def ingest_memories(
+    source: Union[str, Path, TextIO, Iterable[Dict[str, Any]]],
+    batch_size: int = 100,
+    parallel: int = 2,
+    write_options: Optional[Dict[str, Any]] = None,
+    on_error: Optional[Callable[[int, str], None]] = None,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    progress_interval: float = 2.0
+) -> Dict:
+    """
+    Stream memories into Weaviate in rolling batches.
+
+    Records are read lazily and grouped into batches of ``batch_size``; each
+    batch is validated, embedded in one call and written with one batch
+    import (see ``write_memories_batch_detailed``). Up to ``parallel``
+    batches are in flight, so embedding one batch overlaps with writing
+    another, and reading waits when they are all busy: memory use depends on
+    ``batch_size * parallel``, not on the size of the input. Invalid records
+    and failed writes are reported through ``on_error`` and counted; they
+    never stop the ingest.
+
+    Args:
+        source: NDJSON file path, an open NDJSON text stream, or an
+            iterable of memory dictionaries (see ``write_memories_batch``)
+        batch_size (int): Memories per batch
+        parallel (int): Maximum number of batches in flight
+        write_options (Dict[str, Any], optional): Keyword arguments for
+            ``write_memories_batch_detailed``, e.g. ``num_workers`` or
+            ``retry_policy``; ``upsert=True`` makes re-running an import
+            skip the memories it already wrote
+        on_error (Callable[[int, str], None], optional): Called with the
+            position (line number for NDJSON, one-based index otherwise)
+            and error of every record that was not written
+        on_progress (Callable[[Dict], None], optional): Called with the
+            running statistics at most every ``progress_interval`` seconds
+        progress_interval (float): Seconds between ``on_progress`` calls
+
+    Returns:
+        Dict: ``records`` read, ``written``, ``existing`` (already stored,
+        upsert mode only), ``invalid`` (rejected before
+        writing), ``failed`` (rejected by embedding or Weaviate),
+        ``elapsed_seconds`` and ``memories_per_second`` (written)
+
+    Raises:
+        ValueError: If ``batch_size`` or ``parallel`` is not positive
+
+    Example:
+        >>> stats = ingest_memories("memories.ndjson", batch_size=200, parallel=4)
+        >>> print(f"{stats['written']} memories at {stats['memories_per_second']:.0f}/s")
+    """
+    if batch_size < 1 or parallel < 1:
+        raise ValueError("batch_size and parallel must be positive")
+    if isinstance(source, (str, Path, io.TextIOBase)):
+        records = iter_ndjson(source)
+    else:
+        records = enumerate(source, start=1)
+    write_options = write_options or {}
+
+    started = time.monotonic()
+    last_progress = started
+    stats = {'records': 0, 'written': 0, 'existing': 0, 'invalid': 0, 'failed': 0}
+
+    def snapshot() -> Dict:
+        elapsed = time.monotonic() - started
+        return {
+            **stats,
+            'elapsed_seconds': elapsed,
+            'memories_per_second': stats['written'] / elapsed if elapsed > 0 else 0.0
+        }
+
+    def complete(future, batch: List[Record]):
+        written, existed, invalid, failed = future.result()
+        stats['records'] += len(batch)
+        stats['written'] += written
+        stats['existing'] += existed
+        stats['invalid'] += len(invalid)
+        stats['failed'] += len(failed)
+        if on_error is not None:
+            for position, error in sorted(invalid + failed):
+                on_error(position, error)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="memory-ingest") as executor:
+        batch: List[Record] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) < batch_size:
+                continue
+            # Bound memory: wait for the oldest batch once all slots are busy
+            while len(pending) >= parallel:
+                complete(*pending.popleft())
+            pending.append((executor.submit(_write_batch, batch, write_options), batch))
+            batch = []
+            while pending and pending[0][0].done():
+                complete(*pending.popleft())
+            if on_progress is not None and time.monotonic() - last_progress >= progress_interval:
+                on_progress(snapshot())
+                last_progress = time.monotonic()
+        if batch:
+            pending.append((executor.submit(_write_batch, batch, write_options), batch))
+        while pending:
+            complete(*pending.popleft())
+
+    return snapshot()
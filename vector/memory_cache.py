@@ -0,0 +1,248 @@
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Dict, Iterator
+
+from .cache_backends import CacheBackend, CacheItem, CacheEntryInfo
+from .quantization import encode_vector, decode_vector, PRECISION_CODES
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache of embedding vectors.
+
+    Vectors are held as compact ``array('d')`` buffers (8 bytes per value
+    instead of ~32 for a list of Python floats) and converted back to lists on
+    a hit, so a memory hit returns exactly the values the disk tier stored.
+    With a ``precision`` the vectors are held quantized instead (see
+    ``vector.quantization``), fitting 4-8x more entries into the same budget
+    at the cost of the small error that precision introduces. The cache is
+    bounded both by entry count and by the byte size of the stored buffers;
+    the least recently used entries are evicted first. All operations are
+    thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        precision: Optional[str] = None
+    ):
+        """
+        Initialize the memory cache.
+
+        Args:
+            max_entries (int): Maximum number of vectors to keep
+            max_bytes (int): Maximum total size of the stored vectors in bytes
+            precision (str, optional): "float32", "float16" or "int8" to store
+                quantized vectors. Defaults to None (exact float64 values).
+
+        Raises:
+            ValueError: If the precision is unknown
+        """
+        if precision is not None and precision not in PRECISION_CODES:
+            raise ValueError(f"Unknown precision '{precision}'. Available: {', '.join(PRECISION_CODES)}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.precision = precision
+        self._entries: "OrderedDict[str, array | bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        """Return the vector for ``cache_key`` and mark it most recently used."""
+        with self._lock:
+            vector = self._entries.get(cache_key)
+            if vector is None:
+                return None
+            self._entries.move_to_end(cache_key)
+        if self.precision is None:
+            return vector.tolist()
+        return decode_vector(vector[4:], self.precision, int.from_bytes(vector[:4], 'little'))
+
+    def put(self, cache_key: str, embedding: List[float]):
+        """Insert or refresh ``cache_key``, evicting old entries to stay in budget."""
+        if self.precision is None:
+            vector = array('d', embedding)
+        else:
+            vector = len(embedding).to_bytes(4, 'little') + encode_vector(embedding, self.precision)
+        size = _buffer_size(vector)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._bytes -= _buffer_size(previous)
+            self._entries[cache_key] = vector
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= _buffer_size(evicted)
+
+    def discard(self, cache_key: str):
+        """Drop ``cache_key`` if present."""
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._bytes -= _buffer_size(previous)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, cache_key: str) -> bool:
+        with self._lock:
+            return cache_key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored vectors in bytes."""
+        return self._bytes
+
+
+def _buffer_size(vector) -> int:
+    if isinstance(vector, bytes):
+        return len(vector)
+    return len(vector) * vector.itemsize
+
+
+class TieredCache(CacheBackend):
+    """
+    Cache backend serving hot entries from a ``MemoryCache`` in front of a
+    disk backend.
+
+    Reads check memory first and promote disk hits into memory; writes go to
+    both tiers. Memory hits are reported as ``memory_hits`` when ``metrics``
+    is set. Storage statistics and key listings come from the disk tier,
+    which remains the source of truth.
+    """
+
+    def __init__(self, disk: CacheBackend, memory: MemoryCache):
+        self.disk = disk
+        self.memory = memory
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def _count_memory_hits(self, hits: int):
+        if self.metrics is not None:
+            self.metrics.increment('memory_hits', hits)
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        embedding = self.memory.get(cache_key)
+        if embedding is not None:
+            self._count_memory_hits(1)
+            return embedding
+        embedding = self.disk.get(cache_key)
+        if embedding is not None:
+            self.memory.put(cache_key, embedding)
+        return embedding
+
+    def get_many(self, cache_keys: List[str]) -> Dict[str, Optional[List[float]]]:
+        results = {}
+        missing = []
+        for cache_key in cache_keys:
+            embedding = self.memory.get(cache_key)
+            if embedding is None:
+                missing.append(cache_key)
+            results[cache_key] = embedding
+        self._count_memory_hits(len(cache_keys) - len(missing))
+        if missing:
+            for cache_key, embedding in self.disk.get_many(missing).items():
+                if embedding is not None:
+                    self.memory.put(cache_key, embedding)
+                results[cache_key] = embedding
+        return results
+
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        return self.disk.get_metadata(cache_key)
+
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        self.disk.put(cache_key, embedding, metadata)
+        self.memory.put(cache_key, embedding)
+
+    def put_many(self, items: List[CacheItem]):
+        self.disk.put_many(items)
+        for cache_key, embedding, _ in items:
+            self.memory.put(cache_key, embedding)
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        self.disk.restore_many(items, created_at)
+        for cache_key, embedding, _ in items:
+            self.memory.put(cache_key, embedding)
+
+    def delete(self, cache_key: str) -> bool:
+        self.memory.discard(cache_key)
+        return self.disk.delete(cache_key)
+
+    def contains(self, cache_key: str) -> bool:
+        return cache_key in self.memory or self.disk.contains(cache_key)
+
+    def keys(self) -> Iterator[str]:
+        return self.disk.keys()
+
+    def recent_keys(self, limit: int) -> List[str]:
+        return self.disk.recent_keys(limit)
+
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        return self.disk.entries()
+
+    def compact(self) -> Dict:
+        return self.disk.compact()
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def info(self) -> Dict:
+        info = dict(self.disk.info())
+        info['memory_entries'] = len(self.memory)
+        info['memory_size_bytes'] = self.memory.size_bytes
+        return info
+
+    def close(self):
+        if self._warm_thread is not None:
+            self._warm_thread.join()
+        self.disk.close()
+
+    def warm(self, limit: Optional[int] = None) -> int:
+        """
+        Load the most recently written disk entries into memory.
+
+        Loading stops once the memory tier is full, so warming never evicts
+        vectors that live traffic has already pulled in.
+
+        Args:
+            limit (int, optional): Maximum number of entries to load.
+                Defaults to the memory tier's entry budget.
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if limit is None:
+            limit = self.memory.max_entries
+        loaded = 0
+        for cache_key in self.disk.recent_keys(limit):
+            if len(self.memory) >= self.memory.max_entries or self.memory.size_bytes >= self.memory.max_bytes:
+                break
+            if cache_key in self.memory:
+                continue
+            embedding = self.disk.get(cache_key)
+            if embedding is not None:
+                self.memory.put(cache_key, embedding)
+                loaded += 1
+        return loaded
+
+    def warm_in_background(self, limit: Optional[int] = None) -> threading.Thread:
+        """Run ``warm`` in a daemon thread and return the thread."""
+        self._warm_thread = threading.Thread(
+            target=self.warm,
+            args=(limit,),
+            name="embedding-cache-warmer",
+            daemon=True
+        )
+        self._warm_thread.start()
+        return self._warm_thread
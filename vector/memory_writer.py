@@ -1,8 +1,106 @@
+import re
+import json
+import time
+import uuid
 import datetime
-from typing import List, Optional, Dict, Any
+import threading
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
+import requests
 import weaviate
+from weaviate.exceptions import ObjectAlreadyExistsException
+from weaviate.util import generate_uuid5
 from vector.config import get_weaviate_client
 from vector.embedding import embed_text, embed_texts_batch
+from vector.rate_limit import RetryPolicy
+
+# Defaults of the Weaviate batch import used by write_memories_batch
+BATCH_SIZE = 100
+BATCH_NUM_WORKERS = 1
+BATCH_DYNAMIC = False
+
+# The shared client has a single batch object; one batch import at a time
+_batch_lock = threading.Lock()
+
+# Per-object batch errors worth retrying: timeouts, overload and connection trouble
+_TRANSIENT_ERROR = re.compile(
+    r"timeout|timed out|deadline exceeded|connection|unavailable|temporar|too many requests|\b(429|502|503|504)\b",
+    re.IGNORECASE
+)
+# HTTP statuses of a failed batch request worth retrying
+_TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# UUIDs looked up per existence query in upsert mode
+EXISTENCE_CHECK_CHUNK = 1000
+
+
+class MemoryWriteResult(NamedTuple):
+    """Outcome of one memory of a batch write, in input order."""
+    uuid: Optional[str]
+    error: Optional[str]
+    attempts: int
+    # Upsert mode: the memory was already stored and was neither embedded nor written
+    existed: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def memory_uuid(content: str, project: str, repo: str, agent: str) -> str:
+    """
+    Derive the deterministic UUID of a memory from its identity.
+
+    The same content written by the same agent to the same project and repo
+    always maps to the same UUID, which makes writes idempotent. Tags,
+    source and timestamp are not part of the identity.
+
+    Args:
+        content (str): The main text content of the memory
+        project (str): The project identifier
+        repo (str): The repository name
+        agent (str): The AI agent identifier
+
+    Returns:
+        str: A UUIDv5 string
+    """
+    return generate_uuid5(json.dumps([content, project, repo, agent], ensure_ascii=False), "ProjectMemory")
+
+
+def existing_memory_uuids(client: weaviate.Client, uuids: List[str]) -> set:
+    """
+    Find which of ``uuids`` are already stored, with one query per
+    ``EXISTENCE_CHECK_CHUNK`` UUIDs instead of one request each.
+
+    Args:
+        client (weaviate.Client): Weaviate client
+        uuids (List[str]): UUIDs to look up
+
+    Returns:
+        set: The UUIDs that exist in the ProjectMemory class
+
+    Raises:
+        Exception: If Weaviate reports an error for the query
+    """
+    unique = list(dict.fromkeys(uuids))
+    existing = set()
+    for start in range(0, len(unique), EXISTENCE_CHECK_CHUNK):
+        chunk = unique[start:start + EXISTENCE_CHECK_CHUNK]
+        response = (client.query
+            .get("ProjectMemory")
+            .with_additional(["id"])
+            .with_where({
+                "path": ["id"],
+                "operator": "ContainsAny",
+                "valueTextArray": chunk
+            })
+            .with_limit(len(chunk))
+            .do())
+        if response.get("errors"):
+            raise Exception(f"Existence check failed: {response['errors']}")
+        for item in (response.get("data") or {}).get("Get", {}).get("ProjectMemory") or []:
+            existing.add(item["_additional"]["id"])
+    return existing
+
 
 def write_memory(
     content: str,
@@ -10,7 +108,8 @@ def write_memory(
     repo: str,
     agent: str,
     tags: List[str],
-    source: str = "agent"
+    source: str = "agent",
+    upsert: bool = False
 ) -> str:
     """
     Write a new memory entry to the Weaviate database.
@@ -25,9 +124,12 @@ def write_memory(
         agent (str): The AI agent identifier
         tags (List[str]): List of relevant tags for categorization
         source (str, optional): Source of the memory. Defaults to "agent"
+        upsert (bool, optional): Use the deterministic ``memory_uuid`` and, if
+            a memory with it is already stored, return its UUID without
+            embedding or writing anything. Defaults to False.
         
     Returns:
-        str: The UUID of the created memory object
+        str: The UUID of the created (or, in upsert mode, existing) memory object
         
     Raises:
         ValueError: If any required parameters are empty or invalid
@@ -54,8 +156,13 @@ def write_memory(
     if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
         raise ValueError("Tags must be a list of strings")
         
-    # Get client and generate embedding
+    # Get client; in upsert mode a stored memory is found before embedding it
     client = get_weaviate_client()
+    object_uuid = None
+    if upsert:
+        object_uuid = memory_uuid(content, project, repo, agent)
+        if client.data_object.exists(object_uuid, class_name="ProjectMemory"):
+            return object_uuid
     vector = embed_text(content)
     
     # Prepare the data object
@@ -71,23 +178,254 @@ def write_memory(
     
     # Write to Weaviate
     try:
+        if object_uuid is not None:
+            client.data_object.create(
+                data_object=data_object,
+                class_name="ProjectMemory",
+                uuid=object_uuid,
+                vector=vector
+            )
+            return object_uuid
         result = client.data_object.create(
             data_object=data_object,
             class_name="ProjectMemory",
             vector=vector
         )
         return result.uuid
+    except ObjectAlreadyExistsException:
+        # A concurrent upsert of the same memory won
+        return object_uuid
     except Exception as e:
         raise Exception(f"Failed to write memory: {str(e)}")
 
-def write_memories_batch(memories: List[Dict[str, Any]]) -> List[str]:
+def _validate_memories(memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate batch input and build the Weaviate data objects, in input order."""
+    if not memories or not isinstance(memories, list):
+        raise ValueError("Memories must be a non-empty list")
+    
+    validated_memories = []
+    for i, memory in enumerate(memories):
+        if not isinstance(memory, dict):
+            raise ValueError(f"Memory at index {i} must be a dictionary")
+        
+        # Validate required fields
+        content = memory.get("content")
+        project = memory.get("project") 
+        repo = memory.get("repo")
+        agent = memory.get("agent")
+        tags = memory.get("tags")
+        source = memory.get("source", "agent")  # Default source
+        
+        if not content or not isinstance(content, str):
+            raise ValueError(f"Memory at index {i}: content must be a non-empty string")
+        if not project or not isinstance(project, str):
+            raise ValueError(f"Memory at index {i}: project must be a non-empty string")
+        if not repo or not isinstance(repo, str):
+            raise ValueError(f"Memory at index {i}: repo must be a non-empty string")
+        if not agent or not isinstance(agent, str):
+            raise ValueError(f"Memory at index {i}: agent must be a non-empty string")
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError(f"Memory at index {i}: tags must be a list of strings")
+        if not isinstance(source, str):
+            raise ValueError(f"Memory at index {i}: source must be a string")
+        
+        validated_memories.append({
+            "content": content,
+            "project": project,
+            "repo": repo,
+            "agent": agent,
+            "tags": tags,
+            "source": source,
+            "timestamp": datetime.datetime.utcnow().isoformat()
+        })
+    return validated_memories
+
+
+def _import_objects(
+    client: weaviate.Client,
+    objects: List[Tuple[str, Dict[str, Any], List[float]]],
+    batch_size: int,
+    num_workers: int,
+    dynamic: bool
+) -> Dict[str, str]:
+    """
+    Send ``(uuid, data_object, vector)`` triples through one batch import.
+    
+    Returns:
+        Dict[str, str]: Error message per UUID that Weaviate rejected
+    """
+    errors = {}
+    
+    def collect_errors(results: Optional[List[Dict[str, Any]]]):
+        for result in results or []:
+            object_errors = ((result.get("result") or {}).get("errors") or {}).get("error")
+            if object_errors:
+                errors[str(result.get("id"))] = "; ".join(
+                    error.get("message", "") for error in object_errors
+                )
+    
+    with _batch_lock:
+        client.batch.configure(
+            batch_size=batch_size,
+            dynamic=dynamic,
+            num_workers=num_workers,
+            callback=collect_errors
+        )
+        with client.batch as batch:
+            for object_uuid, data_object, vector in objects:
+                batch.add_data_object(
+                    data_object=data_object,
+                    class_name="ProjectMemory",
+                    uuid=object_uuid,
+                    vector=vector
+                )
+    return errors
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed batch request is worth sending again."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return getattr(error, "status_code", None) in _TRANSIENT_STATUS_CODES
+
+
+def write_memories_batch_detailed(
+    memories: List[Dict[str, Any]],
+    batch_size: int = BATCH_SIZE,
+    num_workers: int = BATCH_NUM_WORKERS,
+    dynamic: bool = BATCH_DYNAMIC,
+    retry_policy: Optional[RetryPolicy] = None,
+    upsert: bool = False
+) -> List[MemoryWriteResult]:
+    """
+    Write multiple memory entries and report the outcome of each one.
+    
+    Unlike ``write_memories_batch``, a failing memory does not abort the
+    batch. Memories that fail transiently (timeouts, overload, connection
+    errors) are resubmitted with backoff, and only those: memories already
+    written are never sent twice. Every memory keeps the UUID assigned to it
+    up front across attempts, so a retry after an ambiguous failure
+    overwrites rather than duplicates it.
+    
+    In upsert mode the UUIDs are the deterministic ``memory_uuid`` of each
+    memory. One bulk existence check runs before anything is embedded, and
+    memories that are already stored (or repeated within the batch) are
+    neither embedded nor written again, so re-running an import is nearly
+    free.
+    
+    Args:
+        memories (List[Dict[str, Any]]): Memory dictionaries, see ``write_memories_batch``
+        batch_size (int): Objects per batch request. Defaults to 100.
+        num_workers (int): Batch requests sent concurrently. Defaults to 1.
+        dynamic (bool): Let the client adapt the batch size. Defaults to False.
+        retry_policy (RetryPolicy, optional): Number of resubmissions and their
+            backoff. Defaults to 3 retries starting at 0.5 seconds.
+        upsert (bool): Skip memories that are already stored, see above.
+            Defaults to False.
+            
+    Returns:
+        List[MemoryWriteResult]: Per memory, in input order, the UUID if it
+        was written (or already existed) or the error if it was not, and
+        the attempts made
+        
+    Raises:
+        ValueError: If memories list is empty or contains invalid entries
+        Exception: If the embeddings cannot be generated, in which case
+            nothing was written
+        
+    Example:
+        >>> results = write_memories_batch_detailed(memories, upsert=True)
+        >>> failed = [memories[i] for i, result in enumerate(results) if not result.success]
+    """
+    validated_memories = _validate_memories(memories)
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_retries=3, base_delay=0.5, max_delay=10.0)
+    results: List[Optional[MemoryWriteResult]] = [None] * len(validated_memories)
+    # Memories repeated within the batch share the outcome of their first occurrence
+    duplicates: Dict[int, int] = {}
+    
+    if upsert:
+        uuids = [
+            memory_uuid(memory["content"], memory["project"], memory["repo"], memory["agent"])
+            for memory in validated_memories
+        ]
+        try:
+            existing = existing_memory_uuids(get_weaviate_client(), uuids)
+        except Exception:
+            # Writing everything is still idempotent with these UUIDs, just not free
+            existing = set()
+        first_index: Dict[str, int] = {}
+        for i, object_uuid in enumerate(uuids):
+            if object_uuid in existing:
+                results[i] = MemoryWriteResult(object_uuid, None, 0, existed=True)
+            elif object_uuid in first_index:
+                duplicates[i] = first_index[object_uuid]
+            else:
+                first_index[object_uuid] = i
+        pending = list(first_index.values())
+    else:
+        # UUIDs are assigned up front so they come back in input order
+        uuids = [str(uuid.uuid4()) for _ in validated_memories]
+        pending = list(range(len(validated_memories)))
+    
+    if pending:
+        try:
+            # Generate embeddings in batch, only for memories that will be written
+            vectors = dict(zip(pending, embed_texts_batch([validated_memories[i]["content"] for i in pending])))
+        except Exception as e:
+            raise Exception(f"Failed to write memories batch: {str(e)}")
+    
+    for attempt in range(retry_policy.max_retries + 1):
+        if not pending:
+            break
+        try:
+            client = get_weaviate_client()
+            errors = _import_objects(
+                client,
+                [(uuids[i], validated_memories[i], vectors[i]) for i in pending],
+                batch_size, num_workers, dynamic
+            )
+            transient = {object_uuid for object_uuid, message in errors.items() if _TRANSIENT_ERROR.search(message)}
+        except Exception as e:
+            # The whole request failed; which objects were stored is unknown
+            errors = {uuids[i]: str(e) for i in pending}
+            transient = set(errors) if _is_transient(e) else set()
+        
+        retry = []
+        for i in pending:
+            error = errors.get(uuids[i])
+            if error is None:
+                results[i] = MemoryWriteResult(uuids[i], None, attempt + 1)
+            elif uuids[i] in transient and attempt < retry_policy.max_retries:
+                retry.append(i)
+            else:
+                results[i] = MemoryWriteResult(None, error, attempt + 1)
+        if retry:
+            time.sleep(retry_policy.backoff(attempt))
+        pending = retry
+    
+    for i, first in duplicates.items():
+        results[i] = results[first]
+    return results
+
+
+def write_memories_batch(
+    memories: List[Dict[str, Any]],
+    batch_size: int = BATCH_SIZE,
+    num_workers: int = BATCH_NUM_WORKERS,
+    dynamic: bool = BATCH_DYNAMIC,
+    retry_policy: Optional[RetryPolicy] = None,
+    upsert: bool = False
+) -> List[str]:
     """
     Write multiple memory entries to the Weaviate database in batch.
     
     This function efficiently processes multiple memories by:
     1. Validating all memories upfront
     2. Generating embeddings in batch
-    3. Writing all memories to Weaviate in batch
+    3. Writing all memories to Weaviate with its batch import, so up to
+       ``batch_size`` memories cost one HTTP request instead of one each,
+       resubmitting transient failures (see ``write_memories_batch_detailed``)
     
     Args:
         memories (List[Dict[str, Any]]): List of memory dictionaries, each containing:
@@ -97,13 +435,26 @@ def write_memories_batch(memories: List[Dict[str, Any]]) -> List[str]:
             - agent (str): The AI agent identifier
             - tags (List[str]): List of relevant tags for categorization
             - source (str, optional): Source of the memory. Defaults to "agent"
+        batch_size (int): Objects per batch request (the initial size when
+            ``dynamic`` is enabled). Defaults to 100.
+        num_workers (int): Batch requests sent concurrently. Defaults to 1.
+        dynamic (bool): Let the client adapt the batch size to Weaviate's
+            response times. Defaults to False.
+        retry_policy (RetryPolicy, optional): Resubmission of transient
+            failures. Defaults to 3 retries.
+        upsert (bool): Derive each UUID from the memory's content, project,
+            repo and agent (``memory_uuid``) and skip memories that are
+            already stored, without embedding them. Defaults to False.
             
     Returns:
-        List[str]: List of UUIDs for the created memory objects in the same order
+        List[str]: List of UUIDs for the created (or, in upsert mode,
+        existing) memory objects in the same order
         
     Raises:
         ValueError: If memories list is empty or contains invalid entries
-        Exception: If there's an error writing to Weaviate
+        Exception: If a memory could not be written. The other memories
+            may have been written; use ``write_memories_batch_detailed`` to
+            learn which.
         
     Example:
         >>> memories = [
@@ -127,75 +478,11 @@ def write_memories_batch(memories: List[Dict[str, Any]]) -> List[str]:
         >>> len(uuids)  # Same as number of input memories
         2
     """
-    if not memories or not isinstance(memories, list):
-        raise ValueError("Memories must be a non-empty list")
-    
-    # Validate all memories upfront
-    validated_memories = []
-    contents = []
-    
-    for i, memory in enumerate(memories):
-        if not isinstance(memory, dict):
-            raise ValueError(f"Memory at index {i} must be a dictionary")
-        
-        # Validate required fields
-        content = memory.get("content")
-        project = memory.get("project") 
-        repo = memory.get("repo")
-        agent = memory.get("agent")
-        tags = memory.get("tags")
-        source = memory.get("source", "agent")  # Default source
-        
-        if not content or not isinstance(content, str):
-            raise ValueError(f"Memory at index {i}: content must be a non-empty string")
-        if not project or not isinstance(project, str):
-            raise ValueError(f"Memory at index {i}: project must be a non-empty string")
-        if not repo or not isinstance(repo, str):
-            raise ValueError(f"Memory at index {i}: repo must be a non-empty string")
-        if not agent or not isinstance(agent, str):
-            raise ValueError(f"Memory at index {i}: agent must be a non-empty string")
-        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
-            raise ValueError(f"Memory at index {i}: tags must be a list of strings")
-        if not isinstance(source, str):
-            raise ValueError(f"Memory at index {i}: source must be a string")
-        
-        # Store validated memory
-        validated_memory = {
-            "content": content,
-            "project": project,
-            "repo": repo,
-            "agent": agent,
-            "tags": tags,
-            "source": source,
-            "timestamp": datetime.datetime.utcnow().isoformat()
-        }
-        validated_memories.append(validated_memory)
-        contents.append(content)
-    
-    try:
-        # Generate embeddings in batch
-        vectors = embed_texts_batch(contents)
-        
-        # Get Weaviate client
-        client = get_weaviate_client()
-        
-        # Prepare batch operation
-        uuids = []
-        
-        # Process each memory with its corresponding vector
-        for memory, vector in zip(validated_memories, vectors):
-            try:
-                result = client.data_object.create(
-                    data_object=memory,
-                    class_name="ProjectMemory", 
-                    vector=vector
-                )
-                uuids.append(result.uuid)
-            except Exception as e:
-                # If one memory fails, we still continue but track the error
-                raise Exception(f"Failed to write memory '{memory['content'][:50]}...': {str(e)}")
-        
-        return uuids
-        
-    except Exception as e:
-        raise Exception(f"Failed to write memories batch: {str(e)}")
+    results = write_memories_batch_detailed(memories, batch_size, num_workers, dynamic, retry_policy, upsert)
+    for memory, result in zip(memories, results):
+        if not result.success:
+            raise Exception(
+                f"Failed to write memories batch: "
+                f"Failed to write memory '{memory['content'][:50]}...': {result.error}"
+            )
+    return [result.uuid for result in results]
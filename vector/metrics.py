@@ -0,0 +1,90 @@
+import time
+import threading
+from collections import deque
+from typing import Dict
+
+
+class RouterMetrics:
+    """
+    Thread-safe counters for embedding router telemetry.
+
+    Every counter keeps a lifetime total plus per-second buckets covering the
+    last ``window_seconds``, from which per-window rates are derived.
+    Counters are created on first use, so components can report whatever
+    they measure (``cache_hits``, ``api_calls``, ``tokens_sent``, ...).
+    """
+
+    def __init__(self, window_seconds: float = 60.0):
+        """
+        Initialize the metrics.
+
+        Args:
+            window_seconds (float): Length of the sliding window used for rates
+        """
+        self.window_seconds = window_seconds
+        self._totals: Dict[str, float] = {}
+        self._buckets: "deque[list]" = deque()  # [second, {name: amount}]
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def increment(self, name: str, amount: float = 1):
+        """Add ``amount`` to counter ``name``."""
+        if not amount:
+            return
+        second = int(time.monotonic())
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0) + amount
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, {}])
+                self._expire(second)
+            bucket = self._buckets[-1][1]
+            bucket[name] = bucket.get(name, 0) + amount
+
+    def _expire(self, now_second: int):
+        cutoff = now_second - self.window_seconds
+        while self._buckets and self._buckets[0][0] <= cutoff:
+            self._buckets.popleft()
+
+    def get(self, name: str) -> float:
+        """Return the lifetime total of counter ``name``."""
+        with self._lock:
+            return self._totals.get(name, 0)
+
+    def snapshot(self) -> Dict:
+        """
+        Return lifetime totals, per-second rates over the window and hit rates.
+
+        Returns:
+            Dict: ``totals`` and ``rates_per_second`` keyed by counter name,
+            the ``window_seconds`` the rates cover, and the lifetime and
+            windowed ``hit_rate`` (0.0 when there were no lookups)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(int(now))
+            totals = dict(self._totals)
+            windowed: Dict[str, float] = {}
+            for _, bucket in self._buckets:
+                for name, amount in bucket.items():
+                    windowed[name] = windowed.get(name, 0) + amount
+        span = min(self.window_seconds, max(now - self._started, 1.0))
+        return {
+            'totals': totals,
+            'rates_per_second': {name: amount / span for name, amount in windowed.items()},
+            'window_seconds': self.window_seconds,
+            'hit_rate': _hit_rate(totals),
+            'window_hit_rate': _hit_rate(windowed)
+        }
+
+    def reset(self):
+        """Zero every counter."""
+        with self._lock:
+            self._totals.clear()
+            self._buckets.clear()
+            self._started = time.monotonic()
+
+
+def _hit_rate(counts: Dict[str, float]) -> float:
+    hits = counts.get('cache_hits', 0)
+    lookups = hits + counts.get('cache_misses', 0)
+    return hits / lookups if lookups else 0.0
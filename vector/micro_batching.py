@@ -0,0 +1,167 @@
+import time
+import asyncio
+from typing import List, Optional, Dict, NamedTuple
+from openai import OpenAIError
+from .async_embedding_router import AsyncEmbeddingRouter
+
+
+class _PendingText(NamedTuple):
+    text: str
+    metadata: Optional[Dict]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MicroBatchDispatcher:
+    """
+    Coalesces single-text cache misses into batched embedding requests.
+
+    ``submit`` answers cache hits directly. Misses are queued and sent
+    together once the oldest queued text has waited ``window_ms`` or
+    ``max_batch_size`` texts are queued, whichever comes first; each caller
+    then receives its own vector. Batches go through the router's
+    single-flight path, so texts already in flight elsewhere are not
+    requested again.
+
+    Queue wait is exported through the router metrics as ``queued_texts``,
+    ``queue_wait_seconds`` (sum over texts) and ``micro_batches``, and
+    summarized by ``stats``.
+    """
+
+    def __init__(self, router: AsyncEmbeddingRouter, window_ms: float = 5.0, max_batch_size: int = 64):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            router (AsyncEmbeddingRouter): Router that embeds and caches the batches
+            window_ms (float): Maximum time a miss waits for others to join its
+                batch, in milliseconds
+            max_batch_size (int): Number of queued texts that triggers an
+                immediate dispatch
+
+        Raises:
+            ValueError: If ``window_ms`` is negative or ``max_batch_size`` is
+                not positive
+        """
+        if window_ms < 0:
+            raise ValueError("window_ms must not be negative")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.router = router
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[_PendingText] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatching = set()
+        self._max_queue_wait = 0.0
+
+    async def submit(self, text: str, metadata: Optional[Dict] = None, use_cache: bool = True) -> List[float]:
+        """
+        Get the embedding of one text, batching cache misses with other callers.
+
+        Args:
+            text (str): Text to generate embedding for
+            metadata (Dict, optional): Additional metadata to store with the embedding
+            use_cache (bool): Whether to use cache. Uncached requests bypass
+                the queue. Defaults to True.
+
+        Returns:
+            List[float]: The embedding vector
+
+        Raises:
+            ValueError: If text is empty or invalid
+            OpenAIError: If the batch this text was sent in failed
+        """
+        if not use_cache:
+            return await self.router.aget_embedding(text, use_cache=False, metadata=metadata)
+        if not text or not isinstance(text, str):
+            raise ValueError("Text must be a non-empty string")
+        if self.router.chunker is not None and self.router.chunker.needs_split(text):
+            # Its chunks already form a batch of their own
+            return await self.router.aget_embedding(text, metadata=metadata)
+        text = self.router._normalize(text)
+
+        cached = await asyncio.to_thread(self.router._load_from_cache, self.router._get_cache_key(text))
+        if cached is not None:
+            self.router._record_call(hits=1, misses=0, api_calls=0)
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingText(text, metadata, future, time.monotonic()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        try:
+            embedding, api_calls = await future
+        except OpenAIError as e:
+            self.router._record_call(hits=0, misses=1, api_calls=1)
+            raise OpenAIError(f"Failed to generate embedding: {str(e)}")
+        self.router._record_call(hits=0, misses=1, api_calls=api_calls)
+        return embedding
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[_PendingText]):
+        now = time.monotonic()
+        waits = [now - item.enqueued_at for item in batch]
+        self._max_queue_wait = max(self._max_queue_wait, *waits)
+        metrics = self.router.metrics
+        metrics.increment('micro_batches')
+        metrics.increment('queued_texts', len(batch))
+        metrics.increment('queue_wait_seconds', sum(waits))
+
+        try:
+            embeddings, api_calls = await self.router._aembed_uncached(
+                [item.text for item in batch],
+                [item.metadata for item in batch]
+            )
+        except asyncio.CancelledError:
+            for item in batch:
+                item.future.cancel()
+            raise
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        for item, embedding in zip(batch, embeddings):
+            if not item.future.done():
+                item.future.set_result((embedding, api_calls))
+
+    async def drain(self):
+        """Dispatch whatever is queued now and wait for all batches in flight."""
+        self._flush()
+        if self._dispatching:
+            await asyncio.gather(*self._dispatching, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        """
+        Summarize batching and queue wait.
+
+        Returns:
+            Dict: Number of ``batches``, ``mean_batch_size``,
+            ``mean_queue_wait_ms`` and ``max_queue_wait_ms`` since startup,
+            and the number of texts currently ``queued``
+        """
+        metrics = self.router.metrics
+        batches = metrics.get('micro_batches')
+        queued = metrics.get('queued_texts')
+        return {
+            'batches': batches,
+            'mean_batch_size': queued / batches if batches else 0.0,
+            'mean_queue_wait_ms': 1000 * metrics.get('queue_wait_seconds') / queued if queued else 0.0,
+            'max_queue_wait_ms': 1000 * self._max_queue_wait,
+            'queued': len(self._pending)
+        }
@@ -0,0 +1,54 @@
+import re
+import unicodedata
+from typing import Optional
+
+UNICODE_FORMS = ("NFC", "NFKC", "NFD", "NFKD")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class TextNormalizer:
+    """
+    Canonicalizes texts before they are hashed and embedded.
+
+    Texts that differ only in Unicode composition or in whitespace then
+    share one cache entry. Both steps are off by default, which leaves
+    texts (and so existing cache keys) untouched.
+    """
+
+    def __init__(self, unicode_form: Optional[str] = None, collapse_whitespace: bool = False):
+        """
+        Initialize the normalizer.
+
+        Args:
+            unicode_form (str, optional): Unicode normalization form to apply,
+                e.g. "NFC". None disables Unicode normalization.
+            collapse_whitespace (bool): Strip leading and trailing whitespace
+                and replace every internal run of whitespace with one space
+
+        Raises:
+            ValueError: If ``unicode_form`` is not a known form
+        """
+        if unicode_form is not None and unicode_form not in UNICODE_FORMS:
+            raise ValueError(f"unicode_form must be one of {', '.join(UNICODE_FORMS)}")
+        self.unicode_form = unicode_form
+        self.collapse_whitespace = collapse_whitespace
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any normalization step is active."""
+        return self.unicode_form is not None or self.collapse_whitespace
+
+    def __call__(self, text: str) -> str:
+        """
+        Normalize ``text``.
+
+        Example:
+            >>> TextNormalizer("NFC", collapse_whitespace=True)("  Cafe\\u0301\\n menu ")
+            'Café menu'
+        """
+        if self.unicode_form is not None:
+            text = unicodedata.normalize(self.unicode_form, text)
+        if self.collapse_whitespace:
+            text = _WHITESPACE.sub(" ", text).strip()
+        return text
@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import math
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Optional, NamedTuple
+from .tokenization import estimate_tokens
+from .dimension_reduction import truncate_vector
+
+
+class EmbeddingResult(NamedTuple):
+    """Vectors returned by a provider, in input order, and the tokens billed."""
+    vectors: List[List[float]]
+    total_tokens: Optional[int]
+
+
+class EmbeddingProvider(ABC):
+    """
+    Source of embedding vectors behind ``EmbeddingRouter``.
+
+    Providers only turn texts into vectors; caching, batching, throttling
+    and retries stay in the router. Errors should be raised as
+    ``OpenAIError`` subclasses so the router's retry policy applies.
+    Subclasses must implement ``embed``; a provider without it cannot be
+    instantiated.
+    """
+
+    # Short identifier, used in cache segment names of non-OpenAI providers
+    name: str = None
+    # Fixed output dimension, if the provider ignores the model's
+    dimensions: Optional[int] = None
+    # Whether the client-side RPM/TPM budgets should apply
+    rate_limited: bool = True
+
+    @abstractmethod
+    def embed(self, texts: List[str], model: str, **options) -> EmbeddingResult:
+        """
+        Embed ``texts`` in a single request.
+
+        Args:
+            texts (List[str]): Texts to embed
+            model (str): Embedding model requested by the router
+            **options: Request options set by the router; only passed when
+                used. ``dimensions`` (int) asks for shortened vectors.
+
+        Returns:
+            EmbeddingResult: One vector per text, in input order
+        """
+
+    async def aembed(self, texts: List[str], model: str, **options) -> EmbeddingResult:
+        """Async version of ``embed``. Defaults to running ``embed`` in a worker thread."""
+        return await asyncio.to_thread(self.embed, texts, model, **options)
+
+
+class OpenAIProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API."""
+
+    name = "openai"
+
+    def __init__(self, client, async_client=None):
+        """
+        Initialize the provider.
+
+        Args:
+            client (OpenAI): Client used for synchronous requests
+            async_client (AsyncOpenAI, optional): Client used by ``aembed``.
+                Without one, ``aembed`` runs ``embed`` in a worker thread.
+        """
+        self.client = client
+        self.async_client = async_client
+
+    def embed(self, texts: List[str], model: str, **options) -> EmbeddingResult:
+        response = self.client.embeddings.create(
+            input=texts,
+            model=model,
+            **options
+        )
+        return _result_from(response)
+
+    async def aembed(self, texts: List[str], model: str, **options) -> EmbeddingResult:
+        if self.async_client is None:
+            return await super().aembed(texts, model, **options)
+        response = await self.async_client.embeddings.create(
+            input=texts,
+            model=model,
+            **options
+        )
+        return _result_from(response)
+
+
+def _result_from(response) -> EmbeddingResult:
+    usage = getattr(response, 'usage', None)
+    tokens = getattr(usage, 'total_tokens', None)
+    return EmbeddingResult(
+        [item.embedding for item in response.data],
+        tokens if isinstance(tokens, int) else None
+    )
+
+
+class DeterministicProvider(EmbeddingProvider):
+    """
+    Offline provider hashing each text into a fixed unit vector.
+
+    The same text (and seed) always yields the same vector, different texts
+    yield practically uncorrelated ones. No network access or API key is
+    needed, which makes it suitable for tests and for load testing the
+    cache, writer and retriever at high QPS. An artificial per-request
+    latency can simulate the upstream API.
+    """
+
+    name = "deterministic"
+    rate_limited = False
+
+    def __init__(self, dimensions: int = 1536, latency_ms: Optional[float] = None, seed: int = 0):
+        """
+        Initialize the provider.
+
+        Args:
+            dimensions (int): Output dimension. Defaults to 1536, like ada-002.
+            latency_ms (float, optional): Artificial latency added to every
+                request in milliseconds. Defaults to the
+                EMBEDDING_PROVIDER_LATENCY_MS environment variable, or 0.
+            seed (int): Changes every vector; use different seeds to get
+                independent vector sets for the same texts.
+
+        Raises:
+            ValueError: If ``dimensions`` is not positive or the latency is negative
+        """
+        if latency_ms is None:
+            latency_ms = float(os.getenv("EMBEDDING_PROVIDER_LATENCY_MS", "0"))
+        if dimensions < 1:
+            raise ValueError("dimensions must be positive")
+        if latency_ms < 0:
+            raise ValueError("latency_ms must not be negative")
+        self.dimensions = dimensions
+        self.latency_seconds = latency_ms / 1000
+        self.seed = seed
+
+    def vector(self, text: str) -> List[float]:
+        """
+        Return the unit vector of ``text``.
+
+        Args:
+            text (str): Text to embed
+
+        Returns:
+            List[float]: A ``dimensions``-long vector of norm 1
+        """
+        digest = hashlib.shake_256(f"{self.seed}\0{text}".encode('utf-8')).digest(2 * self.dimensions)
+        values = array('h')
+        values.frombytes(digest)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def _result(self, texts: List[str], dimensions: Optional[int] = None) -> EmbeddingResult:
+        vectors = [self.vector(text) for text in texts]
+        if dimensions is not None:
+            # Shortened like the text-embedding-3 models do it
+            vectors = [truncate_vector(vector, dimensions) for vector in vectors]
+        return EmbeddingResult(vectors, sum(estimate_tokens(text) for text in texts))
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> EmbeddingResult:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._result(texts, dimensions)
+
+    async def aembed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> EmbeddingResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._result(texts, dimensions)
+
+
+# Providers that can be selected by name; "openai" is built by the router
+EMBEDDING_PROVIDERS = {
+    "openai": OpenAIProvider,
+    "deterministic": DeterministicProvider,
+}
@@ -0,0 +1,179 @@
+import sys
+import math
+import random
+import struct
+from array import array
+from typing import List, Dict, Sequence
+
+# Storage precisions for cached vectors, with the code stored in packed records
+PRECISION_CODES = {
+    "float32": 0,
+    "float16": 1,
+    "int8": 2,
+}
+PRECISIONS = tuple(PRECISION_CODES)
+PRECISION_NAMES = {code: name for name, code in PRECISION_CODES.items()}
+
+_INT8_SCALE = struct.Struct("<f")
+
+
+def _check_precision(precision: str):
+    if precision not in PRECISION_CODES:
+        raise ValueError(f"Unknown precision '{precision}'. Available: {', '.join(PRECISIONS)}")
+
+
+def encoded_size(dim: int, precision: str) -> int:
+    """
+    Number of bytes a ``dim``-dimensional vector occupies at ``precision``.
+
+    Args:
+        dim (int): Vector dimension
+        precision (str): One of ``PRECISIONS``
+
+    Returns:
+        int: Encoded size in bytes
+    """
+    _check_precision(precision)
+    if precision == "float32":
+        return 4 * dim
+    if precision == "float16":
+        return 2 * dim
+    return _INT8_SCALE.size + dim
+
+
+def encode_vector(embedding: Sequence[float], precision: str) -> bytes:
+    """
+    Encode a vector as little-endian bytes at the given precision.
+
+    ``int8`` uses a per-vector scale (max absolute value / 127) stored as a
+    float32 in front of the quantized values.
+
+    Args:
+        embedding (Sequence[float]): The vector to encode
+        precision (str): One of ``PRECISIONS``
+
+    Returns:
+        bytes: The encoded vector, ``encoded_size(len(embedding), precision)`` long
+
+    Raises:
+        ValueError: If the precision is unknown or a value does not fit it
+    """
+    _check_precision(precision)
+    if precision == "float32":
+        vector = array('f', embedding)
+        if sys.byteorder == 'big':
+            vector.byteswap()
+        return vector.tobytes()
+    if precision == "float16":
+        try:
+            return struct.pack(f"<{len(embedding)}e", *embedding)
+        except (OverflowError, struct.error) as e:
+            raise ValueError(f"Vector does not fit float16 storage: {str(e)}")
+    peak = max((abs(x) for x in embedding), default=0.0)
+    scale = peak / 127 if peak else 1.0
+    quantized = array('b', (max(-127, min(127, round(x / scale))) for x in embedding))
+    return _INT8_SCALE.pack(scale) + quantized.tobytes()
+
+
+def decode_vector(data: bytes, precision: str, dim: int) -> List[float]:
+    """
+    Decode bytes produced by ``encode_vector`` back into a list of floats.
+
+    Args:
+        data (bytes): The encoded vector
+        precision (str): Precision it was encoded with
+        dim (int): Expected vector dimension
+
+    Returns:
+        List[float]: The decoded vector, exactly ``dim`` values long
+
+    Raises:
+        ValueError: If the precision is unknown or ``data`` does not have
+            exactly the size a ``dim``-dimensional vector needs
+    """
+    expected = encoded_size(dim, precision)
+    if len(data) != expected:
+        raise ValueError(f"Expected {expected} bytes for a {dim}-d {precision} vector, got {len(data)}")
+    if precision == "float32":
+        vector = array('f')
+        vector.frombytes(data)
+        if sys.byteorder == 'big':
+            vector.byteswap()
+        return vector.tolist()
+    if precision == "float16":
+        return list(struct.unpack(f"<{dim}e", data))
+    scale = _INT8_SCALE.unpack_from(data)[0]
+    quantized = array('b')
+    quantized.frombytes(data[_INT8_SCALE.size:])
+    return [q * scale for q in quantized]
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def quantization_error_report(
+    vectors: List[List[float]],
+    precisions: Sequence[str] = PRECISIONS,
+    sample_size: int = 200,
+    seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure how much each storage precision distorts cosine similarity.
+
+    For a random sample of vector pairs, the cosine similarity of the
+    original vectors is compared with that of their quantized round trips.
+    The self-similarity of every sampled vector with its own round trip is
+    reported too.
+
+    Args:
+        vectors (List[List[float]]): Representative embeddings, e.g. read from the cache
+        precisions (Sequence[str]): Precisions to evaluate
+        sample_size (int): Maximum number of vector pairs to compare
+        seed (int): Seed for the pair sampling
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per precision: ``bytes_per_vector``,
+        ``compression_vs_float64_json`` (size of plain JSON floats divided by
+        the encoded size, an approximation), ``mean_abs_cosine_error``,
+        ``max_abs_cosine_error`` and ``min_self_cosine``
+
+    Raises:
+        ValueError: If fewer than two vectors are given
+
+    Example:
+        >>> report = quantization_error_report(sample_vectors)
+        >>> report["int8"]["max_abs_cosine_error"] < 0.01
+        True
+    """
+    if len(vectors) < 2:
+        raise ValueError("At least two vectors are needed for an error report")
+    rng = random.Random(seed)
+    pairs = [tuple(rng.sample(range(len(vectors)), 2)) for _ in range(sample_size)]
+    dim = len(vectors[0])
+    json_bytes = sum(len(repr(x)) + 2 for x in vectors[0])
+
+    report = {}
+    for precision in precisions:
+        restored = {}
+
+        def round_trip(i):
+            if i not in restored:
+                restored[i] = decode_vector(encode_vector(vectors[i], precision), precision, dim)
+            return restored[i]
+
+        errors = [
+            abs(_cosine(vectors[i], vectors[j]) - _cosine(round_trip(i), round_trip(j)))
+            for i, j in pairs
+        ]
+        size = encoded_size(dim, precision)
+        report[precision] = {
+            'bytes_per_vector': size,
+            'compression_vs_float64_json': json_bytes / size,
+            'mean_abs_cosine_error': sum(errors) / len(errors),
+            'max_abs_cosine_error': max(errors),
+            'min_self_cosine': min(_cosine(vectors[i], round_trip(i)) for i in restored)
+        }
+    return report
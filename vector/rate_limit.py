@@ -0,0 +1,189 @@
+import time
+import random
+import threading
+from typing import Dict, Optional, Tuple
+from openai import (
+    OpenAIError,
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    ConflictError,
+)
+
+# Errors worth retrying: throttling, transient network failures and 5xx
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError, ConflictError)
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute token buckets.
+
+    Both buckets start full and refill continuously. ``reserve`` takes a
+    request's share from both buckets immediately, letting them go into
+    debt, and returns how long the caller has to wait until that debt is
+    paid off. Callers are therefore served in arrival order and a sync
+    caller can sleep while an asyncio caller awaits, against the same
+    buckets. All methods are thread-safe.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (float, optional): Request budget. None disables it.
+            tokens_per_minute (float, optional): Token budget. None disables it.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute or 0.0
+        self._tokens = tokens_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Reserve one request and ``tokens`` tokens.
+
+        Args:
+            tokens (int): Tokens the request will consume
+
+        Returns:
+            float: Seconds to wait before sending the request, 0.0 if it may
+            be sent right away
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            delay = 0.0
+            if self.requests_per_minute:
+                self._requests, wait = _take(self._requests, 1, self.requests_per_minute, elapsed)
+                delay = max(delay, wait)
+            if self.tokens_per_minute:
+                self._tokens, wait = _take(self._tokens, tokens, self.tokens_per_minute, elapsed)
+                delay = max(delay, wait)
+            return delay
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request of ``tokens`` tokens may be sent.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def _take(level: float, amount: float, per_minute: float, elapsed: float) -> Tuple[float, float]:
+    rate = per_minute / 60
+    level = min(per_minute, level + elapsed * rate) - amount
+    return level, (-level / rate if level < 0 else 0.0)
+
+
+_shared_limiters: Dict[Tuple[Optional[float], Optional[float]], RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(
+    requests_per_minute: Optional[float],
+    tokens_per_minute: Optional[float]
+) -> RateLimiter:
+    """
+    Return the process-wide rate limiter for the given budgets.
+
+    Every router configured with the same budgets shares one limiter, so
+    the budgets hold for the process as a whole rather than per router.
+
+    Args:
+        requests_per_minute (float, optional): Request budget. None disables it.
+        tokens_per_minute (float, optional): Token budget. None disables it.
+
+    Returns:
+        RateLimiter: The shared limiter
+    """
+    key = (requests_per_minute, tokens_per_minute)
+    with _shared_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = _shared_limiters[key] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return limiter
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for retryable OpenAI errors.
+
+    The n-th retry waits a random time between 0 and
+    ``min(max_delay, base_delay * 2 ** n)``, unless the server sent a
+    ``Retry-After`` (or ``retry-after-ms``) header, which is honored up to
+    ``max_delay``: a bogus or hostile header cannot block a request thread
+    for longer than that.
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries (int): Retries after the first attempt. 0 disables retrying.
+            base_delay (float): Backoff ceiling of the first retry in seconds
+            max_delay (float): Upper bound of the backoff ceiling and of
+                server-requested ``Retry-After`` delays, in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay_for(self, error: OpenAIError, attempt: int) -> Optional[float]:
+        """
+        Decide whether and when to retry after ``error``.
+
+        Args:
+            error (OpenAIError): Error raised by attempt number ``attempt``
+            attempt (int): Zero-based number of the failed attempt
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the
+            error is not retryable or the retries are used up
+        """
+        if attempt >= self.max_retries or not isinstance(error, RETRYABLE_ERRORS):
+            return None
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self.backoff(attempt)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Jittered delay before retrying after failed attempt number ``attempt``.
+
+        For callers that decide retryability themselves, e.g. Weaviate writes.
+
+        Args:
+            attempt (int): Zero-based number of the failed attempt
+
+        Returns:
+            float: Seconds to wait, between 0 and the attempt's backoff ceiling
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _retry_after(error: OpenAIError) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return max(0.0, float(headers['retry-after-ms']) / 1000)
+        if headers.get('retry-after') is not None:
+            return max(0.0, float(headers['retry-after']))
+    except (TypeError, ValueError):
+        # HTTP-date values and garbage fall back to regular backoff
+        return None
+    return None
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Tuple, Iterable
+
+
+class SingleFlight:
+    """
+    Registry of in-flight embedding requests keyed by cache key.
+
+    A caller that misses the cache ``claim``s its keys. Keys nobody is
+    fetching yet are handed to it as leader; for keys another caller is
+    already fetching it gets that caller's future to wait on. The leader
+    makes the upstream request, stores the result in the cache and then
+    ``resolve``s (or ``fail``s) its futures, which wakes every waiter.
+
+    Futures are ``concurrent.futures.Future`` objects, so thread callers
+    wait with ``result()`` and asyncio callers with
+    ``await asyncio.wrap_future(future)``. Both kinds of callers coalesce
+    with each other. A leader always finishes its own keys before waiting on
+    anyone else's, so callers claiming overlapping batches cannot deadlock.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, cache_keys: Iterable[str]) -> Tuple[List[str], Dict[str, Future]]:
+        """
+        Register interest in ``cache_keys``.
+
+        Args:
+            cache_keys (Iterable[str]): Keys missing from the cache. Duplicates
+                are allowed and claimed once.
+
+        Returns:
+            Tuple[List[str], Dict[str, Future]]: Keys the caller now leads, in
+            first-seen order, and futures of the keys other callers are
+            already fetching
+        """
+        leading: List[str] = []
+        waiting: Dict[str, Future] = {}
+        seen = set()
+        with self._lock:
+            for cache_key in cache_keys:
+                if cache_key in seen:
+                    continue
+                seen.add(cache_key)
+                future = self._calls.get(cache_key)
+                if future is None:
+                    self._calls[cache_key] = Future()
+                    leading.append(cache_key)
+                else:
+                    waiting[cache_key] = future
+        return leading, waiting
+
+    def resolve(self, results: Dict[str, List[float]]):
+        """Publish the embeddings of led keys and release them."""
+        with self._lock:
+            futures = [(self._calls.pop(cache_key), embedding) for cache_key, embedding in results.items()]
+        for future, embedding in futures:
+            future.set_result(embedding)
+
+    def fail(self, cache_keys: Iterable[str], error: BaseException):
+        """Propagate ``error`` to everyone waiting on the led ``cache_keys``."""
+        with self._lock:
+            futures = [self._calls.pop(cache_key) for cache_key in cache_keys if cache_key in self._calls]
+        for future in futures:
+            future.set_exception(error)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
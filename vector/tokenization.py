@@ -0,0 +1,82 @@
+import math
+from typing import Callable, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency: fall back to a conservative estimate
+    tiktoken = None
+
+# Per-request limits of the OpenAI embeddings endpoint
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of ``text`` without a tokenizer.
+
+    Assumes 3 UTF-8 bytes per token, which overestimates English text
+    (about 4 bytes per token) and matches CJK text (about one token per
+    3-byte character), so budgets based on it stay on the safe side.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated number of tokens, at least 1
+    """
+    return max(1, math.ceil(len(text.encode('utf-8')) / 3))
+
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """
+    Return a function counting the tokens ``model`` sees for a text.
+
+    Uses ``tiktoken`` when it is installed and ``estimate_tokens`` otherwise.
+
+    Args:
+        model (str): Embedding model name
+
+    Returns:
+        Callable[[str], int]: Token counting function
+    """
+    if tiktoken is None:
+        return estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def plan_batches(token_counts: List[int], max_items: int, max_tokens: int) -> List[Tuple[int, int]]:
+    """
+    Split a sequence of texts into contiguous request-sized sub-batches.
+
+    Each sub-batch holds at most ``max_items`` texts and ``max_tokens``
+    tokens. A single text above the token budget gets a sub-batch of its own.
+
+    Args:
+        token_counts (List[int]): Token count of each text, in input order
+        max_items (int): Maximum number of texts per sub-batch
+        max_tokens (int): Maximum total tokens per sub-batch
+
+    Returns:
+        List[Tuple[int, int]]: ``(start, end)`` index ranges covering the input in order
+
+    Example:
+        >>> plan_batches([5, 5, 5], max_items=2, max_tokens=100)
+        [(0, 2), (2, 3)]
+    """
+    batches = []
+    start = 0
+    tokens = 0
+    for i, count in enumerate(token_counts):
+        if i > start and (i - start >= max_items or tokens + count > max_tokens):
+            batches.append((start, i))
+            start = i
+            tokens = 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
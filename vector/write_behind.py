@@ -0,0 +1,258 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Iterator, Tuple
+
+from .cache_backends import CacheBackend, CacheEntryInfo, CacheItem
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop")
+
+# A write waiting to be persisted: (embedding, metadata)
+PendingWrite = Tuple[List[float], Optional[Dict]]
+
+
+class WriteBehindCache(CacheBackend):
+    """
+    Defers writes to a cache backend to a background thread.
+
+    ``put`` and ``put_many`` only queue the entry in memory and return; a
+    writer thread persists queued entries to the wrapped backend in batches
+    of up to ``batch_size``, at least every ``flush_interval`` seconds. Reads
+    see queued entries immediately, so a vector is served from the moment it
+    is put even though it is not on disk yet. Rewrites of a queued key
+    replace the queued entry instead of queueing a second write.
+
+    At most ``max_pending`` entries are queued. When the backend falls behind
+    and the queue is full, the ``backpressure`` policy decides: "block" makes
+    the writing caller wait for room (bounded memory, latency degrades to
+    disk speed), "drop" discards the new entry (it will simply be embedded
+    again on a later miss). ``flush`` and ``close`` persist everything that
+    is queued; entries still queued when the process is killed are lost,
+    which for a cache only costs a re-embedding.
+
+    With ``metrics`` set, reports ``write_behind_batches``,
+    ``write_behind_entries``, ``write_behind_dropped``,
+    ``write_behind_blocked_seconds`` and ``write_behind_errors``.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        max_pending: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        backpressure: str = "block"
+    ):
+        """
+        Wrap ``backend`` and start the writer thread.
+
+        Args:
+            backend (CacheBackend): Backend the entries are persisted to
+            max_pending (int): Maximum number of queued entries
+            batch_size (int): Maximum entries per ``put_many`` on the backend
+            flush_interval (float): Seconds the writer waits for a batch to
+                fill before writing what is queued
+            backpressure (str): "block" or "drop", see the class docstring
+
+        Raises:
+            ValueError: If ``backpressure`` is unknown or a size is not positive
+        """
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {', '.join(BACKPRESSURE_POLICIES)}")
+        if max_pending < 1 or batch_size < 1:
+            raise ValueError("max_pending and batch_size must be positive")
+        self.backend = backend
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        # cache_key -> pending write, oldest first
+        self._pending: "OrderedDict[str, PendingWrite]" = OrderedDict()
+        self._condition = threading.Condition()
+        # Held while a batch is written, so clear() and flush() never race the writer
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="embedding-cache-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def metrics(self):
+        return self.backend.metrics
+
+    @metrics.setter
+    def metrics(self, metrics):
+        self.backend.metrics = metrics
+
+    def _count(self, name: str, amount: float = 1):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount)
+
+    # -- writer -------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                # Give a partial batch a moment to fill up
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed and not self._pending:
+                    return
+            self._write_batch()
+
+    def _take_batch(self) -> List[CacheItem]:
+        with self._condition:
+            return [
+                (cache_key, embedding, metadata)
+                for cache_key, (embedding, metadata) in list(self._pending.items())[:self.batch_size]
+            ]
+
+    def _write_batch(self) -> int:
+        """Persist up to ``batch_size`` queued entries. Returns how many were taken."""
+        with self._write_lock:
+            batch = self._take_batch()
+            if not batch:
+                return 0
+            try:
+                self.backend.put_many(batch)
+                self._count('write_behind_batches')
+                self._count('write_behind_entries', len(batch))
+            except Exception:
+                # Keep the writer alive; the entries are only a cache
+                logger.exception("Write-behind flush of %d cache entries failed", len(batch))
+                self._count('write_behind_errors', len(batch))
+            with self._condition:
+                for cache_key, embedding, _ in batch:
+                    queued = self._pending.get(cache_key)
+                    # Leave entries that were rewritten meanwhile for the next batch
+                    if queued is not None and queued[0] is embedding:
+                        del self._pending[cache_key]
+                self._condition.notify_all()
+            return len(batch)
+
+    def flush(self):
+        """Persist every queued entry now, in the calling thread."""
+        while self._write_batch():
+            pass
+
+    # -- CacheBackend -------------------------------------------------------
+
+    def _enqueue(self, items: List[CacheItem]):
+        with self._condition:
+            for cache_key, embedding, metadata in items:
+                if cache_key not in self._pending and len(self._pending) >= self.max_pending:
+                    if self.backpressure == "drop" or self._closed:
+                        self._count('write_behind_dropped')
+                        continue
+                    started = time.monotonic()
+                    while len(self._pending) >= self.max_pending and not self._closed:
+                        self._condition.notify_all()
+                        self._condition.wait()
+                    self._count('write_behind_blocked_seconds', time.monotonic() - started)
+                self._pending[cache_key] = (embedding, metadata)
+                self._pending.move_to_end(cache_key)
+            self._condition.notify_all()
+
+    def put(self, cache_key: str, embedding: List[float], metadata: Optional[Dict] = None):
+        self._enqueue([(cache_key, embedding, metadata)])
+
+    def put_many(self, items: List[CacheItem]):
+        self._enqueue(items)
+
+    def restore_many(self, items: List[CacheItem], created_at: List[float]):
+        # Bulk imports bypass the queue; flush first so no older queued
+        # vector for the same key lands on top of the restored one
+        self.flush()
+        self.backend.restore_many(items, created_at)
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        with self._condition:
+            queued = self._pending.get(cache_key)
+        if queued is not None:
+            return queued[0]
+        return self.backend.get(cache_key)
+
+    def get_many(self, cache_keys: List[str]) -> Dict[str, Optional[List[float]]]:
+        results = {}
+        missing = []
+        with self._condition:
+            for cache_key in cache_keys:
+                queued = self._pending.get(cache_key)
+                if queued is None:
+                    missing.append(cache_key)
+                else:
+                    results[cache_key] = queued[0]
+        if missing:
+            results.update(self.backend.get_many(missing))
+        return results
+
+    def get_metadata(self, cache_key: str) -> Optional[Dict]:
+        with self._condition:
+            queued = self._pending.get(cache_key)
+        if queued is not None:
+            return queued[1] if queued[1] is not None else {}
+        return self.backend.get_metadata(cache_key)
+
+    def delete(self, cache_key: str) -> bool:
+        with self._write_lock:
+            with self._condition:
+                queued = self._pending.pop(cache_key, None)
+                self._condition.notify_all()
+            return self.backend.delete(cache_key) or queued is not None
+
+    def contains(self, cache_key: str) -> bool:
+        with self._condition:
+            if cache_key in self._pending:
+                return True
+        return self.backend.contains(cache_key)
+
+    def keys(self) -> Iterator[str]:
+        with self._condition:
+            queued = list(self._pending)
+        seen = set(queued)
+        return iter(queued + [cache_key for cache_key in self.backend.keys() if cache_key not in seen])
+
+    def recent_keys(self, limit: int) -> List[str]:
+        with self._condition:
+            queued = list(reversed(self._pending))[:limit]
+        seen = set(queued)
+        recent = [cache_key for cache_key in self.backend.recent_keys(limit) if cache_key not in seen]
+        return (queued + recent)[:limit]
+
+    def clear(self):
+        with self._write_lock:
+            with self._condition:
+                self._pending.clear()
+                self._condition.notify_all()
+            self.backend.clear()
+
+    def info(self) -> Dict:
+        info = dict(self.backend.info())
+        with self._condition:
+            info['pending_writes'] = len(self._pending)
+        return info
+
+    def entries(self) -> Iterator[CacheEntryInfo]:
+        self.flush()
+        return self.backend.entries()
+
+    def compact(self) -> Dict:
+        self.flush()
+        return self.backend.compact()
+
+    def close(self):
+        """Persist every queued entry, stop the writer and close the backend."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.flush()
+        self.backend.close()